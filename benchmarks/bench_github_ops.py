@@ -0,0 +1,257 @@
+"""
+Offline benchmarks for the github_ops hot paths.
+
+Builds local bare repositories of a configurable size and a stub GitHub API with injected
+latency, then measures clone, push, bulk create/update/delete and listing. Results (latency
+percentiles, throughput and the phase breakdown from github_operations.metrics) are written
+as JSON so runs of different versions can be compared:
+
+    python -m benchmarks.bench_github_ops --output before.json
+    python -m benchmarks.bench_github_ops --output after.json --baseline before.json
+
+Run from the repository root.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from github_operations import github_ops
+from github_operations.metrics import MetricsRecorder, set_metrics_hook, span
+from github_operations.ratelimit import RateLimiter
+from benchmarks.fixtures import BENCH_OWNER, FakeGitHub, add_commit, build_bare_repo
+
+BENCH_TOKEN = "bench_token"
+BENCHMARKS = ("clone", "push", "create", "update", "delete", "list")
+
+
+def _result(recorder: MetricsRecorder, span_name: str, operations: int, wall_seconds: float, **extra) -> dict:
+    """
+    Combines the recorder's latency summary for span_name with the throughput over wall_seconds.
+    """
+    stats = recorder.summary().get(span_name, {})
+    result = {
+        "operations": operations,
+        "errors": stats.get("errors", 0),
+        "wall_seconds": wall_seconds,
+        "ops_per_second": operations / wall_seconds if wall_seconds else None,
+        "latency": {key: stats.get(key) for key in ("mean", "p50", "p90", "p99")},
+        "phases": stats.get("phases", {}),
+        "counters": stats.get("counters", {}),
+    }
+    result.update(extra)
+    return result
+
+
+def bench_clone(config: dict, root: str, recorder: MetricsRecorder) -> dict:
+    """
+    Clones the benchmark repository config["iterations"] times into fresh directories.
+    """
+    origin = os.path.join(root, "origin.git")
+    total_bytes = 0
+    started = time.perf_counter()
+    for i in range(config["iterations"]):
+        target = os.path.join(root, f"clone-{i}")
+        progress = github_ops.TransferProgress()
+        success, error = github_ops.clone_repository(f"file://{origin}", target, BENCH_TOKEN, progress=progress)
+        if not success:
+            raise RuntimeError(f"Clone failed: {error}")
+        total_bytes += progress.bytes or 0
+        shutil.rmtree(target)
+    wall = time.perf_counter() - started
+    return _result(recorder, "clone", config["iterations"], wall, bytes_per_second=total_bytes / wall)
+
+
+def bench_push(config: dict, root: str, recorder: MetricsRecorder) -> dict:
+    """
+    Pushes config["iterations"] commits of config["push_files"] new files each, one push per commit.
+    Only the push itself is timed.
+    """
+    origin = os.path.join(root, "origin.git")
+    work_tree = os.path.join(root, "push-work")
+    success, error = github_ops.clone_repository(f"file://{origin}", work_tree, BENCH_TOKEN)
+    if not success:
+        raise RuntimeError(f"Clone failed: {error}")
+    rng = random.Random(config["seed"])
+    pushed = 0.0
+    for i in range(config["iterations"]):
+        add_commit(work_tree, config["push_files"], config["file_size"], rng, f"Bench push {i}")
+        started = time.perf_counter()
+        success, error = github_ops.push_repository(work_tree, branch_name="main", github_token=BENCH_TOKEN)
+        pushed += time.perf_counter() - started
+        if not success:
+            raise RuntimeError(f"Push failed: {error}")
+    shutil.rmtree(work_tree)
+    payload = config["iterations"] * config["push_files"] * config["file_size"]
+    return _result(recorder, "push", config["iterations"], pushed, bytes_per_second=payload / pushed)
+
+
+def _run_api(config: dict, recorder: MetricsRecorder, span_name: str, operation) -> dict:
+    names = [f"bench-repo-{i}" for i in range(config["repositories"])]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=config["concurrency"]) as executor:
+        results = list(executor.map(operation, names))
+    wall = time.perf_counter() - started
+    failures = [error for success, error in results if not success]
+    if failures:
+        logging.warning(f"{len(failures)} {span_name} calls failed, first error: {failures[0]}")
+    return _result(recorder, span_name, len(names), wall)
+
+
+def bench_api(config: dict, api: FakeGitHub, recorder: MetricsRecorder, selected: list[str]) -> dict:
+    """
+    Creates, updates, lists and deletes config["repositories"] repositories against api,
+    config["concurrency"] calls at a time over one pooled client.
+    """
+    results = {}
+    client = github_ops.GitHubClient(BENCH_TOKEN, base_url=api.url, pool_maxsize=config["concurrency"], rate_limiter=RateLimiter())
+    try:
+        if "create" in selected:
+            specs = [{"repo_name": f"bench-repo-{i}", "description": "benchmark"} for i in range(config["repositories"])]
+            started = time.perf_counter()
+            created = github_ops.create_github_repositories(specs, BENCH_TOKEN, max_workers=config["concurrency"], client=client)
+            results["create"] = _result(recorder, "create", len(created), time.perf_counter() - started)
+        else:
+            for i in range(config["repositories"]):
+                api.add_repository(f"bench-repo-{i}")
+
+        if "update" in selected:
+            results["update"] = _run_api(config, recorder, "update", lambda name: github_ops.update_github_repository(
+                BENCH_OWNER, name, BENCH_TOKEN, description="updated", client=client))
+
+        if "list" in selected:
+            listed = 0
+            started = time.perf_counter()
+            for _ in range(config["iterations"]):
+                with span("list"):
+                    listed += sum(1 for _ in github_ops.iter_repositories(BENCH_TOKEN, per_page=config["per_page"], client=client))
+            wall = time.perf_counter() - started
+            results["list"] = _result(recorder, "list", config["iterations"], wall, repositories_per_second=listed / wall)
+
+        if "delete" in selected:
+            results["delete"] = _run_api(config, recorder, "delete", lambda name: github_ops.delete_github_repository(
+                BENCH_OWNER, name, BENCH_TOKEN, client=client))
+    finally:
+        client.close()
+    return results
+
+
+def _git_version() -> str:
+    return subprocess.run(["git", "--version"], capture_output=True, text=True).stdout.strip()
+
+
+def _code_version() -> str | None:
+    described = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                               capture_output=True, text=True)
+    return described.stdout.strip() or None
+
+
+def run_benchmarks(config: dict, selected: list[str] | None = None) -> dict:
+    """
+    Runs the selected benchmarks (all of BENCHMARKS by default) with config and returns the results document.
+    """
+    selected = list(selected or BENCHMARKS)
+    report = {
+        "version": _code_version(),
+        "timestamp": time.time(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "git": _git_version()},
+        "config": config,
+        "results": {},
+    }
+    previous_hook = set_metrics_hook(None)
+    with tempfile.TemporaryDirectory(prefix="github_ops_bench_") as root:
+        if "clone" in selected or "push" in selected:
+            build_bare_repo(os.path.join(root, "origin.git"), files=config["files"], file_size=config["file_size"],
+                            commits=config["commits"], seed=config["seed"])
+        for name, bench in (("clone", bench_clone), ("push", bench_push)):
+            if name in selected:
+                recorder = MetricsRecorder()
+                set_metrics_hook(recorder)
+                report["results"][name] = bench(config, root, recorder)
+                set_metrics_hook(None)
+
+        api_selected = [name for name in selected if name in ("create", "update", "delete", "list")]
+        if api_selected:
+            api = FakeGitHub(latency=config["latency"], jitter=config["jitter"], seed=config["seed"]).start()
+            recorder = MetricsRecorder()
+            set_metrics_hook(recorder)
+            try:
+                report["results"].update(bench_api(config, api, recorder, api_selected))
+            finally:
+                set_metrics_hook(None)
+                api.stop()
+    set_metrics_hook(previous_hook)
+    return report
+
+
+def compare(baseline: dict, report: dict) -> dict:
+    """
+    Returns, per benchmark present in both documents, the relative change of p50/p99 latency
+    and throughput (e.g. 0.1 is 10% higher than the baseline).
+    """
+    def change(old, new):
+        return (new - old) / old if old and new is not None else None
+
+    deltas = {}
+    for name, result in report["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        deltas[name] = {
+            "p50": change(old["latency"]["p50"], result["latency"]["p50"]),
+            "p99": change(old["latency"]["p99"], result["latency"]["p99"]),
+            "ops_per_second": change(old["ops_per_second"], result["ops_per_second"]),
+        }
+    return deltas
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for github_ops.")
+    parser.add_argument("benchmarks", nargs="*", help=f"benchmarks to run, out of {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--files", type=int, default=200, help="files in the benchmark repository")
+    parser.add_argument("--file-size", type=int, default=4096, help="bytes per file")
+    parser.add_argument("--commits", type=int, default=20, help="history depth of the benchmark repository")
+    parser.add_argument("--iterations", type=int, default=10, help="clones, pushes and listings to time")
+    parser.add_argument("--push-files", type=int, default=10, help="new files per pushed commit")
+    parser.add_argument("--repositories", type=int, default=200, help="repositories to create, update and delete")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent API calls")
+    parser.add_argument("--per-page", type=int, default=50, help="page size for listing")
+    parser.add_argument("--latency", type=float, default=0.02, help="injected API latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="maximum extra random API latency in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.benchmarks) - set(BENCHMARKS))
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    logging.getLogger().setLevel(logging.WARNING) # Per-call INFO logging would dominate the timings
+    config = {key: getattr(args, key) for key in ("files", "file_size", "commits", "iterations", "push_files",
+                                                  "repositories", "concurrency", "per_page", "latency", "jitter", "seed")}
+    report = run_benchmarks(config, args.benchmarks)
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = {"baseline": args.baseline, **compare(json.load(f), report)}
+
+    document = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
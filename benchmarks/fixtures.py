@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import random
+import threading
+import subprocess
+from urllib.parse import parse_qs
+
+from github_operations.testing import StubGitHubServer
+
+BENCH_OWNER = "bench"
+_COMMITTER = "Bench <bench@example.com>"
+
+
+def build_bare_repo(path: str, files: int = 100, file_size: int = 1024, commits: int = 1, branch: str = "main", seed: int = 0) -> str:
+    """
+    Creates a bare repository at path with git fast-import and returns path.
+    The first commit adds files random (incompressible) blobs of file_size bytes spread over
+    ten directories, and each later commit (commits in total) rewrites a tenth of them.
+    The content depends only on seed, so runs with the same parameters build the same repository.
+    """
+    rng = random.Random(seed)
+    subprocess.run(["git", "init", "-q", "--bare", "-b", branch, path], check=True)
+    paths = [f"dir_{i % 10}/file_{i}.bin" for i in range(files)]
+    importer = subprocess.Popen(["git", "fast-import", "--quiet"], cwd=path, stdin=subprocess.PIPE)
+    try:
+        for number in range(1, commits + 1):
+            message = b"Initial commit" if number == 1 else f"Change {number - 1}".encode()
+            changed = paths if number == 1 else rng.sample(paths, max(files // 10, 1))
+            importer.stdin.write(f"commit refs/heads/{branch}\nmark :{number}\n"
+                                 f"committer {_COMMITTER} {1_700_000_000 + number} +0000\n"
+                                 f"data {len(message)}\n".encode() + message + b"\n")
+            if number > 1:
+                importer.stdin.write(f"from :{number - 1}\n".encode())
+            for file_path in changed:
+                importer.stdin.write(f"M 100644 inline {file_path}\ndata {file_size}\n".encode())
+                importer.stdin.write(rng.randbytes(file_size) + b"\n")
+        importer.stdin.close()
+    finally:
+        if importer.wait() != 0:
+            raise RuntimeError(f"git fast-import failed for {path}")
+    return path
+
+
+def add_commit(work_tree: str, files: int, file_size: int, rng: random.Random, message: str):
+    """
+    Commits files new random blobs of file_size bytes in work_tree.
+    """
+    target = os.path.join(work_tree, f"push_{rng.getrandbits(64):016x}")
+    os.makedirs(target)
+    for i in range(files):
+        with open(os.path.join(target, f"file_{i}.bin"), "wb") as f:
+            f.write(rng.randbytes(file_size))
+    env = {**os.environ, "GIT_AUTHOR_NAME": "Bench", "GIT_AUTHOR_EMAIL": "bench@example.com",
+           "GIT_COMMITTER_NAME": "Bench", "GIT_COMMITTER_EMAIL": "bench@example.com"}
+    subprocess.run(["git", "add", "-A"], cwd=work_tree, env=env, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", message], cwd=work_tree, env=env, check=True)
+
+
+class FakeGitHub:
+    """
+    Stateful stand-in for the repository endpoints of the GitHub API, served by a StubGitHubServer.
+    Supports creating, updating, deleting and listing (with Link pagination) the repositories
+    of the user BENCH_OWNER. Every response is delayed by latency seconds plus a uniform
+    jitter of up to jitter seconds, drawn from a generator seeded with seed.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.repos = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.server = StubGitHubServer()
+        self.url = self.server.url
+        self.server.route("POST", "/user/repos", self._delayed(self._create))
+        self.server.route("GET", "/user/repos", self._delayed(self._list))
+
+    def _delayed(self, handler):
+        def respond(request):
+            with self._lock:
+                delay = self.latency + self._rng.uniform(0, self.jitter)
+            if delay:
+                time.sleep(delay)
+            return handler(request)
+        return respond
+
+    def _repo_data(self, name: str) -> dict:
+        data = self.repos[name]
+        return {"name": name, "full_name": f"{BENCH_OWNER}/{name}", "owner": {"login": BENCH_OWNER},
+                "html_url": f"https://github.com/{BENCH_OWNER}/{name}", **data}
+
+    def add_repository(self, name: str, description: str = "", private: bool = False):
+        with self._lock:
+            self.repos[name] = {"description": description, "private": private}
+        path = f"/repos/{BENCH_OWNER}/{name}"
+        self.server.route("PATCH", path, self._delayed(self._update))
+        self.server.route("DELETE", path, self._delayed(self._delete))
+
+    def _create(self, request):
+        payload = json.loads(request["body"])
+        if payload["name"] in self.repos:
+            return 422, {"message": "Repository creation failed.", "errors": [{"message": "name already exists on this account"}]}
+        self.add_repository(payload["name"], payload.get("description") or "", payload.get("private", False))
+        return 201, self._repo_data(payload["name"])
+
+    def _update(self, request):
+        name = request["path"].rsplit("/", 1)[1]
+        with self._lock:
+            if name not in self.repos:
+                return 404, {"message": "Not Found"}
+            self.repos[name].update(json.loads(request["body"] or b"{}"))
+        return 200, self._repo_data(name)
+
+    def _delete(self, request):
+        name = request["path"].rsplit("/", 1)[1]
+        with self._lock:
+            if self.repos.pop(name, None) is None:
+                return 404, {"message": "Not Found"}
+        return 204, b""
+
+    def _list(self, request):
+        query = parse_qs(request["query"])
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+        with self._lock:
+            names = sorted(self.repos)
+        last = max((len(names) + per_page - 1) // per_page, 1)
+        items = [self._repo_data(name) for name in names[(page - 1) * per_page:page * per_page]]
+        links = []
+        if page < last:
+            links.append(f'<{self.url}/user/repos?per_page={per_page}&page={page + 1}>; rel="next"')
+            links.append(f'<{self.url}/user/repos?per_page={per_page}&page={last}>; rel="last"')
+        return 200, items, {"Link": ", ".join(links)} if links else {}
+
+    def start(self):
+        self.server.start()
+        return self
+
+    def stop(self):
+        self.server.stop()
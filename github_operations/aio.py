@@ -0,0 +1,354 @@
+import os
+import asyncio
+import logging
+
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from github_operations.circuit_breaker import CircuitBreaker, CircuitOpenError, get_circuit_breaker
+from github_operations.github_ops import GITHUB_API_URL, _api_headers, _format_api_error, git_auth_env
+from github_operations.ratelimit import RATE_LIMIT_STATUSES, RateLimiter, get_rate_limiter
+
+
+class AsyncGitHubClient:
+    """
+    Asyncio counterpart of GitHubClient, bound to a single token.
+    Keeps one aiohttp.ClientSession so concurrent calls on the same event loop
+    reuse pooled keep-alive connections.
+    Parameters: github_token, base_url, limit (total open connections), limit_per_host,
+    timeout (total seconds per request), rate_limiter and circuit_breaker, which default to the
+    RateLimiter of the token and the CircuitBreaker of the API host shared with GitHubClient.
+    """
+
+    def __init__(self, github_token: str, base_url: str = GITHUB_API_URL, limit: int = 100,
+                 limit_per_host: int = 0, timeout: float = 30, rate_limiter: RateLimiter | None = None,
+                 circuit_breaker: CircuitBreaker | None = None):
+        self.github_token = github_token
+        self.base_url = base_url.rstrip("/")
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter(github_token)
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else get_circuit_breaker(urlsplit(self.base_url).netloc)
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        The underlying session, created on first use inside the running event loop.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+            self._session = aiohttp.ClientSession(
+                headers=_api_headers(self.github_token), connector=connector, timeout=self.timeout)
+        return self._session
+
+    def url(self, path: str) -> str:
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    async def _send(self, method: str, url: str, kwargs: dict) -> aiohttp.ClientResponse:
+        """
+        Sends one request through the circuit breaker and reads its whole body.
+        """
+        self.circuit_breaker.before_request()
+        try:
+            async with self.session.request(method, url, **kwargs) as response:
+                await response.read()
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
+        except BaseException: # Cancelled or interrupted before an outcome
+            self.circuit_breaker.release_trial()
+            raise
+        self.circuit_breaker.record(response.status)
+        return response
+
+    async def request(self, method: str, path: str, **kwargs) -> aiohttp.ClientResponse:
+        """
+        Sends a request and reads the whole body, so the returned response can be
+        inspected with .status, .json() and .text() after the connection is released.
+        Waits for the rate limiter without blocking the event loop and retries rate-limited
+        responses like GitHubClient.request.
+        Raises circuit_breaker.CircuitOpenError without sending anything while the circuit
+        for the API host is open.
+        """
+        url = self.url(path)
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire_async()
+            response = await self._send(method.upper(), url, kwargs)
+            body = await response.text() if response.status in RATE_LIMIT_STATUSES else ""
+            delay = self.rate_limiter.observe(response.status, response.headers, attempt, body)
+            if delay is None or attempt >= self.rate_limiter.max_retries:
+                return response
+            attempt += 1
+            logging.warning(f"Retrying {method.upper()} {url} after rate limit (attempt {attempt}).")
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+async def _api_request(method: str, path: str, github_token: str, client: AsyncGitHubClient | None, **kwargs) -> aiohttp.ClientResponse:
+    """
+    Sends an API request through client, or through a one-off client when none is given.
+    """
+    if client is None:
+        async with AsyncGitHubClient(github_token) as one_off_client:
+            return await one_off_client.request(method, path, **kwargs)
+    if github_token != client.github_token:
+        kwargs["headers"] = {"Authorization": f"token {github_token}", **kwargs.get("headers", {})}
+    return await client.request(method, path, **kwargs)
+
+
+async def _api_error_message(response: aiohttp.ClientResponse, parse_errors: bool = False) -> str:
+    """
+    Builds the error message for a failed aiohttp API response.
+    """
+    text = await response.text()
+    try:
+        error_details = await response.json(content_type=None)
+    except ValueError:
+        error_details = None
+    return _format_api_error(response.status, text, error_details, parse_errors)
+
+
+async def create_github_repository(repo_name: str, description: str, private: bool, github_token: str, client: AsyncGitHubClient | None = None) -> tuple[dict | None, str | None]:
+    """
+    Creates a new repository on GitHub using the API.
+    Parameters: repo_name, description, private (boolean).
+    Uses github_token for authentication, sending the request through client when one is given.
+    Returns JSON response from API if successful, None otherwise, along with an error message.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for creating a repository.")
+        return None, "GitHub token is required."
+
+    payload = {
+        "name": repo_name,
+        "description": description,
+        "private": private,
+    }
+
+    logging.info(f"Creating GitHub repository '{repo_name}'...")
+    try:
+        response = await _api_request("post", "/user/repos", github_token, client, json=payload)
+        if response.status >= 400:
+            return None, await _api_error_message(response, parse_errors=True)
+        repo_data = await response.json()
+        logging.info(f"Successfully created GitHub repository '{repo_name}'. URL: {repo_data.get('html_url')}")
+        return repo_data, None
+    except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
+        logging.error(f"Request failed: {e}")
+        return None, str(e) or type(e).__name__
+    except Exception as e:
+        logging.error(f"An unexpected error occurred during repository creation: {e}")
+        return None, str(e)
+
+
+async def update_github_repository(owner: str, repo_name: str, github_token: str, description: str = None, homepage: str = None, private: bool = None, client: AsyncGitHubClient | None = None) -> tuple[dict | None, str | None]:
+    """
+    Updates an existing repository on GitHub using the API.
+    Parameters: owner, repo_name, github_token.
+    Optional parameters for update: description, homepage, private (boolean).
+    Returns JSON response from API if successful, None otherwise, along with an error message.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for updating a repository.")
+        return None, "GitHub token is required."
+
+    payload = {}
+    if description is not None:
+        payload["description"] = description
+    if homepage is not None:
+        payload["homepage"] = homepage
+    if private is not None:
+        payload["private"] = private
+
+    if not payload:
+        logging.warning("No update parameters provided for update_github_repository.")
+
+    logging.info(f"Updating GitHub repository '{owner}/{repo_name}' with data: {payload}")
+    try:
+        response = await _api_request("patch", f"/repos/{owner}/{repo_name}", github_token, client, json=payload)
+        if response.status >= 400:
+            return None, await _api_error_message(response)
+        repo_data = await response.json()
+        logging.info(f"Successfully updated GitHub repository '{owner}/{repo_name}'.")
+        return repo_data, None
+    except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
+        logging.error(f"Request failed: {e}")
+        return None, str(e) or type(e).__name__
+    except Exception as e:
+        logging.error(f"An unexpected error occurred during repository update: {e}")
+        return None, str(e)
+
+
+async def delete_github_repository(owner: str, repo_name: str, github_token: str, client: AsyncGitHubClient | None = None) -> tuple[bool, str | None]:
+    """
+    Deletes a repository on GitHub using the API.
+    Parameters: owner, repo_name, github_token.
+    Returns True if successful (status code 204), False otherwise, along with an error message.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for deleting a repository.")
+        return False, "GitHub token is required."
+
+    logging.info(f"Deleting GitHub repository '{owner}/{repo_name}'...")
+    try:
+        response = await _api_request("delete", f"/repos/{owner}/{repo_name}", github_token, client)
+        if response.status >= 400:
+            return False, await _api_error_message(response)
+        if response.status == 204:
+            logging.info(f"Successfully deleted GitHub repository '{owner}/{repo_name}'.")
+            return True, None
+        error_message = f"Delete request returned status {response.status}, expected 204. Response: {await response.text()}"
+        logging.warning(error_message)
+        return False, error_message
+    except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
+        logging.error(f"Request failed: {e}")
+        return False, str(e) or type(e).__name__
+    except Exception as e:
+        logging.error(f"An unexpected error occurred during repository deletion: {e}")
+        return False, str(e)
+
+
+class GitProcessError(Exception):
+    """
+    Raised when a git subprocess exits with a non-zero status.
+    """
+
+    def __init__(self, args: tuple, returncode: int, stderr: str, stdout: str = ""):
+        self.command = args
+        self.returncode = returncode
+        self.stderr = stderr
+        self.stdout = stdout
+        super().__init__(f"git {args[0]} exited with status {returncode}: {stderr.strip()}")
+
+
+async def _run_git(*args: str, cwd: str | None = None, env: dict | None = None) -> str:
+    """
+    Runs git with args without blocking the event loop and returns its stdout.
+    Raises GitProcessError if git fails.
+    """
+    process = await asyncio.create_subprocess_exec(
+        "git", *args, cwd=cwd,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0", **(env or {})},
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise GitProcessError(args, process.returncode, stderr.decode(errors="replace"), stdout.decode(errors="replace"))
+    return stdout.decode(errors="replace")
+
+
+async def clone_repository(repo_url: str, local_path: str, github_token: str) -> tuple[bool, str | None]:
+    """
+    Clones a repository from repo_url to local_path.
+    Uses github_token for authentication if the repository is private.
+    Returns True if successful, False otherwise, along with an error message if any.
+    """
+    try:
+        if not github_token:
+            logging.error("GitHub token is required for cloning.")
+            return False, "GitHub token is required."
+
+        if "://" not in repo_url:
+            logging.error(f"Unexpected repo_url format: {repo_url}")
+            return False, f"Unexpected repo_url format: {repo_url}"
+
+        if os.path.exists(local_path):
+            if os.listdir(local_path):
+                logging.warning(f"Local path '{local_path}' already exists and is not empty. Cloning aborted.")
+                return False, f"Local path '{local_path}' already exists and is not empty."
+        else:
+            os.makedirs(local_path)
+
+        logging.info(f"Cloning repository from {repo_url} to {local_path}...")
+        await _run_git("clone", repo_url, local_path, env=git_auth_env(github_token))
+        logging.info(f"Repository cloned successfully to {local_path}.")
+        return True, None
+    except GitProcessError as e:
+        logging.error(f"Git command error during clone: {e}")
+        return False, str(e)
+    except Exception as e:
+        logging.error(f"An unexpected error occurred during clone: {e}")
+        return False, str(e)
+
+
+def _porcelain_refs(output: str) -> list[tuple[str, str]]:
+    """
+    Returns (flag, summary) for each ref line of `git push --porcelain` output.
+    Ref lines look like "<flag>\t<from>:<to>\t<summary>".
+    """
+    refs = []
+    for line in output.splitlines():
+        parts = line.split("\t")
+        if len(parts) >= 3:
+            refs.append((parts[0], parts[2]))
+    return refs
+
+
+def _push_result(output: str, remote_name: str, branch_name: str) -> tuple[bool, str | None]:
+    """
+    Maps `git push --porcelain` output to push_repository's return contract.
+    """
+    refs = _porcelain_refs(output)
+    if not refs:
+        logging.warning("Push command did not return any info, assuming it might have failed or nothing to push.")
+        return False, "Push command returned no information."
+    flag, summary = refs[0]
+    if flag == "!":
+        logging.warning(f"Push rejected: {summary}")
+        return False, f"Push rejected: {summary}"
+    if flag == "=":
+        logging.info(f"Branch '{branch_name}' is already up to date on remote '{remote_name}'.")
+        return True, f"Branch '{branch_name}' is already up to date."
+    logging.info(f"Push successful to remote '{remote_name}' branch '{branch_name}'. Summary: {summary}")
+    return True, None
+
+
+async def push_repository(local_path: str, remote_name: str = "origin", branch_name: str = "main", github_token: str = None) -> tuple[bool, str | None]:
+    """
+    Pushes changes from local_path to the remote_name on branch_name.
+    Uses github_token for authentication through git_auth_env, leaving the remote URL untouched.
+    Returns True if successful, False otherwise, along with an error message if any.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for pushing.")
+        return False, "GitHub token is required."
+    if not os.path.isdir(local_path):
+        logging.error(f"Invalid git repository at {local_path}.")
+        return False, f"Invalid git repository at {local_path}."
+
+    try:
+        try:
+            await _run_git("remote", "get-url", remote_name, cwd=local_path)
+        except GitProcessError as e:
+            if "not a git repository" in e.stderr:
+                logging.error(f"Invalid git repository at {local_path}.")
+                return False, f"Invalid git repository at {local_path}."
+            logging.error(f"Remote '{remote_name}' does not exist in {local_path}.")
+            return False, f"Remote '{remote_name}' does not exist."
+
+        logging.info(f"Pushing changes from {local_path} to remote '{remote_name}' branch '{branch_name}'...")
+        try:
+            output = await _run_git("push", "--porcelain", remote_name, f"{branch_name}:{branch_name}", cwd=local_path, env=git_auth_env(github_token))
+        except GitProcessError as e:
+            logging.error(f"Git command error during push: {e}")
+            # --porcelain still reports rejected refs on stdout when git exits non-zero
+            if _porcelain_refs(e.stdout):
+                return _push_result(e.stdout, remote_name, branch_name)
+            return False, str(e)
+        return _push_result(output, remote_name, branch_name)
+    except Exception as e:
+        logging.error(f"An unexpected error occurred during push: {e}")
+        return False, str(e)
@@ -0,0 +1,169 @@
+import os
+import logging
+import sqlite3
+import threading
+
+from github_operations.github_ops import GitHubClient, _git_data
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS branches (
+    repo TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    commit_sha TEXT NOT NULL,
+    PRIMARY KEY (repo, branch)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS blobs (
+    repo TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha BLOB NOT NULL,
+    PRIMARY KEY (repo, branch, path)
+) WITHOUT ROWID;
+"""
+
+# SQLite's default limit on host parameters is 999; keep lookups well below it
+_LOOKUP_BATCH = 500
+
+
+class BlobIndex:
+    """
+    Persistent SQLite index of path -> git blob SHA for each (repository, branch), together
+    with the commit the entries were recorded for. Repositories are keyed by "owner/repo".
+    Lets uploads hash files locally and send only those whose blob differs from the branch.
+    Blob SHAs are stored as 20-byte blobs in a WITHOUT ROWID table, so a 100k-file tree takes
+    a few MiB and a lookup reads only the pages of the paths asked for.
+    Parameters: path (database file, created if missing).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+
+    def commit_sha(self, repo: str, branch: str) -> str | None:
+        """
+        Returns the commit the entries of repo/branch were recorded for, or None if it is not indexed.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT commit_sha FROM branches WHERE repo = ? AND branch = ?", (repo, branch)).fetchone()
+        return row[0] if row else None
+
+    def blobs(self, repo: str, branch: str) -> dict[str, str]:
+        """
+        Returns every indexed path of repo/branch with its blob SHA.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path, sha FROM blobs WHERE repo = ? AND branch = ?", (repo, branch)).fetchall()
+        return {path: sha.hex() for path, sha in rows}
+
+    def lookup(self, repo: str, branch: str, paths) -> dict[str, str]:
+        """
+        Returns the indexed blob SHA of each of paths that is present on repo/branch.
+        """
+        paths = list(paths)
+        found = {}
+        with self._lock:
+            for start in range(0, len(paths), _LOOKUP_BATCH):
+                batch = paths[start:start + _LOOKUP_BATCH]
+                rows = self._connection.execute(
+                    f"SELECT path, sha FROM blobs WHERE repo = ? AND branch = ? AND path IN ({', '.join('?' * len(batch))})",
+                    (repo, branch, *batch)).fetchall()
+                found.update((path, sha.hex()) for path, sha in rows)
+        return found
+
+    def changed(self, repo: str, branch: str, candidates: dict[str, str]) -> dict[str, str]:
+        """
+        Returns the entries of candidates (path -> blob SHA) whose blob differs from the index.
+        """
+        indexed = self.lookup(repo, branch, candidates)
+        return {path: sha for path, sha in candidates.items() if indexed.get(path) != sha}
+
+    def replace(self, repo: str, branch: str, commit_sha: str, entries: dict[str, str]):
+        """
+        Records entries (path -> blob SHA) as the complete tree of repo/branch at commit_sha.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM blobs WHERE repo = ? AND branch = ?", (repo, branch))
+            self._connection.executemany(
+                "INSERT INTO blobs (repo, branch, path, sha) VALUES (?, ?, ?, ?)",
+                ((repo, branch, path, bytes.fromhex(sha)) for path, sha in entries.items()))
+            self._set_commit(repo, branch, commit_sha)
+
+    def apply(self, repo: str, branch: str, commit_sha: str, changes: dict[str, str | None]):
+        """
+        Updates repo/branch to commit_sha with changes (path -> blob SHA, or None for deleted paths).
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO blobs (repo, branch, path, sha) VALUES (?, ?, ?, ?)",
+                ((repo, branch, path, bytes.fromhex(sha)) for path, sha in changes.items() if sha is not None))
+            self._connection.executemany(
+                "DELETE FROM blobs WHERE repo = ? AND branch = ? AND path = ?",
+                ((repo, branch, path) for path, sha in changes.items() if sha is None))
+            self._set_commit(repo, branch, commit_sha)
+
+    def _set_commit(self, repo: str, branch: str, commit_sha: str):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO branches (repo, branch, commit_sha) VALUES (?, ?, ?)", (repo, branch, commit_sha))
+
+    def forget(self, repo: str, branch: str):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM blobs WHERE repo = ? AND branch = ?", (repo, branch))
+            self._connection.execute("DELETE FROM branches WHERE repo = ? AND branch = ?", (repo, branch))
+
+    def sync_remote(self, owner: str, repo_name: str, branch: str, commit_sha: str, tree_sha: str, github_token: str, client: GitHubClient | None = None) -> bool:
+        """
+        Makes sure owner/repo_name branch is indexed at commit_sha, its current tip, reading the
+        whole tree_sha from the API only when the index holds another commit.
+        A truncated listing is not recorded, since it would hide files that exist.
+        Returns True if the index now matches commit_sha.
+        Raises requests.exceptions.RequestException if the tree cannot be fetched.
+        """
+        repo = f"{owner}/{repo_name}"
+        if self.commit_sha(repo, branch) == commit_sha:
+            return True
+        logging.info(f"Indexing tree of '{repo}' branch '{branch}' at {commit_sha[:12]}...")
+        listing = _git_data("get", owner, repo_name, f"trees/{tree_sha}", github_token, client, params={"recursive": "1"})
+        if listing.get("truncated"):
+            logging.warning(f"Tree listing of '{repo}' was truncated; not indexing branch '{branch}'.")
+            self.forget(repo, branch)
+            return False
+        self.replace(repo, branch, commit_sha,
+                     {entry["path"]: entry["sha"] for entry in listing.get("tree", []) if entry.get("type") == "blob"})
+        return True
+
+    def record_local(self, repo: str, branch: str, local_repo, rev: str | None = None) -> str:
+        """
+        Records the tree of rev (branch by default) in local_repo, a git.Repo, as repo/branch,
+        reading it with a single `git ls-tree`. Returns the commit SHA recorded.
+        """
+        commit_sha = local_repo.commit(rev or branch).hexsha
+        if self.commit_sha(repo, branch) == commit_sha:
+            return commit_sha
+        entries = {}
+        for line in local_repo.git.ls_tree("-r", "-z", "--full-tree", commit_sha).split("\0"):
+            if not line:
+                continue
+            meta, path = line.split("\t", 1)
+            _, kind, sha = meta.split(" ")
+            if kind == "blob":
+                entries[path] = sha
+        self.replace(repo, branch, commit_sha, entries)
+        return commit_sha
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
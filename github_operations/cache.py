@@ -0,0 +1,86 @@
+import copy
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def _token_key(github_token: str) -> str:
+    """
+    Returns a stable digest of github_token for use in cache keys, so raw tokens are never stored.
+    """
+    return hashlib.sha256(github_token.encode()).hexdigest()
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe LRU cache whose entries also expire ttl seconds after they were stored.
+    Values are deep-copied on the way in and out, so callers that mutate what they stored or
+    got back never change what later callers receive.
+    Parameters: maxsize (entries kept before the least recently used one is evicted), ttl (seconds).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored for key, or default if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def set(self, key, value, ttl: float | None = None):
+        """
+        Stores value for key, evicting the least recently used entry when the cache is full.
+        """
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else copy.deepcopy(entry[1])
+
+    def discard_where(self, predicate) -> int:
+        """
+        Removes every entry whose key satisfies predicate and returns how many were removed.
+        """
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+
+_MISSING = object()
@@ -0,0 +1,120 @@
+import time
+import logging
+import threading
+
+import requests
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """
+    Raised instead of sending a request while the circuit for its host is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast while an upstream is unhealthy.
+    After failure_threshold consecutive failures (connection errors, timeouts or 5xx responses)
+    the circuit opens and requests raise CircuitOpenError without being sent. Once
+    reset_timeout seconds have passed, a single trial request is let through (half-open):
+    its success closes the circuit, its failure opens it again for another reset_timeout.
+    A trial that is abandoned without an outcome (see release_trial), or is still running after
+    reset_timeout, gives its place to the next request.
+    Parameters: failure_threshold, reset_timeout (seconds), name (used in messages).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, name: str = "", clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._trial_started = 0.0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def before_request(self):
+        """
+        Raises CircuitOpenError if a request must not be sent now.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and self._trial_running and self._clock() - self._trial_started >= self.reset_timeout:
+                logging.warning(f"Trial request for {self.name or 'upstream'} expired without an outcome.")
+                self._trial_running = False
+            if self._state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                self._trial_started = self._clock()
+                return
+            self.rejected += 1
+            retry_in = max(self.reset_timeout - (self._clock() - self._opened_at), 0.0)
+        raise CircuitOpenError(f"Circuit for {self.name or 'upstream'} is open after repeated failures; "
+                               f"not sending request (next trial in {retry_in:.1f}s).")
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logging.info(f"Circuit for {self.name or 'upstream'} closed again.")
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logging.warning(f"Circuit for {self.name or 'upstream'} opened after {self._failures} consecutive failures.")
+                self._state = OPEN
+                self._opened_at = self._clock()
+
+    def release_trial(self):
+        """
+        Frees the half-open trial slot of a request that ended without an outcome (e.g. it was
+        cancelled), so the next request is let through as the trial instead.
+        """
+        with self._lock:
+            self._trial_running = False
+
+    def record(self, status_code: int):
+        """
+        Records the outcome of a request from its response status: 5xx counts as a failure.
+        """
+        if status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(host: str, **kwargs) -> CircuitBreaker:
+    """
+    Returns the CircuitBreaker shared by every client talking to host, creating it on first use.
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(name=host, **kwargs)
+            _breakers[host] = breaker
+        return breaker
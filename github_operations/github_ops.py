@@ -1,15 +1,588 @@
 import os
+import re
+import base64
+import glob
+import time
+import hashlib
+import tempfile
+import uuid
+import subprocess
+import threading
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
 import git
 import requests
 import logging
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from github_operations.cache import TTLCache, _token_key
+from github_operations.circuit_breaker import CircuitBreaker, get_circuit_breaker
+from github_operations.lfs import push_lfs_objects
+from github_operations.metrics import current_span, instrumented
+from github_operations.ratelimit import RATE_LIMIT_STATUSES, RateLimiter, get_rate_limiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def clone_repository(repo_url: str, local_path: str, github_token: str) -> tuple[bool, str | None]:
+GITHUB_API_URL = "https://api.github.com"
+# (connect, read) timeout in seconds for API calls that do not set their own
+DEFAULT_TIMEOUT = (5, 30)
+# Requests urllib3 may resend after a read error or a 5xx; POST is left out because a create
+# that timed out may have been applied. Connection failures are retried for every method.
+IDEMPOTENT_METHODS = Retry.DEFAULT_ALLOWED_METHODS | {"PATCH"}
+
+
+def _api_headers(github_token: str) -> dict:
+    """
+    Returns the headers sent with every GitHub API request for github_token.
+    """
+    return {
+        "Authorization": f"token {github_token}",
+        "Accept": "application/vnd.github.v3+json",
+    }
+
+
+def _close_response(future):
+    """
+    Releases the connection of a hedged request whose response lost the race.
+    """
+    if future.exception() is None:
+        future.result().close()
+
+
+class GitHubClient:
+    """
+    Reusable GitHub API client bound to a single token.
+    Keeps a pooled, keep-alive requests.Session so repeated calls reuse TCP/TLS connections
+    and share one set of authentication headers.
+    Parameters: github_token, base_url, pool_connections, pool_maxsize (connections kept per host),
+    max_retries and backoff_factor (for connection errors, and for read errors and 502/503/504
+    responses of idempotent methods), timeout (seconds, or a (connect, read) tuple), rate_limiter,
+    which defaults to the RateLimiter shared by all clients for the same token, circuit_breaker,
+    which defaults to the CircuitBreaker shared by all clients for the same host, and
+    hedge_after: with a number of seconds, or "p95" for the 95th percentile of recent GET
+    latencies, a GET still unanswered after that delay is sent a second time and the first
+    response wins.
+    """
+
+    def __init__(self, github_token: str, base_url: str = GITHUB_API_URL, pool_connections: int = 10,
+                 pool_maxsize: int = 10, max_retries: int = 3, backoff_factor: float = 0.5,
+                 timeout: float | tuple[float, float] = DEFAULT_TIMEOUT, rate_limiter: RateLimiter | None = None,
+                 circuit_breaker: CircuitBreaker | None = None, hedge_after: float | str | None = None):
+        self.github_token = github_token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter(github_token)
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else get_circuit_breaker(urlsplit(self.base_url).netloc)
+        self.hedge_after = hedge_after
+        self.hedged = 0
+        self._get_latencies = deque(maxlen=200)
+        self._hedge_executor = None
+        self._hedge_lock = threading.Lock()
+        self._pool_maxsize = pool_maxsize
+        self.session = requests.Session()
+        self.session.headers.update(_api_headers(github_token))
+        retries = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=IDEMPOTENT_METHODS,
+            respect_retry_after_header=False, # Rate-limit responses are left to rate_limiter
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def url(self, path: str) -> str:
+        """
+        Resolves an API path (e.g. "/user/repos") against base_url. Absolute URLs are returned unchanged.
+        """
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _hedge_delay(self) -> float | None:
+        if self.hedge_after != "p95":
+            return self.hedge_after
+        with self._hedge_lock:
+            latencies = sorted(self._get_latencies)
+        if len(latencies) < 20:
+            return None # Too few samples for a meaningful percentile
+        return latencies[int(len(latencies) * 0.95) - 1]
+
+    def _hedged_get(self, url: str, kwargs: dict) -> requests.Response:
+        """
+        Sends a GET and, if it is still unanswered after the hedge delay, a second identical one.
+        Returns the first response to arrive; the other is closed when it completes.
+        """
+        delay = self._hedge_delay()
+        started = time.perf_counter()
+        if delay is None:
+            response = self.session.request("GET", url, **kwargs)
+        else:
+            with self._hedge_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(max_workers=self._pool_maxsize * 2, thread_name_prefix="github-hedge")
+            attempts = [self._hedge_executor.submit(self.session.request, "GET", url, **kwargs)]
+            done, _ = wait(attempts, timeout=delay)
+            if not done:
+                self.rate_limiter.acquire()
+                attempts.append(self._hedge_executor.submit(self.session.request, "GET", url, **kwargs))
+                self.hedged += 1
+                current_span().add("hedged")
+                done, _ = wait(attempts, return_when=FIRST_COMPLETED)
+            winner = next(iter(done))
+            if winner.exception() is not None and len(attempts) > 1:
+                winner = attempts[1] if winner is attempts[0] else attempts[0]
+            for attempt in attempts:
+                if attempt is not winner:
+                    attempt.add_done_callback(_close_response)
+            response = winner.result()
+        if not kwargs.get("stream"):
+            with self._hedge_lock:
+                self._get_latencies.append(time.perf_counter() - started)
+        return response
+
+    def _send(self, method: str, url: str, kwargs: dict) -> requests.Response:
+        """
+        Sends one request through the circuit breaker, hedging GETs when enabled.
+        """
+        self.circuit_breaker.before_request()
+        try:
+            if method == "GET" and self.hedge_after is not None:
+                response = self._hedged_get(url, kwargs)
+            else:
+                response = self.session.request(method, url, **kwargs)
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
+        except BaseException: # Cancelled or interrupted before an outcome
+            self.circuit_breaker.release_trial()
+            raise
+        self.circuit_breaker.record(response.status_code)
+        return response
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Sends a request through the pooled session, applying the client timeout unless one is given.
+        Waits for the rate limiter before sending and retries rate-limited responses after
+        the backoff it prescribes; the last response is returned once retries run out.
+        Raises circuit_breaker.CircuitOpenError, a RequestException, without sending anything
+        while the circuit for the API host is open.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        url = self.url(path)
+        active = current_span()
+        attempt = 0
+        while True:
+            waited = self.rate_limiter.acquire()
+            with active.phase("api_response"):
+                response = self._send(method.upper(), url, kwargs)
+            if active:
+                _record_response(active, response, waited, stream=kwargs.get("stream", False))
+            body = response.text if response.status_code in RATE_LIMIT_STATUSES else ""
+            delay = self.rate_limiter.observe(response.status_code, response.headers, attempt, body)
+            if delay is None or attempt >= self.rate_limiter.max_retries:
+                return response
+            attempt += 1
+            active.add("retries")
+            if hasattr(kwargs.get("data"), "seek"):
+                kwargs["data"].seek(0) # Streamed bodies are consumed by the rejected attempt
+            logging.warning(f"Retrying {method.upper()} {url} after rate limit (attempt {attempt}).")
+
+    def close(self):
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _record_response(active, response: requests.Response, rate_limit_wait: float = 0.0, stream: bool = False):
+    """
+    Adds the request count, bytes sent and received and rate-limit wait of one API round trip to
+    the active metrics span. Streamed response bodies are not read, so they count as zero bytes.
+    """
+    active.add("requests")
+    sent = response.request.body
+    active.add("bytes_sent", len(sent) if hasattr(sent, "__len__") else 0)
+    active.add("bytes_received", 0 if stream else len(response.content))
+    if rate_limit_wait:
+        active.add("rate_limit_wait", rate_limit_wait)
+
+
+# Shared clients of calls made without client=, keyed by token digest (see get_github_client)
+MAX_SHARED_CLIENTS = 256
+_clients: OrderedDict[str, GitHubClient] = OrderedDict()
+_clients_lock = threading.Lock()
+
+
+def get_github_client(github_token: str, **kwargs) -> GitHubClient:
+    """
+    Returns the shared GitHubClient for github_token, creating it on first use.
+    Keyword arguments are passed to GitHubClient only when the client is created.
+    Beyond MAX_SHARED_CLIENTS tokens the least recently used client is dropped; it is not
+    closed, since a call may still be using it, and its connections go with it once released.
+    """
+    key = _token_key(github_token)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = GitHubClient(github_token, **kwargs)
+            _clients[key] = client
+        _clients.move_to_end(key)
+        while len(_clients) > MAX_SHARED_CLIENTS:
+            _clients.popitem(last=False)
+        return client
+
+
+def _api_request(method: str, path: str, github_token: str, client: GitHubClient | None = None, **kwargs) -> requests.Response:
+    """
+    Sends an API request for path through client, or through the shared client for github_token
+    (see get_github_client) when none is given, so every call is paced by the token's RateLimiter,
+    guarded by the API host's CircuitBreaker and retried on connection errors.
+    """
+    headers = kwargs.pop("headers", {})
+    if client is None:
+        client = get_github_client(github_token)
+    elif github_token != client.github_token:
+        headers = {"Authorization": f"token {github_token}", **headers}
+    return client.request(method, path, headers=headers or None, **kwargs)
+
+
+def _format_api_error(status_code: int, text: str, error_details: dict | None, parse_errors: bool = False) -> str:
+    """
+    Builds the error message for a failed API response from its status, raw text and parsed JSON body.
+    Prefers GitHub's own 'message' (or the 'errors' list when parse_errors is set)
+    over the raw response text.
+    """
+    error_message = f"API request failed with status {status_code}: {text}"
+    logging.error(error_message)
+    if not isinstance(error_details, dict): # If response is not JSON
+        return error_message # Keep the original error_message from response text
+    if parse_errors and 'errors' in error_details and error_details['errors']:
+        detailed_errors = [err.get('message', 'Unknown error') for err in error_details['errors']]
+        error_message = f"API request failed: {'; '.join(detailed_errors)}"
+    elif 'message' in error_details:
+        error_message = f"API request failed: {error_details['message']}"
+    return error_message
+
+
+# Conditional-request cache for API reads, keyed by (token hash, path, query params).
+# Entries hold (etag, data) so unchanged resources are revalidated with a 304.
+_response_cache = TTLCache(maxsize=1024, ttl=300)
+
+
+def _cached_get(path: str, github_token: str, client: GitHubClient | None = None, params: dict | None = None, cache: TTLCache | None = None):
+    """
+    GETs path, revalidating any cached copy with If-None-Match.
+    Returns the cached data on 304 Not Modified, otherwise the fresh JSON body, which is cached
+    when the response carries an ETag. Raises requests.exceptions.HTTPError for error responses.
+    """
+    cache = _response_cache if cache is None else cache
+    key = (_token_key(github_token), path, tuple(sorted((params or {}).items())))
+    entry = cache.get(key)
+    headers = {"If-None-Match": entry[0]} if entry else {}
+    response = _api_request("get", path, github_token, client, headers=headers, params=params)
+    if response.status_code == 304 and entry:
+        logging.info(f"Cached response for '{path}' is still current (304 Not Modified).")
+        cache.set(key, entry)
+        return entry[1]
+    try:
+        response.raise_for_status()
+    except requests.exceptions.HTTPError as e:
+        e.response = response if e.response is None else e.response
+        raise
+    data = response.json()
+    etag = response.headers.get("ETag")
+    if etag:
+        cache.set(key, (etag, data))
+    return data
+
+
+def _invalidate_cached_repository(owner: str | None, repo_name: str | None, cache: TTLCache | None = None):
+    """
+    Drops cached reads of owner/repo_name and every cached repository listing after a write.
+    """
+    cache = _response_cache if cache is None else cache
+    repo_path = f"/repos/{owner}/{repo_name}"
+
+    def is_stale(key):
+        path = key[1]
+        return path == repo_path or path.startswith(repo_path + "/") or path.endswith("/repos")
+
+    removed = cache.discard_where(is_stale)
+    if removed:
+        logging.info(f"Invalidated {removed} cached response(s) for '{owner}/{repo_name}'.")
+
+
+def _api_error_message(response: requests.Response, parse_errors: bool = False) -> str:
+    """
+    Builds the error message for a failed requests API response.
+    """
+    try:
+        error_details = response.json()
+    except ValueError:
+        error_details = None
+    return _format_api_error(response.status_code, response.text, error_details, parse_errors)
+
+
+# Successful token validations, keyed by token hash; see validate_token
+_token_cache = TTLCache(maxsize=256, ttl=300)
+
+# Classic OAuth scopes that include narrower ones, per GitHub's scope documentation
+_IMPLIED_SCOPES = {
+    "repo": {"public_repo", "repo:status", "repo_deployment", "repo:invite", "security_events"},
+    "admin:org": {"write:org", "read:org"},
+    "write:org": {"read:org"},
+    "admin:public_key": {"write:public_key", "read:public_key"},
+    "write:public_key": {"read:public_key"},
+    "admin:repo_hook": {"write:repo_hook", "read:repo_hook"},
+    "write:repo_hook": {"read:repo_hook"},
+    "admin:gpg_key": {"write:gpg_key", "read:gpg_key"},
+    "write:gpg_key": {"read:gpg_key"},
+    "user": {"read:user", "user:email", "user:follow"},
+    "write:packages": {"read:packages"},
+    "project": {"read:project"},
+}
+
+
+def _int_header(headers, name: str) -> int | None:
+    value = headers.get(name)
+    return int(value) if value and value.isdigit() else None
+
+
+def missing_scopes(token_info: dict, required_scopes) -> list[str]:
+    """
+    Returns the scopes of required_scopes that the validated token of token_info lacks, taking
+    implied scopes into account ("repo" grants "public_repo"). Fine-grained tokens report no
+    scopes (scopes is None); their permissions cannot be checked up front, so nothing is missing.
+    """
+    if token_info.get("scopes") is None:
+        return []
+    granted = set(token_info["scopes"])
+    for scope in token_info["scopes"]:
+        granted |= _IMPLIED_SCOPES.get(scope, set())
+    return [scope for scope in required_scopes or () if scope not in granted]
+
+
+def validate_token(github_token: str, required_scopes: list[str] | None = None, client: GitHubClient | None = None, token_cache=None, refresh: bool = False) -> tuple[dict | None, str | None]:
+    """
+    Checks github_token against GET /user, like validateGitHubToken in the frontend.
+    Parameters: github_token, required_scopes (classic OAuth scopes the caller needs, e.g. ["repo"]),
+    token_cache (a TTLCache or a persistent token_cache.TokenCache; the module cache by default)
+    and refresh (skip the cached validation).
+    Successful validations are cached under the token's hash, so checking the same token again
+    within the cache's ttl sends no request; failed ones are not cached.
+    Returns a dict with login, scopes (list of granted scopes, None for fine-grained tokens),
+    rate_limit, rate_remaining, rate_reset (epoch seconds) and checked_at if the token is valid
+    and has every required scope, None otherwise, along with an error message if any.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for validation.")
+        return None, "GitHub token is required."
+
+    cache = _token_cache if token_cache is None else token_cache
+    key = _token_key(github_token)
+    info = None if refresh else cache.get(key)
+    if info is None:
+        try:
+            response = _api_request("get", "/user", github_token, client)
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Token validation request failed: {e}")
+            return None, str(e)
+        if response.status_code != 200:
+            logging.warning(f"GitHub token rejected (status {response.status_code}).")
+            return None, _api_error_message(response)
+        scopes = response.headers.get("X-OAuth-Scopes")
+        info = {
+            "login": response.json().get("login"),
+            "scopes": None if scopes is None else [scope.strip() for scope in scopes.split(",") if scope.strip()],
+            "rate_limit": _int_header(response.headers, "X-RateLimit-Limit"),
+            "rate_remaining": _int_header(response.headers, "X-RateLimit-Remaining"),
+            "rate_reset": _int_header(response.headers, "X-RateLimit-Reset"),
+            "checked_at": time.time(),
+        }
+        cache.set(key, info)
+        logging.info(f"Validated GitHub token for '{info['login']}'.")
+
+    missing = missing_scopes(info, required_scopes)
+    if missing:
+        logging.error(f"GitHub token for '{info['login']}' lacks required scopes: {', '.join(missing)}.")
+        return None, f"GitHub token is missing required scopes: {', '.join(missing)}."
+    return info, None
+
+
+def git_auth_env(github_token: str) -> dict:
+    """
+    Returns environment variables that authenticate a single git invocation with github_token.
+    The token is sent as an http.extraHeader through GIT_CONFIG_COUNT/KEY/VALUE (git 2.31+),
+    so it never appears in remote URLs, command lines or .git/config, and concurrent git
+    processes working on the same clone do not contend for the config lock.
+    """
+    base = int(os.environ.get("GIT_CONFIG_COUNT", "0") or 0)
+    credentials = base64.b64encode(f"x-access-token:{github_token}".encode()).decode()
+    return {
+        "GIT_CONFIG_COUNT": str(base + 1),
+        f"GIT_CONFIG_KEY_{base}": "http.extraHeader",
+        f"GIT_CONFIG_VALUE_{base}": f"Authorization: Basic {credentials}",
+        "GIT_TERMINAL_PROMPT": "0",
+    }
+
+
+def normalize_repo_url(repo_url: str) -> str:
+    """
+    Returns a canonical form of repo_url for use as a cache key: credentials removed,
+    scheme and host lowercased, and any trailing slash or ".git" suffix dropped.
+    """
+    url = repo_url.strip()
+    if "://" in url:
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+        if parts.port:
+            host = f"{host}:{parts.port}"
+        url = urlunsplit((parts.scheme.lower(), host.lower(), parts.path, "", ""))
+    url = url.rstrip("/")
+    if url.endswith(".git"):
+        url = url[:-4]
+    return url
+
+
+def repo_full_name(repo_url: str) -> str:
+    """
+    Returns the "owner/repo" name of a remote URL, e.g. "octo/app" for https://github.com/octo/app.git.
+    """
+    path = urlsplit(normalize_repo_url(repo_url)).path if "://" in repo_url else normalize_repo_url(repo_url)
+    return "/".join(path.strip("/").split("/")[-2:])
+
+
+_SIZE_UNITS = {"bytes": 1, "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3, "TiB": 1024 ** 4}
+_TRANSFER_PATTERN = re.compile(r"([\d.]+) (bytes|KiB|MiB|GiB|TiB)(?: \| ([\d.]+) (bytes|KiB|MiB|GiB|TiB)/s)?")
+
+
+_PROGRESS_PHASES = {
+    git.RemoteProgress.COUNTING: "negotiate",
+    git.RemoteProgress.COMPRESSING: "negotiate",
+    git.RemoteProgress.FINDING_SOURCES: "negotiate",
+    git.RemoteProgress.RECEIVING: "transfer",
+    git.RemoteProgress.WRITING: "transfer",
+    git.RemoteProgress.RESOLVING: "resolve",
+    git.RemoteProgress.CHECKING_OUT: "checkout",
+}
+
+
+class TransferProgress(git.RemoteProgress):
+    """
+    RemoteProgress that records how much a clone, fetch or push transferred.
+    After the operation, objects holds the number of objects received (or written, for a push),
+    bytes the size of the pack and bytes_per_second the last reported throughput (None if git
+    did not report it). phases maps "connect" (until git reports progress), "negotiate"
+    (counting and compressing), "transfer", "resolve" and "checkout" to the seconds spent in them.
+    If callback is given, it is called as callback(label, stats) on every receiving update.
+    """
+
+    def __init__(self, callback=None, label: str | None = None):
+        super().__init__()
+        self.callback = callback
+        self.label = label
+        self.objects = 0
+        self.bytes = None
+        self.bytes_per_second = None
+        self.started = time.monotonic()
+        self.phases = {}
+        self._phase = "connect"
+        self._phase_started = self.started
+
+    def _enter_phase(self, phase: str | None):
+        now = time.monotonic()
+        if self._phase is not None:
+            self.phases[self._phase] = self.phases.get(self._phase, 0.0) + now - self._phase_started
+        self._phase = phase
+        self._phase_started = now
+
+    def update(self, op_code, cur_count, max_count=None, message=""):
+        phase = _PROGRESS_PHASES.get(op_code & self.OP_MASK)
+        if phase is not None and phase != self._phase:
+            self._enter_phase(phase)
+        if not op_code & (self.RECEIVING | self.WRITING):
+            return
+        self.objects = int(max_count or cur_count or 0)
+        match = _TRANSFER_PATTERN.search(message or "")
+        if match:
+            self.bytes = int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+            if match.group(3):
+                self.bytes_per_second = float(match.group(3)) * _SIZE_UNITS[match.group(4)]
+        if self.callback is not None and op_code & self.RECEIVING:
+            self.callback(self.label, {
+                "objects_received": int(cur_count or 0),
+                "objects_total": int(max_count or 0) or None,
+                "bytes": self.bytes,
+                "bytes_per_second": self.bytes_per_second,
+                "done": bool(op_code & self.END),
+            })
+
+    def stop(self):
+        """
+        Closes the phase in progress once git has exited.
+        """
+        if self._phase is not None:
+            self._enter_phase(None)
+
+    def finish(self, local_path: str):
+        """
+        Closes the phase in progress and fills in bytes from the received pack files when git
+        did not report a size (small or local transfers finish before git prints one).
+        """
+        self.stop()
+        if self.bytes is None:
+            git_dir = os.path.join(local_path, ".git")
+            packs = glob.glob(os.path.join(git_dir if os.path.isdir(git_dir) else local_path, "objects", "pack", "*.pack"))
+            self.bytes = sum(os.path.getsize(pack) for pack in packs)
+
+
+def _metrics_progress(progress: TransferProgress | None) -> TransferProgress | None:
+    """
+    Returns progress, or a new TransferProgress when a metrics span is active so that
+    the phases of the git transfer can be reported with it.
+    """
+    if progress is None and current_span():
+        return TransferProgress()
+    return progress
+
+
+def _record_transfer(progress: TransferProgress | None):
+    """
+    Adds the phases, objects and bytes of a finished git transfer to the active metrics span.
+    """
+    active = current_span()
+    if progress is None or not active:
+        return
+    for phase, seconds in progress.phases.items():
+        active.add_phase(phase, seconds)
+    active.add("objects", progress.objects)
+    active.add("bytes", progress.bytes or 0)
+
+
+@instrumented("clone")
+def clone_repository(repo_url: str, local_path: str, github_token: str, depth: int | None = None, branch: str | None = None, single_branch: bool = False, filter_spec: str | None = None, sparse_paths: list[str] | None = None, progress: TransferProgress | None = None, mirror_cache=None, required_scopes: list[str] | None = None, token_cache=None) -> tuple[bool, str | None]:
     """
     Clones a repository from repo_url to local_path.
     Uses github_token for authentication if the repository is private.
+    Optional clone modes: depth (shallow history), branch and single_branch (fetch one branch only),
+    filter_spec (partial clone filter such as "blob:none" or "tree:0") and sparse_paths
+    (directories to check out, everything else stays out of the working tree).
+    Pass a TransferProgress as progress to get the objects and bytes transferred.
+    With a MirrorCache as mirror_cache, the cached mirror of repo_url is refreshed and used as a
+    --reference (then dissociated), so only objects missing from the mirror are downloaded.
+    With required_scopes (e.g. ["repo"] for a private repository), the token is checked with
+    validate_token, cached in token_cache, before anything is downloaded.
     Returns True if successful, False otherwise, along with an error message if any.
     """
     try:
@@ -17,12 +590,13 @@ def clone_repository(repo_url: str, local_path: str, github_token: str) -> tuple
             logging.error("GitHub token is required for cloning.")
             return False, "GitHub token is required."
 
-        # Construct the authenticated URL
+        if required_scopes is not None:
+            token_info, error = validate_token(github_token, required_scopes, token_cache=token_cache)
+            if token_info is None:
+                return False, error
+
         # Assuming repo_url is like https://github.com/user/repo.git
-        if "://" in repo_url:
-            protocol, rest_of_url = repo_url.split("://", 1)
-            authenticated_url = f"{protocol}://{github_token}@{rest_of_url}"
-        else:
+        if "://" not in repo_url:
             # Fallback or error if URL format is unexpected
             logging.error(f"Unexpected repo_url format: {repo_url}")
             return False, f"Unexpected repo_url format: {repo_url}"
@@ -37,8 +611,36 @@ def clone_repository(repo_url: str, local_path: str, github_token: str) -> tuple
             os.makedirs(local_path)
             logging.info(f"Created local directory '{local_path}'.")
 
+        clone_options = {}
+        if depth is not None:
+            clone_options["depth"] = depth
+        if branch is not None:
+            clone_options["branch"] = branch
+        if single_branch:
+            clone_options["single_branch"] = True
+        if filter_spec is not None:
+            clone_options["filter"] = filter_spec
+        if sparse_paths:
+            clone_options["sparse"] = True
+        progress = _metrics_progress(progress)
+        if progress is not None:
+            clone_options["progress"] = progress
+
         logging.info(f"Cloning repository from {repo_url} to {local_path}...")
-        git.Repo.clone_from(authenticated_url, local_path)
+        auth_env = git_auth_env(github_token)
+        with mirror_cache.reference(repo_url, github_token) if mirror_cache is not None else nullcontext() as mirror:
+            if mirror is not None:
+                clone_options["reference"] = mirror
+                clone_options["dissociate"] = True
+            repo = git.Repo.clone_from(repo_url, local_path, env=auth_env, **clone_options)
+        if sparse_paths:
+            # A partial clone fetches the blobs of the selected paths from origin here
+            repo.git.sparse_checkout("set", *sparse_paths, env=auth_env)
+            logging.info(f"Sparse checkout limited to: {', '.join(sparse_paths)}")
+        if progress is not None:
+            progress.finish(local_path)
+            _record_transfer(progress)
+            logging.info(f"Clone transferred {progress.objects} objects, {progress.bytes} bytes.")
         logging.info(f"Repository cloned successfully to {local_path}.")
         return True, None
     except git.GitCommandError as e:
@@ -48,6 +650,281 @@ def clone_repository(repo_url: str, local_path: str, github_token: str) -> tuple
         logging.error(f"An unexpected error occurred during clone: {e}")
         return False, str(e)
 
+
+def clone_repositories(jobs: list[dict], github_token: str, max_parallel: int = 4, progress_callback=None, mirror_cache=None) -> tuple[list[dict], dict]:
+    """
+    Clones many repositories concurrently, at most max_parallel at a time.
+    Parameters: jobs, a list of dicts with repo_url and local_path plus any clone_repository
+    options (depth, branch, single_branch, filter_spec, sparse_paths, and github_token to override
+    the default token). progress_callback, if given, is called as callback(repo_url, stats) with
+    objects received and throughput as each clone progresses, from the worker threads.
+    Returns one result dict per job in input order (repo_url, local_path, success, error,
+    seconds, objects, bytes) and a summary dict with totals and wall-clock time.
+    """
+    def run(job):
+        options = dict(job)
+        repo_url = options.pop("repo_url")
+        local_path = options.pop("local_path")
+        token = options.pop("github_token", github_token)
+        progress = TransferProgress(callback=progress_callback, label=repo_url)
+        started = time.monotonic()
+        success, error = clone_repository(repo_url, local_path, token, progress=progress, mirror_cache=mirror_cache, **options)
+        return {
+            "repo_url": repo_url,
+            "local_path": local_path,
+            "success": success,
+            "error": error,
+            "seconds": time.monotonic() - started,
+            "objects": progress.objects,
+            "bytes": progress.bytes or 0,
+        }
+
+    logging.info(f"Cloning {len(jobs)} repositories with up to {max_parallel} in parallel...")
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        results = list(executor.map(run, jobs))
+    wall_seconds = time.monotonic() - started
+
+    succeeded = sum(1 for result in results if result["success"])
+    summary = {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "wall_seconds": wall_seconds,
+        "clone_seconds": sum(result["seconds"] for result in results),
+        "objects": sum(result["objects"] for result in results),
+        "bytes": sum(result["bytes"] for result in results),
+        "slowest": max(results, key=lambda result: result["seconds"])["repo_url"] if results else None,
+    }
+    logging.info(f"Cloned {succeeded}/{len(results)} repositories in {wall_seconds:.1f}s "
+                 f"({summary['clone_seconds']:.1f}s of clone time, {summary['bytes']} bytes).")
+    return results, summary
+
+
+_SNAPSHOT_FORMATS = ("tar", "tar.gz", "zip", "bundle")
+
+
+def _snapshot_command(snapshot_format: str, ref: str) -> list[str]:
+    if snapshot_format == "bundle":
+        return ["git", "bundle", "create", "-", ref]
+    return ["git", "archive", f"--format={snapshot_format}", ref]
+
+
+def _stream_git(args: list[str], cwd: str, out, chunk_size: int) -> int:
+    """
+    Runs a git command in cwd with its stdout going to out and returns the bytes written.
+    A path is opened and handed to git directly, so the data never passes through Python;
+    file-like objects are fed chunk by chunk. Memory use is constant either way.
+    stderr goes to a temporary file, so git cannot block on a full pipe while stdout is read.
+    Raises git.GitCommandError if git fails.
+    """
+    env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+    with tempfile.TemporaryFile() as stderr_file:
+        if isinstance(out, (str, os.PathLike)):
+            with open(out, "wb") as f:
+                process = subprocess.run(args, cwd=cwd, stdout=f, stderr=stderr_file, env=env)
+                written = f.tell()
+        else:
+            written = 0
+            with subprocess.Popen(args, cwd=cwd, stdout=subprocess.PIPE, stderr=stderr_file, env=env) as process:
+                for chunk in iter(lambda: process.stdout.read(chunk_size), b""):
+                    out.write(chunk)
+                    written += len(chunk)
+        if process.returncode != 0:
+            stderr_file.seek(0)
+            raise git.GitCommandError(args, process.returncode, stderr_file.read())
+    return written
+
+
+def export_repository_snapshot(repo_url: str, ref: str, out, github_token: str, snapshot_format: str = "tar", mirror_cache=None, chunk_size: int = 1024 ** 2) -> tuple[dict | None, str | None]:
+    """
+    Writes a snapshot of ref of repo_url to out, a path or writable binary file object,
+    without creating a working tree.
+    snapshot_format is "tar", "tar.gz" or "zip" for a `git archive` of the tree at ref (only
+    the tip is fetched, with depth 1), or "bundle" for a `git bundle` of ref and its history
+    that can be cloned from later.
+    Objects are fetched into a temporary bare repository, or read from the MirrorCache given as
+    mirror_cache, and git's output is streamed to out. A path is written through a temporary
+    file next to it that replaces out only once the snapshot is complete, so a failed export
+    leaves any existing file at out untouched.
+    Uses github_token for authentication through git_auth_env.
+    Returns a dict (ref, commit, format, bytes) if successful, None otherwise, along with an error message.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for exporting a snapshot.")
+        return None, "GitHub token is required."
+    if snapshot_format not in _SNAPSHOT_FORMATS:
+        return None, f"Unknown snapshot format '{snapshot_format}', expected one of {', '.join(_SNAPSHOT_FORMATS)}."
+    if "://" not in repo_url:
+        logging.error(f"Unexpected repo_url format: {repo_url}")
+        return None, f"Unexpected repo_url format: {repo_url}"
+
+    local_ref = ref if ref.startswith("refs/") else f"refs/heads/{ref}"
+    logging.info(f"Exporting {snapshot_format} snapshot of {repo_url} '{ref}'...")
+    partial = None
+    try:
+        if isinstance(out, (str, os.PathLike)):
+            directory, name = os.path.split(os.path.abspath(out))
+            partial = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:12]}.partial")
+        if mirror_cache is not None:
+            source = mirror_cache.reference(repo_url, github_token)
+        else:
+            source = tempfile.TemporaryDirectory(prefix="snapshot-")
+        with source as git_dir:
+            if mirror_cache is None:
+                repo = git.Repo.init(git_dir, bare=True)
+                fetch_options = ["--depth=1"] if snapshot_format != "bundle" else []
+                repo.git.fetch(*fetch_options, "--no-tags", repo_url, f"+{ref}:{local_ref}", env=git_auth_env(github_token))
+            else:
+                repo = git.Repo(git_dir)
+                local_ref = ref # The mirror has every ref of the remote under its own name
+            commit = repo.git.rev_parse("--verify", f"{local_ref}^{{commit}}")
+            written = _stream_git(_snapshot_command(snapshot_format, local_ref), git_dir, out if partial is None else partial, chunk_size)
+        if partial is not None:
+            os.replace(partial, out)
+            partial = None
+        logging.info(f"Exported {repo_url} '{ref}' at {commit[:12]} ({written} bytes).")
+        return {"ref": ref, "commit": commit, "format": snapshot_format, "bytes": written}, None
+    except git.GitCommandError as e:
+        logging.error(f"Git command error during snapshot export: {e}")
+        return None, str(e)
+    except Exception as e:
+        logging.error(f"An unexpected error occurred during snapshot export: {e}")
+        return None, str(e)
+    finally:
+        if partial is not None and os.path.exists(partial):
+            os.remove(partial)
+
+
+def export_repository_snapshots(jobs: list[dict], github_token: str, max_parallel: int = 4, mirror_cache=None) -> tuple[list[dict], dict]:
+    """
+    Exports many snapshots concurrently, at most max_parallel at a time.
+    Parameters: jobs, a list of dicts with repo_url, ref and out plus, optionally,
+    snapshot_format and github_token to override the default token.
+    Returns one result dict per job in input order (repo_url, ref, success, error, seconds,
+    commit, bytes) and a summary dict with totals and wall-clock time.
+    """
+    def run(job):
+        options = dict(job)
+        repo_url = options.pop("repo_url")
+        ref = options.pop("ref")
+        token = options.pop("github_token", github_token)
+        started = time.monotonic()
+        snapshot, error = export_repository_snapshot(repo_url, ref, options.pop("out"), token, mirror_cache=mirror_cache, **options)
+        return {
+            "repo_url": repo_url,
+            "ref": ref,
+            "success": snapshot is not None,
+            "error": error,
+            "seconds": time.monotonic() - started,
+            "commit": snapshot["commit"] if snapshot else None,
+            "bytes": snapshot["bytes"] if snapshot else 0,
+        }
+
+    logging.info(f"Exporting {len(jobs)} snapshots with up to {max_parallel} in parallel...")
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        results = list(executor.map(run, jobs))
+    wall_seconds = time.monotonic() - started
+
+    succeeded = sum(1 for result in results if result["success"])
+    summary = {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "wall_seconds": wall_seconds,
+        "bytes": sum(result["bytes"] for result in results),
+    }
+    logging.info(f"Exported {succeeded}/{len(results)} snapshots in {wall_seconds:.1f}s ({summary['bytes']} bytes).")
+    return results, summary
+
+
+def _open_repo(local_path: str, repo_cache=None):
+    """
+    Returns a context manager yielding a git.Repo for local_path, leased from repo_cache
+    when one is given so its git helper processes are reused across calls.
+    """
+    if repo_cache is not None:
+        return repo_cache.lease(local_path)
+    return nullcontext(git.Repo(local_path))
+
+
+def sync_repository(repo_url: str, local_path: str, github_token: str, branch: str | None = None, mode: str = "ff", repo_cache=None, **clone_options) -> tuple[dict | None, str | None]:
+    """
+    Brings local_path up to date with branch of repo_url, cloning it first if needed.
+    An existing clone of the same remote is updated in place: only new objects are fetched, then
+    the branch is fast-forwarded (mode "ff") or hard reset to the remote tip (mode "reset").
+    Uses github_token for authentication through git_auth_env; it is never written to the clone's config.
+    Pass a RepoCache as repo_cache to reuse an open handle for local_path across calls.
+    Extra keyword arguments are passed to clone_repository when a clone is needed.
+    Returns a dict describing what changed (action: "cloned", "updated" or "unchanged", before,
+    after, commits, changed_files as (status, path) pairs) if successful, None otherwise,
+    along with an error message.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for syncing.")
+        return None, "GitHub token is required."
+    if mode not in ("ff", "reset"):
+        return None, f"Unknown sync mode '{mode}', expected 'ff' or 'reset'."
+
+    if not os.path.exists(local_path) or not os.listdir(local_path):
+        if branch is not None:
+            clone_options.setdefault("branch", branch)
+        success, error = clone_repository(repo_url, local_path, github_token, **clone_options)
+        if not success:
+            return None, error
+        with _open_repo(local_path, repo_cache) as repo:
+            head = repo.head.commit.hexsha
+        return {"action": "cloned", "before": None, "after": head, "commits": None, "changed_files": None}, None
+
+    try:
+        with _open_repo(local_path, repo_cache) as repo:
+            origin_url = repo.remote("origin").url
+            if normalize_repo_url(origin_url) != normalize_repo_url(repo_url):
+                logging.error(f"'{local_path}' is a clone of {origin_url}, not {repo_url}.")
+                return None, f"Local path '{local_path}' is a clone of a different repository."
+
+            branch = branch or repo.active_branch.name
+            tracking_ref = f"refs/remotes/origin/{branch}"
+            # Every command that may read objects gets the credentials: in a partial clone,
+            # checkout, reset, merge and diff fetch missing blobs from origin on demand.
+            auth_env = git_auth_env(github_token)
+            logging.info(f"Fetching '{branch}' from {repo_url} into {local_path}...")
+            repo.git.fetch(repo_url, f"+refs/heads/{branch}:{tracking_ref}", env=auth_env)
+            if repo.active_branch.name != branch:
+                if mode == "reset":
+                    repo.git.checkout("-B", branch, tracking_ref, env=auth_env)
+                else:
+                    repo.git.checkout(branch, env=auth_env)
+
+            before = repo.head.commit.hexsha
+            after = repo.commit(tracking_ref).hexsha
+            if before == after:
+                logging.info(f"'{local_path}' is already up to date with {repo_url} '{branch}'.")
+                return {"action": "unchanged", "before": before, "after": after, "commits": 0, "changed_files": []}, None
+
+            if mode == "reset":
+                repo.git.reset("--hard", tracking_ref, env=auth_env)
+            else:
+                repo.git.merge("--ff-only", tracking_ref, env=auth_env)
+
+            commits = int(repo.git.rev_list("--count", f"{before}..{after}"))
+            changed_files = [tuple(line.split("\t", 1)) for line in repo.git.diff("--name-status", before, after, env=auth_env).splitlines()]
+            logging.info(f"Synced '{local_path}' to {after[:12]} ({commits} new commits, {len(changed_files)} files changed).")
+            return {"action": "updated", "before": before, "after": after, "commits": commits, "changed_files": changed_files}, None
+    except git.InvalidGitRepositoryError:
+        logging.error(f"Invalid git repository at {local_path}.")
+        return None, f"Invalid git repository at {local_path}."
+    except ValueError as e: # Raised by repo.remote() for a missing origin
+        logging.error(f"Cannot sync {local_path}: {e}")
+        return None, str(e)
+    except git.GitCommandError as e:
+        logging.error(f"Git command error during sync: {e}")
+        return None, str(e)
+    except Exception as e:
+        logging.error(f"An unexpected error occurred during sync: {e}")
+        return None, str(e)
+
 if __name__ == '__main__':
     # Example usage (replace with your actual details and ensure the token has repo scope)
     # Note: For security, avoid hardcoding tokens. Use environment variables or a config file.
@@ -78,82 +955,212 @@ if __name__ == '__main__':
     # pass # Placeholder for further function implementations and tests
 
 
-def push_repository(local_path: str, remote_name: str = "origin", branch_name: str = "main", github_token: str = None) -> tuple[bool, str | None]:
+_PUSH_FAILURE_FLAGS = git.PushInfo.ERROR | git.PushInfo.REJECTED | git.PushInfo.REMOTE_REJECTED | git.PushInfo.REMOTE_FAILURE
+
+
+def _refspec_destination(refspec: str) -> str:
+    """
+    Returns the remote ref a refspec updates, e.g. "main" for "+feature:main" or ":main".
+    """
+    destination = refspec.lstrip("+").split(":")[-1]
+    return destination or refspec.lstrip("+")
+
+
+def _push_ref_results(refspecs: list[str], push_info: list) -> dict[str, tuple[bool, str | None]]:
+    """
+    Maps every PushInfo entry back to the refspec it answers, as a (success, message) tuple.
+    Refspecs git reported nothing for are marked as failed.
+    """
+    by_remote_ref = {pi.remote_ref_string: pi for pi in push_info}
+    results = {}
+    for refspec in refspecs:
+        destination = _refspec_destination(refspec)
+        candidates = [destination] if destination.startswith("refs/") else [f"refs/heads/{destination}", f"refs/tags/{destination}"]
+        pi = next((by_remote_ref[ref] for ref in candidates if ref in by_remote_ref), None)
+        if pi is None:
+            results[refspec] = (False, "Push command returned no information for this ref.")
+        elif pi.flags & _PUSH_FAILURE_FLAGS:
+            results[refspec] = (False, f"Push rejected: {pi.summary.strip()}" if pi.flags & (git.PushInfo.REJECTED | git.PushInfo.REMOTE_REJECTED) else f"Push failed: {pi.summary.strip()}")
+        elif pi.flags & git.PushInfo.UP_TO_DATE:
+            results[refspec] = (True, f"Ref '{destination}' is already up to date.")
+        else:
+            results[refspec] = (True, None)
+    return results
+
+
+def _record_pushed_refs(blob_index, repo: git.Repo, remote_url: str, results: dict[str, tuple[bool, str | None]]):
+    """
+    Updates blob_index with the tree of every branch a push moved, and forgets deleted branches.
+    Index failures are logged rather than failing the push.
+    """
+    full_name = repo_full_name(remote_url)
+    local_branches = {head.name for head in repo.heads}
+    for refspec, (success, _) in results.items():
+        if not success:
+            continue
+        source, _, destination = refspec.lstrip("+").partition(":")
+        destination = destination or source
+        if destination.startswith("refs/") and not destination.startswith("refs/heads/"):
+            continue
+        branch = destination.removeprefix("refs/heads/")
+        try:
+            if not source:
+                blob_index.forget(full_name, branch)
+            elif destination.startswith("refs/heads/") or source.removeprefix("refs/heads/") in local_branches:
+                blob_index.record_local(full_name, branch, repo, rev=source)
+        except Exception as e:
+            logging.warning(f"Could not update blob index for '{full_name}' branch '{branch}': {e}")
+
+
+@instrumented("push_refs")
+def push_refs(local_path: str, refspecs: list[str], remote_name: str = "origin", github_token: str = None, atomic: bool = False, repo_cache=None, blob_index=None, create_only: bool = False) -> tuple[dict[str, tuple[bool, str | None]] | None, str | None]:
+    """
+    Pushes many refspecs (branches, tags, ":ref" deletes, "+" forced updates) from local_path
+    to remote_name in a single git push, so the connection and ref negotiation happen once.
+    With atomic, the remote applies either all ref updates or none of them. With create_only,
+    refs that already exist on the remote are rejected instead of updated.
+    Uses github_token for authentication through git_auth_env.
+    Pass a RepoCache as repo_cache to reuse an open handle for local_path across calls, and a
+    BlobIndex as blob_index to record the trees of the branches pushed.
+    Returns a dict mapping each refspec to a (success, message) tuple if the push ran,
+    None otherwise, along with an error message.
+    """
+    try:
+        if not github_token:
+            logging.error("GitHub token is required for pushing.")
+            return None, "GitHub token is required."
+        if not refspecs:
+            return {}, None
+
+        with _open_repo(local_path, repo_cache) as repo:
+            try:
+                remote = repo.remote(name=remote_name)
+            except (git.GitCommandError, ValueError):
+                logging.error(f"Remote '{remote_name}' does not exist in {local_path}.")
+                return None, f"Remote '{remote_name}' does not exist."
+
+            logging.info(f"Pushing {len(refspecs)} refs from {local_path} to remote '{remote_name}'{' atomically' if atomic else ''}...")
+            push_kwargs = {"atomic": True} if atomic else {}
+            if create_only:
+                # A lease with an empty expected value only lets the push create the ref
+                push_kwargs["force_with_lease"] = [f"{_refspec_destination(refspec)}:" for refspec in refspecs if not refspec.startswith(":")]
+            progress = _metrics_progress(None)
+            if progress is not None:
+                push_kwargs["progress"] = progress
+            push_info = remote.push(refspec=list(refspecs), env=git_auth_env(github_token), **push_kwargs)
+            if progress is not None:
+                progress.stop()
+                _record_transfer(progress)
+            results = _push_ref_results(refspecs, push_info)
+            if blob_index is not None:
+                _record_pushed_refs(blob_index, repo, remote.url, results)
+            failed = sum(1 for success, _ in results.values() if not success)
+            logging.info(f"Pushed {len(results) - failed} of {len(results)} refs to remote '{remote_name}'.")
+            return results, None
+    except git.InvalidGitRepositoryError:
+        logging.error(f"Invalid git repository at {local_path}.")
+        return None, f"Invalid git repository at {local_path}."
+    except git.GitCommandError as e:
+        logging.error(f"Git command error during push: {e}")
+        return None, str(e)
+    except Exception as e:
+        logging.error(f"An unexpected error occurred during push: {e}")
+        return None, str(e)
+
+
+@instrumented("push")
+def push_repository(local_path: str, remote_name: str = "origin", branch_name: str = "main", github_token: str = None, refspecs: list[str] | None = None, atomic: bool = False, repo_cache=None, blob_index=None, lfs: bool = False, required_scopes: list[str] | None = None, token_cache=None) -> tuple[bool, str | None]:
     """
     Pushes changes from local_path to the remote_name on branch_name.
-    Uses github_token for authentication.
+    Pass refspecs to push many branches, tags and deletes in one git push instead
+    (branch_name is then ignored), optionally atomic; use push_refs for per-ref results.
+    Uses github_token for authentication through git_auth_env, leaving the remote URL untouched.
+    Pass a RepoCache as repo_cache to reuse an open handle for local_path across calls, and a
+    BlobIndex as blob_index to record the tree of the pushed branch once the push succeeds.
+    With lfs, the local Git LFS store (see lfs.stage_large_files) is uploaded first, resuming
+    an earlier interrupted upload, so the server has every object the pushed pointers refer to.
+    With required_scopes, the token is checked with validate_token (cached in token_cache)
+    before any object is uploaded.
     Returns True if successful, False otherwise, along with an error message if any.
     """
+    if required_scopes is not None and github_token:
+        token_info, error = validate_token(github_token, required_scopes, token_cache=token_cache)
+        if token_info is None:
+            return False, error
+
+    if lfs:
+        with current_span().phase("lfs_upload"):
+            lfs_results, error = push_lfs_objects(local_path, github_token, remote_name)
+        if lfs_results is None:
+            return False, error
+        lfs_failures = [f"{oid[:12]}: {message}" for oid, (success, message) in lfs_results.items() if not success]
+        if lfs_failures:
+            return False, f"LFS upload failed for {len(lfs_failures)} of {len(lfs_results)} objects: {'; '.join(lfs_failures)}"
+
+    if refspecs:
+        results, error = push_refs(local_path, refspecs, remote_name, github_token, atomic=atomic, repo_cache=repo_cache, blob_index=blob_index)
+        if results is None:
+            return False, error
+        failures = [f"{refspec}: {message}" for refspec, (success, message) in results.items() if not success]
+        if failures:
+            return False, f"Push failed for {len(failures)} of {len(results)} refs: {'; '.join(failures)}"
+        return True, None
+
     try:
         if not github_token:
             logging.error("GitHub token is required for pushing.")
             return False, "GitHub token is required."
 
-        repo = git.Repo(local_path)
-        
-        # Get the remote
-        try:
-            remote = repo.remote(name=remote_name)
-        except git.GitCommandError:
-            logging.error(f"Remote '{remote_name}' does not exist in {local_path}.")
-            return False, f"Remote '{remote_name}' does not exist."
-
-        # Update remote URL to include the token for authentication
-        # Assumes remote.url is like https://github.com/user/repo.git
-        remote_url_parts = remote.url.split("://")
-        if len(remote_url_parts) != 2:
-            logging.error(f"Unexpected remote URL format: {remote.url}")
-            return False, f"Unexpected remote URL format: {remote.url}"
-        
-        protocol, rest_of_url = remote_url_parts
-        # Ensure we don't duplicate the token if it's already there (e.g. from clone)
-        if "@" in rest_of_url:
-            rest_of_url = rest_of_url.split("@",1)[1]
-
-        authenticated_url = f"{protocol}://{github_token}@{rest_of_url}"
-        remote.set_url(authenticated_url, old_url=remote.url) # Update the URL
-
-        logging.info(f"Pushing changes from {local_path} to remote '{remote_name}' branch '{branch_name}'...")
-        push_info = remote.push(refspec=f"{branch_name}:{branch_name}")
-
-        if push_info:
-            pi = push_info[0] # Assuming one refspec
-            if pi.flags & git.PushInfo.ERROR:
-                logging.error(f"Error during push: {pi.summary}")
-                return False, f"Push failed: {pi.summary}"
-            elif pi.flags & git.PushInfo.REJECTED:
-                logging.warning(f"Push rejected: {pi.summary}")
-                return False, f"Push rejected: {pi.summary}"
-            elif pi.flags & git.PushInfo.UP_TO_DATE:
-                logging.info(f"Branch '{branch_name}' is already up to date on remote '{remote_name}'.")
-                return True, f"Branch '{branch_name}' is already up to date." # Or False depending on desired behavior
+        with _open_repo(local_path, repo_cache) as repo:
+            # Get the remote
+            try:
+                remote = repo.remote(name=remote_name)
+            except (git.GitCommandError, ValueError):
+                logging.error(f"Remote '{remote_name}' does not exist in {local_path}.")
+                return False, f"Remote '{remote_name}' does not exist."
+
+            logging.info(f"Pushing changes from {local_path} to remote '{remote_name}' branch '{branch_name}'...")
+            push_kwargs = {"atomic": True} if atomic else {}
+            progress = _metrics_progress(None)
+            if progress is not None:
+                push_kwargs["progress"] = progress
+            push_info = remote.push(refspec=f"{branch_name}:{branch_name}", env=git_auth_env(github_token), **push_kwargs)
+            if progress is not None:
+                progress.stop()
+                _record_transfer(progress)
+
+            if push_info:
+                pi = push_info[0] # Assuming one refspec
+                if pi.flags & git.PushInfo.ERROR:
+                    logging.error(f"Error during push: {pi.summary}")
+                    return False, f"Push failed: {pi.summary}"
+                elif pi.flags & git.PushInfo.REJECTED:
+                    logging.warning(f"Push rejected: {pi.summary}")
+                    return False, f"Push rejected: {pi.summary}"
+                if blob_index is not None:
+                    _record_pushed_refs(blob_index, repo, remote.url, {branch_name: (True, None)})
+                if pi.flags & git.PushInfo.UP_TO_DATE:
+                    logging.info(f"Branch '{branch_name}' is already up to date on remote '{remote_name}'.")
+                    return True, f"Branch '{branch_name}' is already up to date." # Or False depending on desired behavior
+                else:
+                    logging.info(f"Push successful to remote '{remote_name}' branch '{branch_name}'. Summary: {pi.summary}")
+                    return True, None
             else:
-                logging.info(f"Push successful to remote '{remote_name}' branch '{branch_name}'. Summary: {pi.summary}")
-                return True, None
-        else:
-            # This case might not be hit if push always returns PushInfo,
-            # but good to have as a fallback.
-            logging.warning("Push command did not return any info, assuming it might have failed or nothing to push.")
-            # Check if branch is up-to-date as a common scenario for empty push_info
-            # This is a heuristic, actual git status might be more complex
-            if repo.head.commit == remote.fetch()[0].commit:
-                 logging.info(f"Branch '{branch_name}' is already up to date on remote '{remote_name}'.")
-                 return True, f"Branch '{branch_name}' is already up to date."
-            return False, "Push command returned no information."
+                # This case might not be hit if push always returns PushInfo,
+                # but good to have as a fallback.
+                logging.warning("Push command did not return any info, assuming it might have failed or nothing to push.")
+                # Check if branch is up-to-date as a common scenario for empty push_info
+                # This is a heuristic, actual git status might be more complex
+                if repo.head.commit == remote.fetch()[0].commit:
+                     logging.info(f"Branch '{branch_name}' is already up to date on remote '{remote_name}'.")
+                     return True, f"Branch '{branch_name}' is already up to date."
+                return False, "Push command returned no information."
 
     except git.InvalidGitRepositoryError:
         logging.error(f"Invalid git repository at {local_path}.")
         return False, f"Invalid git repository at {local_path}."
     except git.GitCommandError as e:
         logging.error(f"Git command error during push: {e}")
-        # Attempt to restore original remote URL on error
-        try:
-            repo = git.Repo(local_path)
-            remote = repo.remote(name=remote_name)
-            original_url = remote.url.replace(f"{github_token}@", "") # simple attempt to remove token
-            remote.set_url(original_url, old_url=remote.url)
-        except Exception as ex:
-            logging.warning(f"Could not restore original remote URL after push error: {ex}")
         return False, str(e)
     except Exception as e:
         logging.error(f"An unexpected error occurred during push: {e}")
@@ -230,22 +1237,18 @@ if __name__ == '__main__':
     # pass
 
 
-def create_github_repository(repo_name: str, description: str, private: bool, github_token: str) -> tuple[dict | None, str | None]:
+@instrumented("create")
+def create_github_repository(repo_name: str, description: str, private: bool, github_token: str, client: GitHubClient | None = None) -> tuple[dict | None, str | None]:
     """
     Creates a new repository on GitHub using the API.
     Parameters: repo_name, description, private (boolean).
-    Uses github_token for authentication.
+    Uses github_token for authentication, sending the request through client when one is given.
     Returns JSON response from API if successful, None otherwise, along with an error message.
     """
     if not github_token:
         logging.error("GitHub token is required for creating a repository.")
         return None, "GitHub token is required."
 
-    api_url = "https://api.github.com/user/repos"
-    headers = {
-        "Authorization": f"token {github_token}",
-        "Accept": "application/vnd.github.v3+json",
-    }
     payload = {
         "name": repo_name,
         "description": description,
@@ -254,26 +1257,16 @@ def create_github_repository(repo_name: str, description: str, private: bool, gi
 
     logging.info(f"Creating GitHub repository '{repo_name}'...")
     try:
-        response = requests.post(api_url, headers=headers, json=payload)
+        response = _api_request("post", "/user/repos", github_token, client, json=payload)
         response.raise_for_status()  # Raises an HTTPError for bad responses (4XX or 5XX)
         
         repo_data = response.json()
         logging.info(f"Successfully created GitHub repository '{repo_name}'. URL: {repo_data.get('html_url')}")
+        _invalidate_cached_repository((repo_data.get('owner') or {}).get('login'), repo_name)
         return repo_data, None
-    except requests.exceptions.HTTPError as e:
-        error_message = f"API request failed with status {e.response.status_code}: {e.response.text}"
-        logging.error(error_message)
+    except requests.exceptions.HTTPError:
         # Try to parse GitHub's error message
-        try:
-            error_details = e.response.json()
-            if 'errors' in error_details and error_details['errors']:
-                detailed_errors = [err.get('message', 'Unknown error') for err in error_details['errors']]
-                error_message = f"API request failed: {'; '.join(detailed_errors)}"
-            elif 'message' in error_details:
-                 error_message = f"API request failed: {error_details['message']}"
-        except ValueError: # If response is not JSON
-            pass # Keep the original error_message from response.text
-        return None, error_message
+        return None, _api_error_message(response, parse_errors=True)
     except requests.exceptions.RequestException as e:
         logging.error(f"Request failed: {e}")
         return None, str(e)
@@ -282,6 +1275,43 @@ def create_github_repository(repo_name: str, description: str, private: bool, gi
         return None, str(e)
 
 
+def create_github_repositories(specs: list[dict | tuple], github_token: str, max_workers: int = 8, client: GitHubClient | None = None) -> list[tuple[dict | None, str | None]]:
+    """
+    Creates many repositories on GitHub concurrently.
+    Parameters: specs, a list of dicts with repo_name, description and private keys
+    (or (repo_name, description, private) tuples), and max_workers, the size of the worker pool.
+    Uses github_token for authentication. When no client is given, a pooled client sized to
+    max_workers is used for the batch so workers share keep-alive connections.
+    Returns one (repo_data, error) tuple per spec, in input order, as create_github_repository does.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for creating repositories.")
+        return [(None, "GitHub token is required.") for _ in specs]
+    if not specs:
+        return []
+
+    owns_client = client is None
+    if owns_client:
+        client = GitHubClient(github_token, pool_maxsize=max_workers)
+
+    def create(spec):
+        if isinstance(spec, dict):
+            return create_github_repository(spec["repo_name"], spec.get("description", ""), spec.get("private", False), github_token, client=client)
+        repo_name, description, private = spec
+        return create_github_repository(repo_name, description, private, github_token, client=client)
+
+    logging.info(f"Creating {len(specs)} GitHub repositories with {max_workers} workers...")
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(create, specs))
+    finally:
+        if owns_client:
+            client.close()
+    failures = sum(1 for repo_data, _ in results if repo_data is None)
+    logging.info(f"Batch repository creation finished: {len(results) - failures} created, {failures} failed.")
+    return results
+
+
 if __name__ == '__main__':
     # Example usage (replace with your actual details and ensure the token has repo scope)
     # Note: For security, avoid hardcoding tokens. Use environment variables or a config file.
@@ -356,24 +1386,19 @@ if __name__ == '__main__':
     # pass
 
 
-def update_github_repository(owner: str, repo_name: str, github_token: str, description: str = None, homepage: str = None, private: bool = None) -> tuple[dict | None, str | None]:
+@instrumented("update")
+def update_github_repository(owner: str, repo_name: str, github_token: str, description: str = None, homepage: str = None, private: bool = None, client: GitHubClient | None = None) -> tuple[dict | None, str | None]:
     """
     Updates an existing repository on GitHub using the API.
     Parameters: owner, repo_name, github_token.
     Optional parameters for update: description, homepage, private (boolean).
-    Uses github_token for authentication.
+    Uses github_token for authentication, sending the request through client when one is given.
     Returns JSON response from API if successful, None otherwise, along with an error message.
     """
     if not github_token:
         logging.error("GitHub token is required for updating a repository.")
         return None, "GitHub token is required."
 
-    api_url = f"https://api.github.com/repos/{owner}/{repo_name}"
-    headers = {
-        "Authorization": f"token {github_token}",
-        "Accept": "application/vnd.github.v3+json",
-    }
-    
     payload = {}
     if description is not None:
         payload["description"] = description
@@ -390,22 +1415,15 @@ def update_github_repository(owner: str, repo_name: str, github_token: str, desc
 
     logging.info(f"Updating GitHub repository '{owner}/{repo_name}' with data: {payload}")
     try:
-        response = requests.patch(api_url, headers=headers, json=payload)
+        response = _api_request("patch", f"/repos/{owner}/{repo_name}", github_token, client, json=payload)
         response.raise_for_status()  # Raises an HTTPError for bad responses (4XX or 5XX)
         
         repo_data = response.json()
         logging.info(f"Successfully updated GitHub repository '{owner}/{repo_name}'.")
+        _invalidate_cached_repository(owner, repo_name)
         return repo_data, None
-    except requests.exceptions.HTTPError as e:
-        error_message = f"API request failed with status {e.response.status_code}: {e.response.text}"
-        logging.error(error_message)
-        try:
-            error_details = e.response.json()
-            if 'message' in error_details:
-                 error_message = f"API request failed: {error_details['message']}"
-        except ValueError:
-            pass
-        return None, error_message
+    except requests.exceptions.HTTPError:
+        return None, _api_error_message(response)
     except requests.exceptions.RequestException as e:
         logging.error(f"Request failed: {e}")
         return None, str(e)
@@ -504,30 +1522,26 @@ if __name__ == '__main__':
             print(f"Deletion of repository '{test_repo_name_for_create_update_delete}' cancelled by user.")
 
 
-def delete_github_repository(owner: str, repo_name: str, github_token: str) -> tuple[bool, str | None]:
+@instrumented("delete")
+def delete_github_repository(owner: str, repo_name: str, github_token: str, client: GitHubClient | None = None) -> tuple[bool, str | None]:
     """
     Deletes a repository on GitHub using the API.
     Parameters: owner, repo_name, github_token.
-    Uses github_token for authentication.
+    Uses github_token for authentication, sending the request through client when one is given.
     Returns True if successful (status code 204), False otherwise, along with an error message.
     """
     if not github_token:
         logging.error("GitHub token is required for deleting a repository.")
         return False, "GitHub token is required."
 
-    api_url = f"https://api.github.com/repos/{owner}/{repo_name}"
-    headers = {
-        "Authorization": f"token {github_token}",
-        "Accept": "application/vnd.github.v3+json",
-    }
-
     logging.info(f"Deleting GitHub repository '{owner}/{repo_name}'...")
     try:
-        response = requests.delete(api_url, headers=headers)
+        response = _api_request("delete", f"/repos/{owner}/{repo_name}", github_token, client)
         response.raise_for_status()  # Raises an HTTPError for bad responses (4XX or 5XX)
         
         if response.status_code == 204:
             logging.info(f"Successfully deleted GitHub repository '{owner}/{repo_name}'.")
+            _invalidate_cached_repository(owner, repo_name)
             return True, None
         else:
             # This case should ideally be caught by raise_for_status for non-2XX codes,
@@ -536,22 +1550,511 @@ def delete_github_repository(owner: str, repo_name: str, github_token: str) -> t
             logging.warning(error_message)
             return False, error_message
             
-    except requests.exceptions.HTTPError as e:
-        error_message = f"API request failed with status {e.response.status_code}: {e.response.text}"
-        logging.error(error_message)
-        try:
-            error_details = e.response.json()
-            if 'message' in error_details:
-                 error_message = f"API request failed: {error_details['message']}"
-        except ValueError:
-            pass
-        return False, error_message
+    except requests.exceptions.HTTPError:
+        return False, _api_error_message(response)
     except requests.exceptions.RequestException as e:
         logging.error(f"Request failed: {e}")
         return False, str(e)
     except Exception as e:
         logging.error(f"An unexpected error occurred during repository deletion: {e}")
         return False, str(e)
+
+
+def get_github_repository(owner: str, repo_name: str, github_token: str, client: GitHubClient | None = None) -> tuple[dict | None, str | None]:
+    """
+    Fetches a repository's details from GitHub using the API.
+    Parameters: owner, repo_name, github_token.
+    Responses are cached with their ETag and revalidated with If-None-Match, so unchanged
+    details come back as a 304 that does not count against the rate limit.
+    Returns JSON response from API if successful, None otherwise, along with an error message.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for fetching a repository.")
+        return None, "GitHub token is required."
+
+    logging.info(f"Fetching GitHub repository '{owner}/{repo_name}'...")
+    try:
+        return _cached_get(f"/repos/{owner}/{repo_name}", github_token, client), None
+    except requests.exceptions.HTTPError as e:
+        return None, _api_error_message(e.response)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Request failed: {e}")
+        return None, str(e)
+    except Exception as e:
+        logging.error(f"An unexpected error occurred while fetching repository: {e}")
+        return None, str(e)
+
+
+def list_github_repositories(github_token: str, page: int = 1, per_page: int = 10, sort: str = "updated", client: GitHubClient | None = None) -> tuple[list | None, str | None]:
+    """
+    Lists the authenticated user's repositories one page at a time, like getUserRepositories.
+    Parameters: github_token, page, per_page, sort (created, updated, pushed or full_name).
+    Pages are cached and revalidated with If-None-Match like get_github_repository.
+    Returns the list of repositories if successful, None otherwise, along with an error message.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for listing repositories.")
+        return None, "GitHub token is required."
+
+    params = {"sort": sort, "per_page": per_page, "page": page}
+    logging.info(f"Listing GitHub repositories (page {page}, {per_page} per page)...")
+    try:
+        return _cached_get("/user/repos", github_token, client, params=params), None
+    except requests.exceptions.HTTPError as e:
+        return None, _api_error_message(e.response)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Request failed: {e}")
+        return None, str(e)
+    except Exception as e:
+        logging.error(f"An unexpected error occurred while listing repositories: {e}")
+        return None, str(e)
+
+
+def _page_url(url: str, page: int) -> str:
+    """
+    Returns url with its page query parameter set to page.
+    """
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    query["page"] = [str(page)]
+    return urlunsplit(parts._replace(query=urlencode(query, doseq=True)))
+
+
+def _iter_pages(path: str, github_token: str, client: GitHubClient | None, params: dict, prefetch: int):
+    """
+    Yields the items of every page of a paginated list endpoint, in order.
+    When the Link header advertises the last page, up to prefetch following pages are
+    fetched concurrently while the current one is consumed (prefetch=1 fetches one page
+    ahead); with prefetch < 1 or no 'last' link, 'next' links are followed one at a time.
+    At most prefetch + 1 pages are held in memory.
+    Raises requests.exceptions.RequestException if a page cannot be fetched.
+    """
+    def fetch(url, page_params=None):
+        response = _api_request("get", url, github_token, client, params=page_params)
+        response.raise_for_status()
+        return response
+
+    response = fetch(path, params)
+    next_url = response.links.get("next", {}).get("url")
+    last_url = response.links.get("last", {}).get("url")
+    if not next_url or not last_url or prefetch < 1:
+        yield from response.json()
+        while next_url:
+            response = fetch(next_url)
+            yield from response.json()
+            next_url = response.links.get("next", {}).get("url")
+        return
+
+    first_page = int(parse_qs(urlsplit(next_url).query)["page"][0])
+    last_page = int(parse_qs(urlsplit(last_url).query)["page"][0])
+    pages = iter(range(first_page, last_page + 1))
+    executor = ThreadPoolExecutor(max_workers=prefetch)
+    pending = deque()
+
+    def submit_next():
+        page = next(pages, None)
+        if page is not None:
+            pending.append(executor.submit(fetch, _page_url(next_url, page)))
+
+    try:
+        for _ in range(prefetch):
+            submit_next()
+        yield from response.json()
+        while pending:
+            items = pending.popleft().result().json()
+            submit_next()
+            yield from items
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_repositories(github_token: str, org: str | None = None, per_page: int = 100, prefetch: int = 4, sort: str = "updated", client: GitHubClient | None = None):
+    """
+    Streams every repository of the authenticated user (or of org when given).
+    Parameters: github_token, org, per_page (up to 100), prefetch (pages fetched ahead concurrently; 0 fetches them one at a time).
+    Follows the Link header and yields repositories as pages arrive, holding only the
+    prefetch window in memory.
+    Raises requests.exceptions.RequestException if a page cannot be fetched.
+    """
+    if not github_token:
+        raise ValueError("GitHub token is required.")
+    path = f"/orgs/{org}/repos" if org else "/user/repos"
+    logging.info(f"Streaming repositories from '{path}' ({per_page} per page, {prefetch} pages ahead)...")
+    yield from _iter_pages(path, github_token, client, {"sort": sort, "per_page": per_page}, prefetch)
+
+
+def iter_branches(owner: str, repo_name: str, github_token: str, per_page: int = 100, prefetch: int = 4, client: GitHubClient | None = None):
+    """
+    Streams every branch of owner/repo_name, following the Link header like iter_repositories.
+    Raises requests.exceptions.RequestException if a page cannot be fetched.
+    """
+    if not github_token:
+        raise ValueError("GitHub token is required.")
+    logging.info(f"Streaming branches of '{owner}/{repo_name}'...")
+    yield from _iter_pages(f"/repos/{owner}/{repo_name}/branches", github_token, client, {"per_page": per_page}, prefetch)
+
+
+def _graphql(query: str, variables: dict, github_token: str, client: GitHubClient | None = None) -> tuple[dict, dict]:
+    """
+    Runs a GraphQL query or mutation against the API.
+    Returns its data and a dict mapping the top-level field (alias) each error belongs to, or
+    None for errors not tied to a field, to the error message.
+    Raises requests.exceptions.RequestException if the request itself fails.
+    """
+    response = _api_request("post", "/graphql", github_token, client, json={"query": query, "variables": variables})
+    response.raise_for_status()
+    body = response.json()
+    errors = {}
+    for error in body.get("errors") or []:
+        errors.setdefault((error.get("path") or [None])[0], error.get("message", "GraphQL error"))
+    return body.get("data") or {}, errors
+
+
+def _aliased_graphql(operation: str, fields: list[tuple[str, str, dict]], github_token: str, client: GitHubClient | None) -> tuple[dict, dict]:
+    """
+    Runs a single GraphQL operation ("query" or "mutation") made of many aliased fields.
+    fields is a list of (alias, selection, variables) tuples; selection refers to its variables
+    as $name and variables maps each name, unique across fields, to a (GraphQL type, value) tuple.
+    Returns the data and errors like _graphql.
+    """
+    declarations = ", ".join(f"${name}: {graphql_type}" for _, _, variables in fields for name, (graphql_type, _) in variables.items())
+    selections = " ".join(f"{alias}: {selection}" for alias, selection, _ in fields)
+    values = {name: value for _, _, variables in fields for name, (_, value) in variables.items()}
+    return _graphql(f"{operation}({declarations}) {{ {selections} }}", values, github_token, client)
+
+
+def _graphql_failure(errors: dict, alias: str, default: str) -> str:
+    return errors.get(alias) or errors.get(None) or default
+
+
+def _branch_specs(specs: list[dict | tuple], fields: tuple[str, ...]) -> list[dict]:
+    return [spec if isinstance(spec, dict) else dict(zip(fields, spec)) for spec in specs]
+
+
+def _run_branch_batches(indexes: list[int], results: list, batch_size: int, run_batch):
+    """
+    Calls run_batch(batch) for indexes in slices of batch_size, failing the specs of a batch
+    whose request could not be completed.
+    """
+    for start in range(0, len(indexes), batch_size):
+        batch = indexes[start:start + batch_size]
+        try:
+            run_batch(batch)
+        except requests.exceptions.HTTPError as e:
+            message = _api_error_message(e.response)
+            for i in batch:
+                results[i] = results[i] or (False, message)
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Request failed: {e}")
+            for i in batch:
+                results[i] = results[i] or (False, str(e))
+
+
+def _push_branch_refspecs(specs: list[dict], by_clone: dict[str, list[int]], results: list, refspec_for, remote_name: str, github_token: str, create_only: bool = False):
+    """
+    Pushes the refspecs of the specs grouped by local clone, one git push per clone, and stores
+    the per-ref outcome of each spec in results.
+    """
+    for local_path, indexes in by_clone.items():
+        refspecs = [refspec_for(specs[i]) for i in indexes]
+        pushed, error = push_refs(local_path, list(dict.fromkeys(refspecs)), remote_name, github_token, create_only=create_only)
+        for i, refspec in zip(indexes, refspecs):
+            results[i] = pushed[refspec] if pushed is not None else (False, error)
+
+
+def _split_by_clone(specs: list[dict], local_paths: dict[str, str] | None) -> tuple[list[int], dict[str, list[int]]]:
+    """
+    Returns the indexes of the specs to handle through the API and, per local clone, those to push from it.
+    """
+    remote, by_clone = [], {}
+    for i, spec in enumerate(specs):
+        local_path = (local_paths or {}).get(f"{spec['owner']}/{spec['repo_name']}")
+        if local_path:
+            by_clone.setdefault(local_path, []).append(i)
+        else:
+            remote.append(i)
+    return remote, by_clone
+
+
+@instrumented("create_branches")
+def create_branches(specs: list[dict | tuple], github_token: str, batch_size: int = 50, client: GitHubClient | None = None, local_paths: dict[str, str] | None = None, remote_name: str = "origin") -> list[tuple[bool, str | None]]:
+    """
+    Creates many branches, in any number of repositories, with batched GraphQL requests.
+    Parameters: specs, a list of dicts with owner, repo_name, branch and base (the branch the new
+    one starts from) keys, or (owner, repo_name, branch, base) tuples, and batch_size, the number
+    of branches per request. Each batch costs one aliased query resolving the base commits and
+    one aliased createRef mutation, instead of a getRef and createRef REST call per branch.
+    Pass local_paths, a dict mapping "owner/repo_name" to a local clone, to create the branches of
+    those repositories with one git push per clone instead; base is then resolved in the clone
+    (e.g. "origin/main"). Existing branches are never moved.
+    Returns one (success, error) tuple per spec, in input order.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for creating branches.")
+        return [(False, "GitHub token is required.") for _ in specs]
+    specs = _branch_specs(specs, ("owner", "repo_name", "branch", "base"))
+    results = [None] * len(specs)
+    remote, by_clone = _split_by_clone(specs, local_paths)
+    logging.info(f"Creating {len(specs)} branches ({len(remote)} through the API, {len(specs) - len(remote)} from {len(by_clone)} local clones)...")
+
+    _push_branch_refspecs(specs, by_clone, results, lambda spec: f"{spec['base']}:refs/heads/{spec['branch']}",
+                          remote_name, github_token, create_only=True)
+
+    def create_batch(batch):
+        bases = {}
+        for i in batch:
+            bases.setdefault((specs[i]["owner"], specs[i]["repo_name"], specs[i]["base"]), f"r{len(bases)}")
+        data, errors = _aliased_graphql("query", [
+            (alias, f"repository(owner: ${alias}o, name: ${alias}n) {{ id ref(qualifiedName: ${alias}q) {{ target {{ oid }} }} }}",
+             {f"{alias}o": ("String!", owner), f"{alias}n": ("String!", repo_name), f"{alias}q": ("String!", f"refs/heads/{base}")})
+            for (owner, repo_name, base), alias in bases.items()
+        ], github_token, client)
+
+        creatable = []
+        for i in batch:
+            spec = specs[i]
+            alias = bases[(spec["owner"], spec["repo_name"], spec["base"])]
+            repository = data.get(alias)
+            if not repository:
+                results[i] = (False, _graphql_failure(errors, alias, f"Repository '{spec['owner']}/{spec['repo_name']}' not found."))
+            elif not repository.get("ref"):
+                results[i] = (False, f"Base branch '{spec['base']}' not found in '{spec['owner']}/{spec['repo_name']}'.")
+            else:
+                creatable.append((i, repository["id"], repository["ref"]["target"]["oid"]))
+        if not creatable:
+            return
+
+        data, errors = _aliased_graphql("mutation", [
+            (f"m{n}", f"createRef(input: {{repositoryId: $m{n}r, name: $m{n}q, oid: $m{n}s}}) {{ ref {{ id }} }}",
+             {f"m{n}r": ("ID!", repository_id), f"m{n}q": ("String!", f"refs/heads/{specs[i]['branch']}"), f"m{n}s": ("GitObjectID!", oid)})
+            for n, (i, repository_id, oid) in enumerate(creatable)
+        ], github_token, client)
+        for n, (i, _, _) in enumerate(creatable):
+            if data.get(f"m{n}"):
+                results[i] = (True, None)
+            else:
+                results[i] = (False, _graphql_failure(errors, f"m{n}", f"Branch '{specs[i]['branch']}' could not be created."))
+
+    _run_branch_batches(remote, results, batch_size, create_batch)
+    failures = sum(1 for success, _ in results if not success)
+    logging.info(f"Branch creation finished: {len(results) - failures} created, {failures} failed.")
+    return results
+
+
+@instrumented("delete_branches")
+def delete_branches(specs: list[dict | tuple], github_token: str, batch_size: int = 50, client: GitHubClient | None = None, local_paths: dict[str, str] | None = None, remote_name: str = "origin") -> list[tuple[bool, str | None]]:
+    """
+    Deletes many branches, in any number of repositories, with batched GraphQL requests.
+    Parameters: specs, a list of dicts with owner, repo_name and branch keys, or
+    (owner, repo_name, branch) tuples, and batch_size, the number of branches per request.
+    Each batch costs one aliased query looking up the refs and one aliased deleteRef mutation.
+    Pass local_paths, a dict mapping "owner/repo_name" to a local clone, to delete the branches of
+    those repositories with one git push per clone instead.
+    Returns one (success, error) tuple per spec, in input order.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for deleting branches.")
+        return [(False, "GitHub token is required.") for _ in specs]
+    specs = _branch_specs(specs, ("owner", "repo_name", "branch"))
+    results = [None] * len(specs)
+    remote, by_clone = _split_by_clone(specs, local_paths)
+    logging.info(f"Deleting {len(specs)} branches ({len(remote)} through the API, {len(specs) - len(remote)} from {len(by_clone)} local clones)...")
+
+    _push_branch_refspecs(specs, by_clone, results, lambda spec: f":refs/heads/{spec['branch']}", remote_name, github_token)
+
+    def delete_batch(batch):
+        data, errors = _aliased_graphql("query", [
+            (f"r{n}", f"repository(owner: $r{n}o, name: $r{n}n) {{ ref(qualifiedName: $r{n}q) {{ id }} }}",
+             {f"r{n}o": ("String!", specs[i]["owner"]), f"r{n}n": ("String!", specs[i]["repo_name"]), f"r{n}q": ("String!", f"refs/heads/{specs[i]['branch']}")})
+            for n, i in enumerate(batch)
+        ], github_token, client)
+
+        deletable = {}
+        for n, i in enumerate(batch):
+            spec = specs[i]
+            repository = data.get(f"r{n}")
+            if not repository:
+                results[i] = (False, _graphql_failure(errors, f"r{n}", f"Repository '{spec['owner']}/{spec['repo_name']}' not found."))
+            elif not repository.get("ref"):
+                results[i] = (False, f"Branch '{spec['branch']}' not found in '{spec['owner']}/{spec['repo_name']}'.")
+            else:
+                deletable.setdefault(repository["ref"]["id"], []).append(i)
+        if not deletable:
+            return
+
+        ref_ids = list(deletable)
+        data, errors = _aliased_graphql("mutation", [
+            (f"m{n}", f"deleteRef(input: {{refId: $m{n}r}}) {{ clientMutationId }}", {f"m{n}r": ("ID!", ref_id)})
+            for n, ref_id in enumerate(ref_ids)
+        ], github_token, client)
+        for n, ref_id in enumerate(ref_ids):
+            for i in deletable[ref_id]:
+                if data.get(f"m{n}") is not None:
+                    results[i] = (True, None)
+                else:
+                    results[i] = (False, _graphql_failure(errors, f"m{n}", f"Branch '{specs[i]['branch']}' could not be deleted."))
+
+    _run_branch_batches(remote, results, batch_size, delete_batch)
+    failures = sum(1 for success, _ in results if not success)
+    logging.info(f"Branch deletion finished: {len(results) - failures} deleted, {failures} failed.")
+    return results
+
+
+def git_blob_sha(content: bytes) -> str:
+    """
+    Returns the SHA-1 git assigns to a blob with the given content.
+    """
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def _git_data(method: str, owner: str, repo_name: str, path: str, github_token: str, client: GitHubClient | None, **kwargs):
+    """
+    Sends a Git Data API request for owner/repo_name and returns the decoded JSON.
+    Raises requests.exceptions.HTTPError (with the response attached) for error statuses.
+    """
+    response = _api_request(method, f"/repos/{owner}/{repo_name}/git/{path}", github_token, client, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+
+def _branch_tip(owner: str, repo_name: str, branch: str, github_token: str, client: GitHubClient | None) -> tuple[str, str]:
+    """
+    Returns the (commit sha, tree sha) branch currently points at.
+    """
+    parent = _git_data("get", owner, repo_name, f"ref/heads/{branch}", github_token, client)["object"]["sha"]
+    base_tree = _git_data("get", owner, repo_name, f"commits/{parent}", github_token, client)["tree"]["sha"]
+    return parent, base_tree
+
+
+def _commit_tree(owner: str, repo_name: str, branch: str, parent: str, base_tree: str, tree: list[dict], message: str, github_token: str, client: GitHubClient | None) -> dict:
+    """
+    Creates a tree from the entries in tree on top of base_tree, commits it with parent as
+    its only parent and moves branch to the commit without forcing. Returns the commit JSON.
+    """
+    new_tree = _git_data("post", owner, repo_name, "trees", github_token, client, json={"base_tree": base_tree, "tree": tree})["sha"]
+    commit = _git_data("post", owner, repo_name, "commits", github_token, client, json={"message": message, "tree": new_tree, "parents": [parent]})
+    _git_data("patch", owner, repo_name, f"refs/heads/{branch}", github_token, client, json={"sha": commit["sha"], "force": False})
+    _invalidate_cached_repository(owner, repo_name)
+    return commit
+
+
+# Tree entry modes of blobs: regular file, executable and symbolic link
+_BLOB_MODES = ("100644", "100755", "120000")
+
+
+def _tree_modes(owner: str, repo_name: str, base_tree: str, paths, github_token: str, client: GitHubClient | None, executor) -> dict[str, str]:
+    """
+    Returns the mode of each of paths that is a blob (file, executable or symlink) in base_tree.
+    Only the directories leading to paths are listed, one level at a time with the directories
+    of a level fetched concurrently on executor; directories missing from base_tree are skipped.
+    """
+    names = {}
+    for path in paths:
+        directory, _, name = path.rpartition("/")
+        names.setdefault(directory, set()).add(name)
+    needed = set()
+    for directory in names:
+        parts = directory.split("/") if directory else []
+        needed.update("/".join(parts[:depth]) for depth in range(len(parts) + 1))
+
+    def depth_of(directory):
+        return directory.count("/") + 1 if directory else 0
+
+    trees, modes = {"": base_tree}, {}
+    for depth in range(max(map(depth_of, needed)) + 1):
+        level = [directory for directory in needed if depth_of(directory) == depth and directory in trees]
+        listings = executor.map(lambda directory: _git_data("get", owner, repo_name, f"trees/{trees[directory]}", github_token, client), level)
+        for directory, listing in zip(level, listings):
+            for entry in listing.get("tree", []):
+                path = f"{directory}/{entry['path']}" if directory else entry["path"]
+                if entry["type"] == "tree" and path in needed:
+                    trees[path] = entry["sha"]
+                elif entry["type"] == "blob" and entry["path"] in names.get(directory, ()) and entry["mode"] in _BLOB_MODES:
+                    modes[path] = entry["mode"]
+    return modes
+
+
+def commit_files(owner: str, repo_name: str, branch: str, files: dict[str, bytes | str | None], message: str, github_token: str, max_workers: int = 8, client: GitHubClient | None = None, blob_index=None, modes: dict[str, str] | None = None) -> tuple[dict | None, str | None]:
+    """
+    Commits many files to branch of owner/repo_name through the Git Data API, without a local clone.
+    Parameters: files maps repository paths to their new content (bytes or str), or to None
+    to delete the path; message is the commit message.
+    A path that already exists on the branch keeps its mode, so executables stay executable and
+    symlinks stay symlinks (their content is the link target); new paths are regular files.
+    modes maps paths to the mode to commit them with instead ("100644", "100755" or "120000").
+    Blobs are uploaded concurrently by max_workers workers (identical contents only once), then
+    a single tree and commit are created on top of the branch tip and the branch is moved once.
+    The ref update is not forced, so it fails if the branch moved in the meantime.
+    With a BlobIndex as blob_index, files whose blob already matches the branch (and deletions
+    of paths it does not have) are left out, and the index is updated after the commit.
+    Returns the commit JSON from the API if successful (the current tip's sha and tree when
+    nothing changed), None otherwise, along with an error message.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for committing files.")
+        return None, "GitHub token is required."
+    if not files:
+        return None, "No files to commit."
+    modes = dict(modes or {})
+    invalid = sorted(path for path, mode in modes.items() if mode not in _BLOB_MODES)
+    if invalid:
+        return None, f"Unsupported file mode for {', '.join(invalid)}, expected one of {', '.join(_BLOB_MODES)}."
+
+    owns_client = client is None
+    if owns_client:
+        client = GitHubClient(github_token, pool_maxsize=max_workers)
+    full_name = f"{owner}/{repo_name}"
+
+    shas, contents = {}, {}
+    for path, content in files.items():
+        if content is None:
+            shas[path] = None
+            continue
+        data = content.encode() if isinstance(content, str) else content
+        shas[path] = git_blob_sha(data)
+        contents.setdefault(shas[path], data)
+
+    def upload(data):
+        encoded = base64.b64encode(data).decode()
+        return _git_data("post", owner, repo_name, "blobs", github_token, client, json={"content": encoded, "encoding": "base64"})["sha"]
+
+    try:
+        parent, base_tree = _branch_tip(owner, repo_name, branch, github_token, client)
+        indexed = blob_index is not None and blob_index.sync_remote(owner, repo_name, branch, parent, base_tree, github_token, client)
+        if indexed:
+            present = blob_index.lookup(full_name, branch, shas)
+            shas = {path: sha for path, sha in shas.items()
+                    if path in modes or present.get(path) != sha and (sha is not None or path in present)}
+            logging.info(f"Blob index: {len(files) - len(shas)} of {len(files)} files already match '{full_name}' branch '{branch}'.")
+            if not shas:
+                logging.info(f"Nothing to commit to '{full_name}' branch '{branch}'.")
+                return {"sha": parent, "tree": {"sha": base_tree}}, None
+        needed = {sha: contents[sha] for sha in shas.values() if sha is not None}
+
+        logging.info(f"Committing {len(shas)} files to '{full_name}' branch '{branch}' ({len(needed)} blobs)...")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            inherited = [path for path, sha in shas.items() if sha is not None and path not in modes]
+            if inherited:
+                modes = {**_tree_modes(owner, repo_name, base_tree, inherited, github_token, client, executor), **modes}
+            uploaded = dict(zip(needed, executor.map(upload, needed.values())))
+
+        tree = [{"path": path, "mode": modes.get(path, "100644"), "type": "blob", "sha": uploaded.get(sha)} for path, sha in shas.items()]
+        commit = _commit_tree(owner, repo_name, branch, parent, base_tree, tree, message, github_token, client)
+        logging.info(f"Committed {len(shas)} files to '{full_name}' branch '{branch}' as {commit['sha'][:12]}.")
+        if indexed:
+            blob_index.apply(full_name, branch, commit["sha"], shas)
+        return commit, None
+    except requests.exceptions.HTTPError as e:
+        return None, _api_error_message(e.response)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Request failed: {e}")
+        return None, str(e)
+    except Exception as e:
+        logging.error(f"An unexpected error occurred while committing files: {e}")
+        return None, str(e)
+    finally:
+        if owns_client:
+            client.close()
 # Final pass to ensure main guard is at the end of script
 if __name__ == '__main__':
     # Example usage (replace with your actual details and ensure the token has repo scope)
@@ -0,0 +1,329 @@
+import os
+import json
+import time
+import signal
+import logging
+import sqlite3
+import threading
+import multiprocessing
+
+from github_operations.github_ops import clone_repository, push_repository, sync_repository
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    repo_url TEXT,
+    local_path TEXT,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, id);
+CREATE INDEX IF NOT EXISTS jobs_in_flight ON jobs (kind, repo_url, local_path) WHERE status IN ('queued', 'running');
+"""
+
+IN_FLIGHT = ("queued", "running")
+
+
+def env_token_provider(job: dict) -> str | None:
+    """
+    Default token provider: the GITHUB_TOKEN environment variable of the worker.
+    """
+    return os.environ.get("GITHUB_TOKEN")
+
+
+def _clone_job(job: dict, github_token: str):
+    return clone_repository(job["repo_url"], job["local_path"], github_token, **job["params"])
+
+
+def _push_job(job: dict, github_token: str):
+    return push_repository(job["local_path"], github_token=github_token, **job["params"])
+
+
+def _sync_job(job: dict, github_token: str):
+    return sync_repository(job["repo_url"], job["local_path"], github_token, **job["params"])
+
+
+# Job kinds and the function running them as function(job, github_token) -> (result, error)
+JOB_KINDS = {
+    "clone": _clone_job,
+    "push": _push_job,
+    "sync": _sync_job,
+}
+
+
+class JobQueue:
+    """
+    Durable SQLite queue of long-running github_ops work (clone, push, sync).
+    Submitting returns at once with a job id to poll; a JobRunner executes the jobs.
+    A job identical to one still queued or running (same kind, repo_url, local_path and params)
+    is not queued twice: submit returns the id of the job already in flight.
+    Tokens are never stored; workers get them from the runner's token provider.
+    Parameters: path (database file, created if missing).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit, so claims can take the write lock up front with BEGIN IMMEDIATE
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+
+    def _transaction(self):
+        self._connection.execute("BEGIN IMMEDIATE")
+        return self._connection
+
+    @staticmethod
+    def _job(row: sqlite3.Row | None) -> dict | None:
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def submit(self, kind: str, repo_url: str | None = None, local_path: str | None = None, **params) -> int:
+        """
+        Queues a job of kind (a key of JOB_KINDS) and returns its id, or the id of the identical
+        job already queued or running. params are passed to the github_ops function as keyword
+        arguments and must be JSON-serializable.
+        Raises ValueError for an unknown kind.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'. Expected one of: {', '.join(JOB_KINDS)}.")
+        local_path = os.path.abspath(local_path) if local_path else local_path
+        # Canonical form, so the same params given in another order match the job in flight
+        encoded = json.dumps(params, sort_keys=True)
+        with self._lock:
+            connection = self._transaction()
+            try:
+                row = connection.execute(
+                    "SELECT id FROM jobs WHERE kind = ? AND repo_url IS ? AND local_path IS ? AND params = ? AND status IN (?, ?)",
+                    (kind, repo_url, local_path, encoded, *IN_FLIGHT)).fetchone()
+                if row is not None:
+                    job_id = row["id"]
+                    logging.info(f"Job {job_id} ({kind} {repo_url or local_path}) is already in flight; not queueing a duplicate.")
+                else:
+                    job_id = connection.execute(
+                        "INSERT INTO jobs (kind, repo_url, local_path, params, status, created_at) VALUES (?, ?, ?, ?, 'queued', ?)",
+                        (kind, repo_url, local_path, encoded, time.time())).lastrowid
+                    logging.info(f"Queued job {job_id}: {kind} {repo_url or local_path}.")
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def status(self, job_id: int) -> dict | None:
+        """
+        Returns the job with its status (queued, running, succeeded, failed or cancelled),
+        result, error and timestamps, or None if there is no such job.
+        """
+        with self._lock:
+            return self._job(self._connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def jobs(self, status: str | None = None, limit: int = 100) -> list[dict]:
+        """
+        Returns the most recent jobs, newest first, optionally only those with status.
+        """
+        query, args = "SELECT * FROM jobs", ()
+        if status is not None:
+            query, args = query + " WHERE status = ?", (status,)
+        with self._lock:
+            rows = self._connection.execute(f"{query} ORDER BY id DESC LIMIT ?", (*args, limit)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancels a job: a queued job is cancelled at once, a running one is flagged for its
+        runner to stop. Returns False if the job does not exist or has already finished.
+        """
+        now = time.time()
+        with self._lock:
+            cancelled = self._connection.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                (now, job_id)).rowcount
+            if not cancelled:
+                cancelled = self._connection.execute(
+                    "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,)).rowcount
+        return bool(cancelled)
+
+    def claim(self) -> dict | None:
+        """
+        Marks the oldest queued job as running and returns it, or returns None if none is queued.
+        """
+        with self._lock:
+            connection = self._transaction()
+            try:
+                row = connection.execute("SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+                if row is not None:
+                    connection.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time(), row["id"]))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        job = self._job(row)
+        if job is not None:
+            job["status"] = "running"
+        return job
+
+    def cancel_requested(self, job_ids) -> list[int]:
+        """
+        Returns which of the running jobs job_ids have been asked to stop.
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return []
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT id FROM jobs WHERE cancel_requested = 1 AND status = 'running' AND id IN ({', '.join('?' * len(job_ids))})",
+                job_ids).fetchall()
+        return [row["id"] for row in rows]
+
+    def finish(self, job_id: int, status: str, result=None, error: str | None = None) -> bool:
+        """
+        Records the outcome of a running job; status is succeeded, failed or cancelled.
+        Returns False if the job was not running (e.g. it has been finished already).
+        """
+        with self._lock:
+            return bool(self._connection.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ? AND status = 'running'",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)).rowcount)
+
+    def requeue_running(self) -> int:
+        """
+        Puts jobs left running by a runner that stopped without finishing them back in the
+        queue, and returns how many there were.
+        """
+        with self._lock:
+            return self._connection.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running' AND cancel_requested = 0").rowcount
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _run_job(queue_path: str, job: dict, token_provider):
+    """
+    Entry point of a worker process: runs job and records its outcome in the queue.
+    """
+    os.setsid() # Own process group, so cancelling the job also stops the git processes it started
+    try:
+        github_token = token_provider(job)
+        result, error = JOB_KINDS[job["kind"]](job, github_token)
+    except Exception as e:
+        result, error = None, str(e)
+    if result:
+        status, stored = "succeeded", result if isinstance(result, dict) else ({"message": error} if error else None)
+        error = None
+    else:
+        status, stored = "failed", None
+    with JobQueue(queue_path) as queue:
+        queue.finish(job["id"], status, stored, error)
+
+
+class JobRunner:
+    """
+    Executes the jobs of a JobQueue, each in its own worker process, at most concurrency at a time.
+    Running jobs whose cancellation was requested are stopped by killing their process group.
+    Jobs found running when the runner starts were interrupted by an earlier runner and are
+    queued again, so a single runner should serve a queue.
+    Parameters: queue, concurrency, token_provider (called in the worker as token_provider(job);
+    defaults to the GITHUB_TOKEN environment variable) and poll_interval (seconds).
+    """
+
+    def __init__(self, queue: JobQueue, concurrency: int = 4, token_provider=env_token_provider, poll_interval: float = 0.2):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.token_provider = token_provider
+        self.poll_interval = poll_interval
+        self._workers = {}
+        self._stop = threading.Event()
+        self._thread = None
+        requeued = queue.requeue_running()
+        if requeued:
+            logging.warning(f"Requeued {requeued} jobs interrupted by a previous runner.")
+
+    def _reap(self):
+        for job_id, process in list(self._workers.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self._workers[job_id]
+            if self.queue.finish(job_id, "failed", error=f"Worker exited with code {process.exitcode} before finishing the job."):
+                logging.error(f"Worker for job {job_id} exited with code {process.exitcode}.")
+
+    def _cancel(self):
+        for job_id in self.queue.cancel_requested(self._workers):
+            process = self._workers.pop(job_id)
+            try:
+                os.killpg(process.pid, signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                process.terminate() # The worker has not created its process group yet
+            process.join()
+            self.queue.finish(job_id, "cancelled", error="Cancelled.")
+            logging.info(f"Cancelled running job {job_id}.")
+
+    def run_once(self) -> int:
+        """
+        Reaps finished workers, stops cancelled jobs and starts queued ones while there is capacity.
+        Returns the number of jobs running afterwards.
+        """
+        self._reap()
+        self._cancel()
+        while len(self._workers) < self.concurrency and not self._stop.is_set():
+            job = self.queue.claim()
+            if job is None:
+                break
+            process = multiprocessing.Process(target=_run_job, args=(self.queue.path, job, self.token_provider),
+                                              name=f"github-ops-job-{job['id']}", daemon=True)
+            process.start()
+            self._workers[job["id"]] = process
+            logging.info(f"Started job {job['id']} ({job['kind']}) in worker {process.pid}.")
+        return len(self._workers)
+
+    def run(self):
+        """
+        Runs jobs until stop() is called, then waits for the running jobs to finish.
+        """
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.poll_interval)
+        while self._workers:
+            self._reap()
+            self._cancel()
+            time.sleep(self.poll_interval)
+
+    def start(self) -> "JobRunner":
+        """
+        Runs the runner in a background thread.
+        """
+        self._thread = threading.Thread(target=self.run, name="github-ops-job-runner", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None):
+        """
+        Stops taking new jobs and waits up to timeout seconds for the running ones to finish.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,346 @@
+import io
+import os
+import time
+import base64
+import shutil
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit
+
+import git
+import requests
+from gitdb import IStream
+from requests.adapters import HTTPAdapter
+
+LFS_MEDIA_TYPE = "application/vnd.git-lfs+json"
+POINTER_VERSION = "https://git-lfs.github.com/spec/v1"
+# GitHub warns about files over 50 MiB and rejects files over 100 MiB in a push
+DEFAULT_THRESHOLD = 50 * 1024 ** 2
+# Objects per batch API request, the limit GitHub's LFS server enforces
+BATCH_SIZE = 100
+CHUNK_SIZE = 1024 ** 2
+
+
+def lfs_pointer(oid: str, size: int) -> bytes:
+    """
+    Returns the pointer file git stores in place of an LFS object.
+    """
+    return f"version {POINTER_VERSION}\noid sha256:{oid}\nsize {size}\n".encode()
+
+
+def parse_lfs_pointer(data: bytes) -> tuple[str, int] | None:
+    """
+    Returns (oid, size) if data is an LFS pointer file, None otherwise.
+    """
+    if len(data) > 1024 or not data.startswith(b"version https://git-lfs"):
+        return None
+    fields = dict(line.split(" ", 1) for line in data.decode(errors="replace").splitlines() if " " in line)
+    oid = fields.get("oid", "")
+    if not oid.startswith("sha256:") or not fields.get("size", "").isdigit():
+        return None
+    return oid[len("sha256:"):], int(fields["size"])
+
+
+def hash_file(path: str, chunk_size: int = CHUNK_SIZE) -> tuple[str, int]:
+    """
+    Returns the LFS object id (SHA-256) and size of a file, reading it chunk by chunk.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def lfs_endpoint(repo_url: str) -> str:
+    """
+    Returns the LFS server URL git-lfs derives from a remote URL, without credentials,
+    e.g. https://github.com/octo/app.git/info/lfs.
+    """
+    parts = urlsplit(repo_url.strip())
+    host = parts.hostname or ""
+    if parts.port:
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/")
+    if not path.endswith(".git"):
+        path += ".git"
+    return urlunsplit((parts.scheme, host, f"{path}/info/lfs", "", ""))
+
+
+def _batch_headers(github_token: str) -> dict:
+    credentials = base64.b64encode(f"x-access-token:{github_token}".encode()).decode()
+    return {"Authorization": f"Basic {credentials}", "Accept": LFS_MEDIA_TYPE, "Content-Type": LFS_MEDIA_TYPE}
+
+
+class LFSCheckpoint:
+    """
+    Append-only record of the LFS objects already uploaded to one server, so an interrupted
+    upload resumes with the objects that are still missing instead of starting over.
+    Each line is "<oid> <size>"; lines are flushed and fsynced as objects complete.
+    Parameters: path (checkpoint file, created on first write).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._done = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                self._done = {line.split()[0] for line in f if line.strip()}
+
+    def __contains__(self, oid: str) -> bool:
+        with self._lock:
+            return oid in self._done
+
+    def __len__(self):
+        with self._lock:
+            return len(self._done)
+
+    def mark(self, oid: str, size: int):
+        with self._lock:
+            if oid in self._done:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(f"{oid} {size}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._done.add(oid)
+
+
+def _batch(session: requests.Session, endpoint: str, objects: list[tuple[str, int, str]], headers: dict, timeout) -> dict[str, dict]:
+    """
+    Asks the LFS server how to upload objects and returns its answer for each, keyed by oid.
+    The token is sent with batch requests only; transfers use the headers the server hands out,
+    since upload URLs usually point at a storage service.
+    Raises requests.exceptions.RequestException if the request fails.
+    """
+    payload = {
+        "operation": "upload",
+        "transfers": ["basic"],
+        "objects": [{"oid": oid, "size": size} for oid, size, _ in objects],
+        "hash_algo": "sha256",
+    }
+    response = session.post(f"{endpoint}/objects/batch", json=payload, timeout=timeout, headers=headers)
+    response.raise_for_status()
+    return {obj["oid"]: obj for obj in response.json().get("objects", [])}
+
+
+def _transfer(session: requests.Session, endpoint: str, batch_headers: dict, oid: str, size: int, path: str, answer: dict,
+              checkpoint: LFSCheckpoint | None, max_retries: int, backoff: float, timeout) -> tuple[bool, str | None]:
+    """
+    Uploads one object following the batch answer, asking for a fresh answer before each retry
+    (upload URLs expire, and the server may have received the object after all). An answer of
+    None, for an object the batch response left out, is retried the same way.
+    """
+    attempt = 0
+    while True:
+        try:
+            if answer is None:
+                raise requests.exceptions.RequestException("LFS batch response did not include the object")
+            if answer.get("error"):
+                error = answer["error"]
+                return False, f"LFS server refused object: {error.get('message', error)}"
+            actions = answer.get("actions") or {}
+            upload = actions.get("upload")
+            if upload is not None:
+                with open(path, "rb") as f:
+                    # Streamed from disk with a Content-Length, never read into memory whole
+                    response = session.put(upload["href"], data=f, timeout=timeout,
+                                           headers={"Content-Type": "application/octet-stream", **upload.get("header", {})})
+                response.raise_for_status()
+                verify = actions.get("verify")
+                if verify is not None:
+                    response = session.post(verify["href"], json={"oid": oid, "size": size}, timeout=timeout,
+                                            headers={"Content-Type": LFS_MEDIA_TYPE, **verify.get("header", {})})
+                    response.raise_for_status()
+                logging.info(f"Uploaded LFS object {oid[:12]} ({size} bytes).")
+            if checkpoint is not None:
+                checkpoint.mark(oid, size)
+            return True, None
+        except (requests.exceptions.RequestException, OSError) as e:
+            if attempt >= max_retries:
+                logging.error(f"Uploading LFS object {oid[:12]} failed: {e}")
+                return False, str(e)
+            delay = backoff * 2 ** attempt
+            attempt += 1
+            logging.warning(f"Uploading LFS object {oid[:12]} failed ({e}); retrying in {delay:.1f}s (attempt {attempt}).")
+            time.sleep(delay)
+            try:
+                answer = _batch(session, endpoint, [(oid, size, path)], batch_headers, timeout).get(oid)
+            except requests.exceptions.RequestException as batch_error:
+                logging.warning(f"Could not refresh the upload action for LFS object {oid[:12]}: {batch_error}")
+
+
+def upload_lfs_objects(endpoint: str, objects: list[tuple[str, int, str]], github_token: str, max_workers: int = 4,
+                       checkpoint: LFSCheckpoint | None = None, max_retries: int = 3, backoff: float = 1.0,
+                       timeout: float | tuple[float, float] = (5, 300)) -> tuple[dict[str, tuple[bool, str | None]] | None, str | None]:
+    """
+    Uploads LFS objects to endpoint through the batch API.
+    Parameters: objects, a list of (oid, size, file path); max_workers (parallel transfers);
+    checkpoint, whose recorded objects are skipped and which records each object as it completes;
+    max_retries and backoff (seconds, doubled per retry) for each transfer.
+    Objects the server already has are not sent again. Files are streamed from disk.
+    Returns a dict mapping each oid to a (success, message) tuple if the batch requests
+    succeeded, None otherwise, along with an error message.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for uploading LFS objects.")
+        return None, "GitHub token is required."
+
+    results = {}
+    remaining = []
+    for oid, size, path in objects:
+        if checkpoint is not None and oid in checkpoint:
+            results[oid] = (True, "Already uploaded.")
+        elif oid not in results:
+            results[oid] = None
+            remaining.append((oid, size, path))
+    if not remaining:
+        return results, None
+
+    session = requests.Session()
+    batch_headers = _batch_headers(github_token)
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    logging.info(f"Uploading {len(remaining)} LFS objects to {endpoint} with {max_workers} workers "
+                 f"({len(objects) - len(remaining)} already uploaded)...")
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for start in range(0, len(remaining), BATCH_SIZE):
+                batch = remaining[start:start + BATCH_SIZE]
+                answers = _batch(session, endpoint, batch, batch_headers, timeout)
+                for oid, size, path in batch:
+                    futures[oid] = executor.submit(_transfer, session, endpoint, batch_headers, oid, size, path, answers.get(oid),
+                                                   checkpoint, max_retries, backoff, timeout)
+            for oid, future in futures.items():
+                results[oid] = future.result()
+    except requests.exceptions.HTTPError as e:
+        logging.error(f"LFS batch request failed: {e}")
+        return None, f"LFS batch request failed: {e.response.status_code} {e.response.text}"
+    except requests.exceptions.RequestException as e:
+        logging.error(f"LFS batch request failed: {e}")
+        return None, str(e)
+    finally:
+        session.close()
+    failed = sum(1 for success, _ in results.values() if not success)
+    logging.info(f"LFS upload finished: {len(results) - failed} of {len(results)} objects on the server.")
+    return results, None
+
+
+def _object_path(git_dir: str, oid: str) -> str:
+    """
+    Returns where git-lfs keeps an object in a repository's local store.
+    """
+    return os.path.join(git_dir, "lfs", "objects", oid[:2], oid[2:4], oid)
+
+
+def _attributes_pattern(path: str) -> str:
+    # .gitattributes patterns are whitespace separated; git-lfs escapes spaces the same way
+    return "/" + path.replace(" ", "[[:space:]]")
+
+
+def stage_large_files(local_path: str, threshold: int = DEFAULT_THRESHOLD) -> list[tuple[str, str, int]]:
+    """
+    Moves files of at least threshold bytes in the working tree of local_path to Git LFS:
+    each is copied into the local LFS store, its pointer is staged in place of the content,
+    and a filter=lfs line is added to .gitattributes. The working tree keeps the real content.
+    Files that already are LFS pointers are left alone. The changes are staged, not committed.
+    Returns (path, oid, size) for every file moved.
+    Raises git.InvalidGitRepositoryError or git.GitCommandError if git fails.
+    """
+    repo = git.Repo(local_path)
+    candidates = repo.git.ls_files("-z", "--cached", "--others", "--exclude-standard").split("\0")
+    staged = []
+    patterns = []
+    for path in candidates:
+        full_path = os.path.join(repo.working_tree_dir, path)
+        if not path or path == ".gitattributes" or not os.path.isfile(full_path) or os.path.islink(full_path):
+            continue
+        if os.path.getsize(full_path) < threshold:
+            continue
+        with open(full_path, "rb") as f:
+            if parse_lfs_pointer(f.read(1025)) is not None:
+                continue
+        oid, size = hash_file(full_path)
+        stored = _object_path(repo.git_dir, oid)
+        if not os.path.exists(stored):
+            os.makedirs(os.path.dirname(stored), exist_ok=True)
+            shutil.copyfile(full_path, f"{stored}.tmp")
+            os.replace(f"{stored}.tmp", stored)
+        pointer = lfs_pointer(oid, size)
+        blob = repo.odb.store(IStream(b"blob", len(pointer), io.BytesIO(pointer)))
+        mode = "100755" if os.access(full_path, os.X_OK) else "100644"
+        repo.git.update_index("--add", "--cacheinfo", f"{mode},{blob.hexsha.decode()},{path}")
+        patterns.append(_attributes_pattern(path))
+        staged.append((path, oid, size))
+        logging.info(f"Staged '{path}' ({size} bytes) as LFS object {oid[:12]}.")
+
+    if patterns:
+        attributes_path = os.path.join(repo.working_tree_dir, ".gitattributes")
+        existing = ""
+        if os.path.exists(attributes_path):
+            with open(attributes_path) as f:
+                existing = f.read()
+        known = {line.split()[0] for line in existing.splitlines() if line.strip()}
+        lines = [f"{pattern} filter=lfs diff=lfs merge=lfs -text" for pattern in patterns if pattern not in known]
+        if lines:
+            with open(attributes_path, "a") as f:
+                if existing and not existing.endswith("\n"):
+                    f.write("\n")
+                f.write("\n".join(lines) + "\n")
+        repo.git.add(".gitattributes")
+    return staged
+
+
+def local_lfs_objects(local_path: str) -> list[tuple[str, int, str]]:
+    """
+    Returns (oid, size, file path) for every object in the local LFS store of local_path.
+    """
+    repo = git.Repo(local_path)
+    store = os.path.join(repo.git_dir, "lfs", "objects")
+    objects = []
+    for dirpath, _, filenames in os.walk(store):
+        for name in filenames:
+            if len(name) == 64 and not name.endswith(".tmp"):
+                path = os.path.join(dirpath, name)
+                objects.append((name, os.path.getsize(path), path))
+    return objects
+
+
+def push_lfs_objects(local_path: str, github_token: str, remote_name: str = "origin", max_workers: int = 4, **kwargs) -> tuple[dict[str, tuple[bool, str | None]] | None, str | None]:
+    """
+    Uploads the local LFS store of local_path to the LFS server of remote_name, resuming from
+    the checkpoint left by an earlier interrupted upload to the same server.
+    The server is taken from lfs.url or remote.<remote_name>.lfsurl in the git config when set,
+    otherwise derived from the remote URL like git-lfs does.
+    Extra keyword arguments are passed to upload_lfs_objects.
+    Returns the result of upload_lfs_objects.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for uploading LFS objects.")
+        return None, "GitHub token is required."
+    try:
+        repo = git.Repo(local_path)
+        reader = repo.config_reader()
+        endpoint = reader.get_value("lfs", "url", "") or reader.get_value(f'remote "{remote_name}"', "lfsurl", "")
+        if not endpoint:
+            endpoint = lfs_endpoint(repo.remote(remote_name).url)
+        objects = local_lfs_objects(local_path)
+    except git.InvalidGitRepositoryError:
+        logging.error(f"Invalid git repository at {local_path}.")
+        return None, f"Invalid git repository at {local_path}."
+    except ValueError: # Raised by repo.remote() for a missing remote
+        logging.error(f"Remote '{remote_name}' does not exist in {local_path}.")
+        return None, f"Remote '{remote_name}' does not exist."
+    if not objects:
+        return {}, None
+    checkpoint_name = f"upload-{hashlib.sha1(endpoint.encode()).hexdigest()[:16]}.checkpoint"
+    checkpoint = LFSCheckpoint(os.path.join(repo.git_dir, "lfs", checkpoint_name))
+    return upload_lfs_objects(endpoint, objects, github_token, max_workers=max_workers, checkpoint=checkpoint, **kwargs)
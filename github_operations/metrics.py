@@ -0,0 +1,276 @@
+import math
+import time
+import logging
+import functools
+import threading
+from collections import deque
+from contextvars import ContextVar
+
+_hook = None
+_current_span: ContextVar["Span | None"] = ContextVar("github_ops_span", default=None)
+
+
+class Span:
+    """
+    Timing record of one operation (clone, push, create, ...).
+    phases maps phase names (e.g. "connect", "negotiate", "transfer", "api_response") to seconds,
+    counters accumulates quantities such as bytes, retries and rate_limit_wait (seconds), and
+    attributes holds descriptive values. status is "ok" or "error" once the span has ended.
+    """
+
+    def __init__(self, name: str, attributes: dict | None = None, parent: "Span | None" = None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = parent
+        self.phases = {}
+        self.counters = {}
+        self.status = None
+        self.error = None
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self.duration = None
+
+    def add(self, counter: str, amount: float = 1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    def add_phase(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def phase(self, phase: str):
+        """
+        Context manager timing its block as (part of) phase.
+        """
+        return _PhaseTimer(self, phase)
+
+    def fail(self, error: str | None):
+        self.status = "error"
+        self.error = error
+
+    def end(self):
+        self.duration = time.perf_counter() - self._started
+        if self.status is None:
+            self.status = "ok"
+
+
+class _PhaseTimer:
+    __slots__ = ("span", "phase", "started")
+
+    def __init__(self, span, phase):
+        self.span = span
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.span.add_phase(self.phase, time.perf_counter() - self.started)
+
+
+class _NoopSpan:
+    """
+    Stand-in returned while metrics are disabled, so instrumented code never has to check.
+    """
+    name = None
+    attributes = phases = counters = {}
+
+    def add(self, counter, amount=1):
+        pass
+
+    def set(self, key, value):
+        pass
+
+    def add_phase(self, phase, seconds):
+        pass
+
+    def phase(self, phase):
+        return _NOOP_PHASE
+
+    def fail(self, error):
+        pass
+
+    def __bool__(self):
+        return False
+
+
+class _NoopPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_NOOP_PHASE = _NoopPhase()
+
+
+def set_metrics_hook(hook):
+    """
+    Installs hook, called as hook(span) with every finished Span, or removes it when hook is None.
+    With no hook installed, instrumentation is reduced to a global lookup per operation.
+    Returns the previous hook.
+    """
+    global _hook
+    previous, _hook = _hook, hook
+    return previous
+
+
+def metrics_enabled() -> bool:
+    return _hook is not None
+
+
+def current_span():
+    """
+    Returns the innermost active span of the calling context, or a no-op span.
+    """
+    return _current_span.get() or _NOOP_SPAN
+
+
+class span:
+    """
+    Context manager opening a Span named name for its block and reporting it to the hook.
+    Yields the no-op span while metrics are disabled. Exceptions mark the span as failed.
+    """
+    __slots__ = ("name", "attributes", "_span", "_token")
+
+    def __init__(self, name: str, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self._span = None
+
+    def __enter__(self):
+        if _hook is None:
+            return _NOOP_SPAN
+        self._span = Span(self.name, self.attributes, parent=_current_span.get())
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._span is None:
+            return
+        _current_span.reset(self._token)
+        if exc is not None:
+            self._span.fail(str(exc) or exc_type.__name__)
+        self._span.end()
+        _emit(self._span)
+
+
+def _emit(finished: Span):
+    hook = _hook
+    if hook is None:
+        return
+    try:
+        hook(finished)
+    except Exception as e:
+        logging.warning(f"Metrics hook failed for span '{finished.name}': {e}")
+
+
+def instrumented(name: str):
+    """
+    Decorator running the function inside a span named name. Functions following the
+    (result, error) convention mark the span as failed when they return a falsy result.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _hook is None:
+                return function(*args, **kwargs)
+            with span(name) as active:
+                outcome = function(*args, **kwargs)
+                if isinstance(outcome, tuple) and len(outcome) == 2 and not outcome[0]:
+                    active.fail(outcome[1])
+                return outcome
+        return wrapper
+    return decorator
+
+
+class MetricsRecorder:
+    """
+    Metrics hook keeping the latency of every span by name in memory, for percentiles such as
+    p99 push latency, and totals of each counter and phase.
+    Parameters: max_samples (latencies kept per span name; older samples are dropped).
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._stats = {}
+
+    def __call__(self, finished: Span):
+        with self._lock:
+            samples = self._samples.get(finished.name)
+            if samples is None:
+                samples = self._samples[finished.name] = deque(maxlen=self.max_samples)
+            samples.append(finished.duration)
+            stats = self._stats.setdefault(finished.name, {"count": 0, "errors": 0, "phases": {}, "counters": {}})
+            stats["count"] += 1
+            stats["errors"] += finished.status == "error"
+            for phase, seconds in finished.phases.items():
+                stats["phases"][phase] = stats["phases"].get(phase, 0.0) + seconds
+            for counter, amount in finished.counters.items():
+                stats["counters"][counter] = stats["counters"].get(counter, 0) + amount
+
+    def percentile(self, name: str, q: float) -> float | None:
+        """
+        Returns the q-th percentile (0-100, nearest rank) of the latency of spans named name, or None without samples.
+        """
+        with self._lock:
+            ordered = sorted(self._samples.get(name, []))
+        return _nearest_rank(ordered, q)
+
+    def summary(self) -> dict:
+        """
+        Returns, per span name, count, errors, p50/p90/p99 and mean latency, and phase and counter totals.
+        """
+        result = {}
+        with self._lock:
+            for name, stats in self._stats.items():
+                ordered = sorted(self._samples[name])
+                result[name] = {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "mean": sum(ordered) / len(ordered) if ordered else None,
+                    "p50": _nearest_rank(ordered, 50),
+                    "p90": _nearest_rank(ordered, 90),
+                    "p99": _nearest_rank(ordered, 99),
+                    "phases": dict(stats["phases"]),
+                    "counters": dict(stats["counters"]),
+                }
+        return result
+
+
+def _nearest_rank(ordered: list, q: float):
+    if not ordered:
+        return None
+    return ordered[min(max(math.ceil(q / 100 * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+
+class OpenTelemetryHook:
+    """
+    Metrics hook exporting spans through OpenTelemetry. Each finished span becomes an OTel span
+    with the original timestamps, its attributes and counters as attributes, phases as
+    "phase.<name>" attributes (seconds), and an error status for failed operations.
+    Parameters: tracer (defaults to the global tracer provider's "github_operations" tracer).
+    Requires the opentelemetry-api package.
+    """
+
+    def __init__(self, tracer=None):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self.tracer = tracer if tracer is not None else trace.get_tracer("github_operations")
+
+    def __call__(self, finished: Span):
+        attributes = {f"github_ops.{key}": value for key, value in finished.attributes.items() if value is not None}
+        attributes.update({f"github_ops.{key}": value for key, value in finished.counters.items()})
+        attributes.update({f"github_ops.phase.{key}": value for key, value in finished.phases.items()})
+        start_ns = int(finished.start_time * 1e9)
+        otel_span = self.tracer.start_span(f"github_ops.{finished.name}", start_time=start_ns, attributes=attributes)
+        if finished.status == "error":
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, finished.error))
+        otel_span.end(end_time=start_ns + int(finished.duration * 1e9))
@@ -0,0 +1,132 @@
+import os
+import fcntl
+import shutil
+import hashlib
+import logging
+import subprocess
+from contextlib import contextmanager
+
+from github_operations.github_ops import git_auth_env, normalize_repo_url
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class MirrorCache:
+    """
+    On-disk cache of bare `git clone --mirror` repositories, keyed by normalized repo URL.
+    Mirrors are refreshed incrementally with `git fetch` and lent to clone_repository as a
+    --reference, so new working copies only download objects the mirror does not have.
+    Each mirror has a lock file: refreshes and eviction take it exclusively, clones take it shared,
+    so several processes can use one cache directory safely.
+    Least recently used mirrors are evicted once the cache grows beyond max_bytes.
+    Parameters: root (cache directory), max_bytes.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 10 * 1024 ** 3):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def key(self, repo_url: str) -> str:
+        return hashlib.sha1(normalize_repo_url(repo_url).encode()).hexdigest()
+
+    def mirror_path(self, repo_url: str) -> str:
+        return os.path.join(self.root, f"{self.key(repo_url)}.git")
+
+    @contextmanager
+    def _locked(self, key: str, shared: bool = False, blocking: bool = True):
+        """
+        Holds the lock file for key. Yields False instead of blocking when blocking is unset
+        and the lock is taken.
+        """
+        with open(os.path.join(self.root, f"{key}.lock"), "a") as lock_file:
+            flags = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            try:
+                fcntl.flock(lock_file, flags if blocking else flags | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _git(self, *args: str, cwd: str | None = None, github_token: str | None = None):
+        auth_env = git_auth_env(github_token) if github_token else {"GIT_TERMINAL_PROMPT": "0"}
+        subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True,
+                       env={**os.environ, **auth_env})
+
+    def update(self, repo_url: str, github_token: str) -> str:
+        """
+        Creates or refreshes the mirror of repo_url and returns its path.
+        Raises subprocess.CalledProcessError if git fails.
+        """
+        key = self.key(repo_url)
+        mirror = self.mirror_path(repo_url)
+        with self._locked(key):
+            if os.path.isdir(mirror):
+                logging.info(f"Refreshing mirror of {repo_url}...")
+                self._git("fetch", "--prune", "--quiet", "origin", "+refs/*:refs/*", cwd=mirror, github_token=github_token)
+            else:
+                logging.info(f"Creating mirror of {repo_url} in {mirror}...")
+                staging = f"{mirror}.tmp-{os.getpid()}"
+                shutil.rmtree(staging, ignore_errors=True)
+                self._git("clone", "--mirror", "--quiet", repo_url, staging, github_token=github_token)
+                os.replace(staging, mirror)
+            os.utime(mirror)
+        self.evict(keep=key)
+        return mirror
+
+    @contextmanager
+    def reference(self, repo_url: str, github_token: str):
+        """
+        Refreshes the mirror of repo_url and yields its path while holding a shared lock,
+        so it cannot be refreshed or evicted while a clone is reading from it.
+        """
+        for _ in range(3):
+            mirror = self.update(repo_url, github_token)
+            with self._locked(self.key(repo_url), shared=True):
+                # Another worker may have evicted it between the refresh and taking the lock
+                if os.path.isdir(mirror):
+                    yield mirror
+                    return
+        raise RuntimeError(f"Mirror of {repo_url} was evicted before it could be used.")
+
+    def evict(self, keep: str | None = None) -> list[str]:
+        """
+        Removes least recently used mirrors until the cache fits in max_bytes.
+        Mirrors in use by other workers, and the one named by keep, are skipped.
+        Returns the paths removed.
+        """
+        mirrors = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.endswith(".git") and os.path.isdir(path):
+                mirrors.append((os.path.getmtime(path), name[:-4], path, _directory_size(path)))
+        total = sum(size for _, _, _, size in mirrors)
+        removed = []
+        for _, key, path, size in sorted(mirrors):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            with self._locked(key, blocking=False) as acquired:
+                if not acquired:
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed.append(path)
+            logging.info(f"Evicted mirror {path} ({size} bytes) from cache.")
+        return removed
+
+    def size(self) -> int:
+        return _directory_size(self.root)
@@ -0,0 +1,217 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+
+from github_operations.cache import _token_key
+
+# Statuses GitHub uses for primary and secondary (abuse) rate limiting
+RATE_LIMIT_STATUSES = (403, 429)
+
+
+class RateLimiter:
+    """
+    Per-token request scheduler for the GitHub API.
+    Paces requests with a token bucket (rate requests per second, up to burst at once) and
+    tracks the X-RateLimit-Remaining/Reset budget reported by GitHub. Once fewer than
+    low_water of the budget is left, the remaining requests are spread evenly until the reset,
+    and when it is exhausted callers wait for the reset instead of failing.
+    Rate-limit responses (403/429) put every caller for the token on hold for Retry-After,
+    the reset time, or a jittered exponential backoff.
+    Parameters: rate (None disables static pacing), burst, low_water (fraction of the limit),
+    max_retries, backoff_base and backoff_max (seconds).
+    """
+
+    def __init__(self, rate: float | None = None, burst: int = 10, low_water: float = 0.1,
+                 max_retries: int = 3, backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.low_water = low_water
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._tokens = float(burst)
+        self._last_refill = clock()
+        self._blocked_until = 0.0
+        self._waiting = 0
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None # Epoch seconds, as sent in X-RateLimit-Reset
+        self.total_wait = 0.0
+        self.retries = 0
+
+    def _current_rate(self) -> float | None:
+        """
+        Returns the refill rate in requests per second, or None if requests are not paced.
+        """
+        rate = self.rate
+        if self.remaining is not None and self.reset_at is not None and self.limit:
+            if self.remaining <= self.limit * self.low_water:
+                window = max(self.reset_at - time.time(), 1.0)
+                budget_rate = max(self.remaining, 0) / window
+                rate = budget_rate if rate is None else min(rate, budget_rate)
+        return rate
+
+    def _delay(self) -> float:
+        """
+        Returns how long the next request has to wait, taking a token if it can go now.
+        Called with the condition held.
+        """
+        now = self._clock()
+        if self._blocked_until > now:
+            return self._blocked_until - now
+        if self.remaining is not None and self.remaining <= 0 and self.reset_at is not None:
+            reset_wait = self.reset_at - time.time()
+            if reset_wait > 0:
+                return reset_wait
+            self.remaining = None # The window has reset; the next response reports the new budget
+        rate = self._current_rate()
+        if rate is None:
+            return 0.0
+        if rate <= 0:
+            return 1.0
+        self._tokens = min(float(self.burst), self._tokens + (now - self._last_refill) * rate)
+        self._last_refill = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / rate
+
+    def acquire(self) -> float:
+        """
+        Blocks until a request may be sent and returns the seconds spent waiting.
+        """
+        waited = 0.0
+        with self._condition:
+            self._waiting += 1
+            try:
+                while True:
+                    delay = self._delay()
+                    if delay <= 0:
+                        break
+                    started = self._clock()
+                    self._condition.wait(timeout=delay)
+                    waited += self._clock() - started
+                self.total_wait += waited
+            finally:
+                self._waiting -= 1
+        if waited:
+            logging.info(f"Rate limiter delayed request by {waited:.2f}s.")
+        return waited
+
+    async def acquire_async(self) -> float:
+        """
+        Awaitable acquire for asyncio callers: waits with asyncio.sleep instead of blocking the
+        event loop, sharing the same budget and backoff as threads calling acquire.
+        Returns the seconds spent waiting.
+        """
+        waited = 0.0
+        with self._condition:
+            self._waiting += 1
+        try:
+            while True:
+                with self._condition:
+                    delay = self._delay()
+                if delay <= 0:
+                    break
+                started = self._clock()
+                await asyncio.sleep(delay)
+                waited += self._clock() - started
+        finally:
+            with self._condition:
+                self._waiting -= 1
+                self.total_wait += waited
+        if waited:
+            logging.info(f"Rate limiter delayed request by {waited:.2f}s.")
+        return waited
+
+    def observe(self, status_code: int, headers, attempt: int = 0, body: str = "") -> float | None:
+        """
+        Records the budget reported by a response.
+        Returns the seconds to back off before retrying if the response is a rate-limit rejection,
+        otherwise None.
+        """
+        with self._condition:
+            if headers.get("X-RateLimit-Limit"):
+                self.limit = int(headers["X-RateLimit-Limit"])
+            if headers.get("X-RateLimit-Remaining"):
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+            if headers.get("X-RateLimit-Reset"):
+                self.reset_at = float(headers["X-RateLimit-Reset"])
+
+            if not self._is_rate_limited(status_code, headers, body):
+                self._condition.notify_all()
+                return None
+
+            retry_after = headers.get("Retry-After")
+            if retry_after:
+                delay = float(retry_after)
+            elif self.remaining == 0 and self.reset_at is not None:
+                delay = max(self.reset_at - time.time(), 0.0)
+            else:
+                # Full jitter keeps throttled workers from retrying in lockstep
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            self._blocked_until = max(self._blocked_until, self._clock() + delay)
+            self.retries += 1
+            logging.warning(f"GitHub rate limit hit (status {status_code}); backing off for {delay:.2f}s.")
+            return delay
+
+    def _is_rate_limited(self, status_code: int, headers, body: str) -> bool:
+        if status_code == 429:
+            return True
+        if status_code != 403:
+            return False
+        # 403 is also used for permission errors, which must not be retried
+        return bool(headers.get("Retry-After")) or headers.get("X-RateLimit-Remaining") == "0" \
+            or "rate limit" in body.lower()
+
+    def budget(self) -> dict:
+        """
+        Returns a snapshot of the scheduler state: the GitHub budget (limit, remaining, reset_at),
+        the pacing state (tokens, rate, blocked_for) and queue_depth, the number of callers waiting.
+        """
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "remaining": self.remaining,
+                "reset_at": self.reset_at,
+                "tokens": self._tokens,
+                "rate": self._current_rate(),
+                "blocked_for": max(self._blocked_until - self._clock(), 0.0),
+                "queue_depth": self._waiting,
+                "total_wait": self.total_wait,
+                "retries": self.retries,
+            }
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+
+# Shared limiters keyed by token digest; more than github_ops.MAX_SHARED_CLIENTS, so a
+# shared client's limiter is not dropped while the client is still shared
+MAX_SHARED_LIMITERS = 1024
+_limiters: OrderedDict[str, RateLimiter] = OrderedDict()
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(github_token: str, **kwargs) -> RateLimiter:
+    """
+    Returns the RateLimiter shared by every client using github_token, creating it on first use.
+    Beyond MAX_SHARED_LIMITERS tokens the least recently used limiter is dropped.
+    """
+    key = _token_key(github_token)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(**kwargs)
+            _limiters[key] = limiter
+        _limiters.move_to_end(key)
+        while len(_limiters) > MAX_SHARED_LIMITERS:
+            _limiters.popitem(last=False)
+        return limiter
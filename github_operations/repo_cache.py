@@ -0,0 +1,136 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+import git
+
+
+class RepoCache:
+    """
+    Bounded, thread-safe pool of open git.Repo handles keyed by working copy path.
+    A git.Repo keeps its `git cat-file --batch` helper processes and object database open for
+    as long as it lives, so reusing handles lets repeated pushes and syncs on the same clones
+    skip the process startup. A handle is lent to one caller at a time, since GitPython's
+    persistent helpers are not safe to share between threads; concurrent callers on the same
+    path get separate handles.
+    Idle handles are closed once more than maxsize are kept or after idle_timeout seconds unused.
+    Parameters: maxsize (idle handles kept across all paths), idle_timeout (seconds).
+    """
+
+    def __init__(self, maxsize: int = 32, idle_timeout: float = 300.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self._idle = [] # (last_used, path, repo), oldest first
+        self._lock = threading.Lock()
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+
+    def _take_idle(self, path: str) -> git.Repo | None:
+        """
+        Removes and returns the most recently used idle handle for path, if any.
+        Called with the lock held.
+        """
+        for index in range(len(self._idle) - 1, -1, -1):
+            if self._idle[index][1] == path:
+                return self._idle.pop(index)[2]
+        return None
+
+    def _expired(self) -> list[git.Repo]:
+        """
+        Removes handles that have been idle too long or overflow maxsize and returns them.
+        Called with the lock held.
+        """
+        deadline = self._clock() - self.idle_timeout
+        stale = [entry for entry in self._idle if entry[0] <= deadline]
+        self._idle = [entry for entry in self._idle if entry[0] > deadline]
+        while len(self._idle) > self.maxsize:
+            stale.append(self._idle.pop(0))
+        return [repo for _, _, repo in stale]
+
+    @staticmethod
+    def _close(repos: list[git.Repo]):
+        for repo in repos:
+            try:
+                repo.close()
+            except Exception as e:
+                logging.warning(f"Failed to close repository handle for {repo.working_dir}: {e}")
+
+    def acquire(self, local_path: str) -> git.Repo:
+        """
+        Returns an open handle for local_path, reusing an idle one when possible.
+        Raises git.InvalidGitRepositoryError or git.NoSuchPathError like git.Repo.
+        """
+        path = os.path.realpath(local_path)
+        with self._lock:
+            repo = self._take_idle(path)
+            stale = self._expired()
+            # The clone may have been deleted or replaced since the handle was returned
+            if repo is not None and not os.path.isdir(repo.git_dir):
+                stale.append(repo)
+                repo = None
+            if repo is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        self._close(stale)
+        return repo if repo is not None else git.Repo(path)
+
+    def release(self, repo: git.Repo, discard: bool = False):
+        """
+        Returns a handle taken with acquire to the pool, or closes it when discard is set
+        (for example after a failed git command left it in an unknown state).
+        """
+        if discard or self._closed:
+            self._close([repo])
+            return
+        with self._lock:
+            self._idle.append((self._clock(), os.path.realpath(repo.working_dir), repo))
+            stale = self._expired()
+        self._close(stale)
+
+    @contextmanager
+    def lease(self, local_path: str):
+        """
+        Yields a handle for local_path and returns it to the pool afterwards.
+        The handle is closed instead if the block raises.
+        """
+        repo = self.acquire(local_path)
+        try:
+            yield repo
+        except BaseException:
+            self.release(repo, discard=True)
+            raise
+        self.release(repo)
+
+    def evict_idle(self) -> int:
+        """
+        Closes handles that have been idle longer than idle_timeout and returns how many were closed.
+        """
+        with self._lock:
+            stale = self._expired()
+        self._close(stale)
+        return len(stale)
+
+    def close(self):
+        """
+        Closes every idle handle. Handles still lent out are closed when they are released.
+        """
+        with self._lock:
+            self._closed = True
+            stale = [repo for _, _, repo in self._idle]
+            self._idle = []
+        self._close(stale)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._idle)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,280 @@
+import time
+import inspect
+import logging
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from github_operations.github_ops import _token_key
+from github_operations.metrics import _nearest_rank, current_span
+
+# Priorities: lower values are admitted first
+INTERACTIVE = 0
+BATCH = 1
+_PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+
+# Hosts assumed for calls that name neither a host nor a URL: API calls and git transfers
+API_HOST = "api.github.com"
+GIT_HOST = "github.com"
+
+
+def host_of(url: str) -> str:
+    """
+    Returns the host a repository or API URL points at, e.g. "github.com", or "local" for file URLs and paths.
+    """
+    return urlsplit(url).hostname or "local"
+
+
+def _call_target(function, args: tuple, kwargs: dict) -> tuple[str, str]:
+    """
+    Returns the (github_token, host) of the call function(*args, **kwargs), binding its arguments
+    to function's signature so a token passed positionally is found too. The host comes from a
+    repo_url argument, else from the base_url of a client argument; calls on a local clone
+    (a local_path argument) go to GIT_HOST and anything else to API_HOST.
+    Raises ValueError if the call has no github_token.
+    """
+    try:
+        arguments = inspect.signature(function).bind_partial(*args, **kwargs).arguments
+    except (TypeError, ValueError): # Uninspectable callables or arguments the signature rejects
+        arguments = kwargs
+    github_token = arguments.get("github_token")
+    if not github_token:
+        raise ValueError(f"Scheduled call to {getattr(function, '__name__', function)} has no github_token; "
+                         "pass it as an argument or use slot() directly.")
+    if arguments.get("repo_url"):
+        host = host_of(arguments["repo_url"])
+    elif getattr(arguments.get("client"), "base_url", None):
+        host = host_of(arguments["client"].base_url)
+    elif arguments.get("local_path"):
+        host = GIT_HOST
+    else:
+        host = API_HOST
+    return github_token, host
+
+
+class _Waiter:
+    __slots__ = ("tenant", "token_key", "host", "priority", "start_tag", "seq", "admitted")
+
+    def __init__(self, tenant, token_key, host, priority, start_tag, seq):
+        self.tenant = tenant
+        self.token_key = token_key
+        self.host = host
+        self.priority = priority
+        self.start_tag = start_tag
+        self.seq = seq
+        self.admitted = False
+
+
+class _WaitStats:
+    """
+    Queue-wait statistics of one tenant or priority class, with the last samples kept for percentiles.
+    """
+
+    def __init__(self, samples: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=samples)
+
+    def add(self, waited: float):
+        self.count += 1
+        self.total += waited
+        self.max = max(self.max, waited)
+        self.samples.append(waited)
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+        return {"count": self.count, "mean": self.total / self.count if self.count else None,
+                "max": self.max, "p50": _nearest_rank(ordered, 50), "p99": _nearest_rank(ordered, 99)}
+
+
+class FairScheduler:
+    """
+    Admission control for github_ops calls made on behalf of many tenants.
+    At most max_concurrent calls run at once, at most per_token with the same token, and at
+    most per_host against the same host (an int for every host, or a dict of host -> limit).
+    Among the waiting calls that fit those caps, interactive ones go before batch ones, and
+    within a priority tenants share the slots by weight with start-time fair queuing: a tenant
+    with weight 2 is admitted twice as often as one with weight 1 while both have calls waiting,
+    however many calls either has queued.
+    Parameters: max_concurrent, per_token, per_host, weights (dict of tenant -> weight, default 1),
+    wait_samples (queue-wait samples kept per tenant and priority for percentiles) and
+    max_tracked (tenants and priorities whose wait statistics are kept, the least recently
+    active being dropped beyond it; also bounds the fair-queuing state kept for idle tenants).
+    """
+
+    def __init__(self, max_concurrent: int = 16, per_token: int | None = 4, per_host: int | dict[str, int] | None = None,
+                 weights: dict[str, float] | None = None, wait_samples: int = 1000, max_tracked: int = 1000):
+        self.max_concurrent = max_concurrent
+        self.per_token = per_token
+        self.per_host = per_host
+        self.weights = dict(weights or {})
+        self.wait_samples = wait_samples
+        self.max_tracked = max_tracked
+        self._condition = threading.Condition()
+        self._waiting = []
+        self._running = 0
+        self._running_by_token = {}
+        self._running_by_host = {}
+        self._running_by_tenant = {}
+        self._finish_tags = {}
+        self._finish_tags_kept = 0
+        self._virtual_time = 0.0
+        self._seq = 0
+        self._tenant_waits = OrderedDict()
+        self._priority_waits = OrderedDict()
+
+    def set_weight(self, tenant: str, weight: float):
+        with self._condition:
+            self.weights[tenant] = weight
+
+    def _host_limit(self, host: str) -> int | None:
+        if isinstance(self.per_host, dict):
+            return self.per_host.get(host)
+        return self.per_host
+
+    def _fits(self, waiter: _Waiter) -> bool:
+        if self.per_token is not None and self._running_by_token.get(waiter.token_key, 0) >= self.per_token:
+            return False
+        host_limit = self._host_limit(waiter.host)
+        return host_limit is None or self._running_by_host.get(waiter.host, 0) < host_limit
+
+    def _dispatch(self):
+        """
+        Admits waiting calls while there is capacity. Called with the condition held.
+        """
+        admitted = False
+        while self._running < self.max_concurrent:
+            eligible = [waiter for waiter in self._waiting if self._fits(waiter)]
+            if not eligible:
+                break
+            waiter = min(eligible, key=lambda w: (w.priority, w.start_tag, w.seq))
+            self._waiting.remove(waiter)
+            self._virtual_time = max(self._virtual_time, waiter.start_tag)
+            self._running += 1
+            for counts, key in ((self._running_by_token, waiter.token_key), (self._running_by_host, waiter.host),
+                                (self._running_by_tenant, waiter.tenant)):
+                counts[key] = counts.get(key, 0) + 1
+            waiter.admitted = admitted = True
+        if admitted:
+            self._condition.notify_all()
+
+    def _leave(self, waiter: _Waiter):
+        """
+        Frees the slot of an admitted call and admits the next ones. Called with the condition held.
+        """
+        self._running -= 1
+        for counts, key in ((self._running_by_token, waiter.token_key), (self._running_by_host, waiter.host),
+                            (self._running_by_tenant, waiter.tenant)):
+            counts[key] -= 1
+            if not counts[key]:
+                del counts[key]
+        self._dispatch()
+        self._prune_finish_tags()
+
+    def _prune_finish_tags(self):
+        """
+        Drops the finish tags that no longer affect scheduling. A tag at or below the virtual time
+        is the same as having none, since a tenant's next start tag is the larger of the two.
+        If more than max_tracked tags are left (the virtual time stands still while only new
+        tenants are admitted), those of idle tenants go too; such a tenant gets at most one
+        call's head start when it returns.
+        Runs a sweep only once the tags have doubled since the last one, so the cost is amortized.
+        Called with the condition held.
+        """
+        if len(self._finish_tags) <= max(64, 2 * self._finish_tags_kept):
+            return
+        tags = {tenant: tag for tenant, tag in self._finish_tags.items() if tag > self._virtual_time}
+        if len(tags) > self.max_tracked:
+            active = set(self._running_by_tenant) | {waiter.tenant for waiter in self._waiting}
+            tags = {tenant: tag for tenant, tag in tags.items() if tenant in active}
+        self._finish_tags = tags
+        self._finish_tags_kept = len(tags)
+
+    def _record_wait(self, stats: OrderedDict, key, waited: float):
+        """
+        Adds a queue wait to the statistics of key, dropping the least recently updated entry
+        beyond max_tracked. Called with the condition held.
+        """
+        waits = stats.pop(key, None) or _WaitStats(self.wait_samples)
+        waits.add(waited)
+        stats[key] = waits
+        while len(stats) > self.max_tracked:
+            stats.popitem(last=False)
+
+    @contextmanager
+    def slot(self, github_token: str, host: str = API_HOST, priority: int = BATCH, tenant: str | None = None, cost: float = 1.0):
+        """
+        Context manager that blocks until a call for github_token against host may run, and
+        holds its slot for the duration of the block. Yields the seconds spent queued.
+        tenant defaults to the token (as a digest), and cost is the share of the tenant's
+        budget the call uses (e.g. higher for a large clone).
+        """
+        token_key = _token_key(github_token or "")
+        tenant = tenant or token_key[:12]
+        started = time.monotonic()
+        with self._condition:
+            weight = self.weights.get(tenant, 1.0)
+            start_tag = max(self._virtual_time, self._finish_tags.get(tenant, 0.0))
+            self._finish_tags[tenant] = start_tag + cost / weight
+            self._seq += 1
+            waiter = _Waiter(tenant, token_key, host, priority, start_tag, self._seq)
+            self._waiting.append(waiter)
+            try:
+                self._dispatch()
+                while not waiter.admitted:
+                    self._condition.wait()
+            except BaseException:
+                if waiter.admitted:
+                    self._leave(waiter)
+                else:
+                    self._waiting.remove(waiter)
+                raise
+            waited = time.monotonic() - started
+            self._record_wait(self._tenant_waits, tenant, waited)
+            self._record_wait(self._priority_waits, priority, waited)
+        if waited > 1:
+            logging.info(f"Call for tenant '{tenant}' waited {waited:.2f}s for a slot on {host}.")
+        current_span().add("queue_wait", waited)
+        try:
+            yield waited
+        finally:
+            with self._condition:
+                self._leave(waiter)
+
+    def call(self, function, *args, host: str | None = None, priority: int = BATCH, tenant: str | None = None, cost: float = 1.0, **kwargs):
+        """
+        Runs function(*args, **kwargs), typically a github_ops function, once it is admitted.
+        The token is function's github_token argument, whether passed by keyword or position, and
+        host defaults to the host of its repo_url (see _call_target).
+        Returns what function returns.
+        Raises ValueError, before queueing, if the call has no github_token.
+        """
+        github_token, target_host = _call_target(function, args, kwargs)
+        with self.slot(github_token, host=host or target_host, priority=priority, tenant=tenant, cost=cost):
+            return function(*args, **kwargs)
+
+    def stats(self) -> dict:
+        """
+        Returns the calls running and queued overall, and per tenant and per priority the
+        queue-wait count, mean, max, p50 and p99 in seconds.
+        """
+        with self._condition:
+            queued_by_tenant = {}
+            for waiter in self._waiting:
+                queued_by_tenant[waiter.tenant] = queued_by_tenant.get(waiter.tenant, 0) + 1
+            tenants = set(self._tenant_waits) | set(queued_by_tenant) | set(self._running_by_tenant)
+            return {
+                "running": self._running,
+                "queued": len(self._waiting),
+                "tenants": {tenant: {
+                    "weight": self.weights.get(tenant, 1.0),
+                    "running": self._running_by_tenant.get(tenant, 0),
+                    "queued": queued_by_tenant.get(tenant, 0),
+                    "wait": self._tenant_waits[tenant].summary() if tenant in self._tenant_waits else _WaitStats(0).summary(),
+                } for tenant in tenants},
+                "priorities": {_PRIORITY_NAMES.get(priority, str(priority)): waits.summary()
+                               for priority, waits in self._priority_waits.items()},
+            }
@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import base64
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from github_operations.github_ops import git_blob_sha
+
+# Offline stand-ins for GitHub shared by the tests and the benchmarks
+
+
+class StubGitHubServer:
+    """
+    Minimal local HTTP server standing in for api.github.com.
+    Register responses with `route(method, path, handler)`, where handler is either a
+    (status, body[, headers]) tuple or a callable taking the request dict and returning one.
+    Every request is recorded in `requests`, and `connections` counts accepted TCP connections.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                path, _, query = self.path.partition("?")
+                request = {"method": self.command, "path": path, "query": query,
+                           "headers": dict(self.headers), "body": body}
+                with server._lock:
+                    server.requests.append(request)
+                    handler = server.routes.get((self.command, path))
+                if handler is None:
+                    response = (404, {"message": "Not Found"})
+                elif callable(handler):
+                    response = handler(request)
+                else:
+                    response = handler
+                status, payload, headers = (tuple(response) + ({},))[:3]
+                if isinstance(payload, (dict, list)):
+                    data = json.dumps(payload).encode()
+                elif isinstance(payload, str):
+                    data = payload.encode()
+                else:
+                    data = payload or b""
+                self.send_response(status)
+                headers = {"Content-Type": "application/json", **headers}
+                for key, value in headers.items():
+                    self.send_header(key, str(value))
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _handle
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    def route(self, method: str, path: str, handler):
+        with self._lock:
+            self.routes[(method, path)] = handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class StubGitData:
+    """
+    Git Data API of one repository on a StubGitHubServer, enough for commit_files and ingest_zip.
+    branch points at commit "parent-sha" whose tree "base-tree-sha" holds files, a dict of
+    path to blob content (bytes or str) or to a (mode, blob sha) pair. Each directory is a tree
+    of its own ("<dir>-tree-sha", with "/" as "-"), and ?recursive=1 lists the whole tree.
+    Uploaded blobs are kept in `blobs` (sha to content) after blob_delay seconds, with the most
+    concurrent uploads in `peak_uploads`; created trees and commits are recorded as request
+    bodies in `trees` and `commits`, answered as "new-tree-sha" and "new-commit-sha", and `ref`
+    follows ref updates.
+    """
+
+    def __init__(self, stub: StubGitHubServer, files: dict, repo: str = "user/repo", branch: str = "main"):
+        self.stub = stub
+        self.base = f"/repos/{repo}/git"
+        self.branch = branch
+        self.ref = "parent-sha"
+        self.blobs = {}
+        self.trees = []
+        self.commits = []
+        self.blob_delay = 0.0
+        self.peak_uploads = 0
+        self._uploads = 0
+        self._lock = threading.Lock()
+        self._commit_trees = {"parent-sha": "base-tree-sha"}
+
+        listings = {"": []}
+        for path, entry in files.items():
+            mode, sha = entry if isinstance(entry, tuple) else ("100644", git_blob_sha(entry.encode() if isinstance(entry, str) else entry))
+            parts = path.split("/")
+            for depth in range(1, len(parts)):
+                directory = "/".join(parts[:depth])
+                if directory not in listings:
+                    listings[directory] = []
+                    listings["/".join(parts[:depth - 1])].append(
+                        {"path": parts[depth - 1], "mode": "040000", "type": "tree", "sha": _tree_sha(directory)})
+            listings["/".join(parts[:-1])].append({"path": parts[-1], "mode": mode, "type": "blob", "sha": sha})
+        for directory in listings:
+            stub.route("GET", f"{self.base}/trees/{_tree_sha(directory)}", self._list_tree(directory, listings))
+
+        stub.route("GET", f"{self.base}/ref/heads/{branch}", lambda request: (200, {"object": {"sha": self.ref}}))
+        stub.route("POST", f"{self.base}/blobs", self._create_blob)
+        stub.route("POST", f"{self.base}/trees", self._create_tree)
+        stub.route("POST", f"{self.base}/commits", self._create_commit)
+        stub.route("PATCH", f"{self.base}/refs/heads/{branch}", self._update_ref)
+        for sha in ("parent-sha", "new-commit-sha"):
+            stub.route("GET", f"{self.base}/commits/{sha}", self._get_commit)
+
+    def requests(self, method: str, endpoint: str) -> list[dict]:
+        """Returns the requests made with method to the Git Data endpoint (e.g. "blobs", "trees/")."""
+        return [request for request in self.stub.requests
+                if request["method"] == method and request["path"].startswith(f"{self.base}/{endpoint}")]
+
+    def _list_tree(self, directory, listings):
+        def handler(request):
+            tree = [dict(entry) for entry in listings[directory]]
+            if "recursive=1" in request["query"]:
+                tree = []
+                for inner, entries in listings.items():
+                    if not directory or inner == directory or inner.startswith(f"{directory}/"):
+                        relative = inner[len(directory):].lstrip("/")
+                        tree += [{**entry, "path": f"{relative}/{entry['path']}" if relative else entry["path"]} for entry in entries]
+            return 200, {"sha": _tree_sha(directory), "truncated": False, "tree": tree}
+        return handler
+
+    def _create_blob(self, request):
+        with self._lock:
+            self._uploads += 1
+            self.peak_uploads = max(self.peak_uploads, self._uploads)
+        time.sleep(self.blob_delay)
+        data = base64.b64decode(json.loads(request["body"])["content"])
+        sha = git_blob_sha(data)
+        with self._lock:
+            self.blobs[sha] = data
+            self._uploads -= 1
+        return 201, {"sha": sha}
+
+    def _create_tree(self, request):
+        self.trees.append(json.loads(request["body"]))
+        return 201, {"sha": "new-tree-sha"}
+
+    def _create_commit(self, request):
+        self.commits.append(json.loads(request["body"]))
+        self._commit_trees["new-commit-sha"] = self.commits[-1]["tree"]
+        return 201, {"sha": "new-commit-sha", "tree": {"sha": self.commits[-1]["tree"]}, "message": self.commits[-1]["message"]}
+
+    def _get_commit(self, request):
+        sha = request["path"].rsplit("/", 1)[1]
+        if sha not in self._commit_trees:
+            return 404, {"message": "Not Found"}
+        return 200, {"sha": sha, "tree": {"sha": self._commit_trees[sha]}}
+
+    def _update_ref(self, request):
+        self.ref = json.loads(request["body"])["sha"]
+        return 200, {"ref": f"refs/heads/{self.branch}", "object": {"sha": self.ref}}
+
+
+def _tree_sha(directory: str) -> str:
+    return f"{directory.replace('/', '-')}-tree-sha" if directory else "base-tree-sha"
+
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "Test", "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "Test", "GIT_COMMITTER_EMAIL": "test@example.com",
+}
+
+
+def run_git(*args, cwd=None):
+    """Runs git for test setup and returns its stripped stdout."""
+    return subprocess.run(["git", *args], cwd=cwd, env={**os.environ, **GIT_ENV},
+                          check=True, capture_output=True, text=True).stdout.strip()
+
+
+def make_bare_repo(root, files=None, commits=1, branch="main"):
+    """
+    Creates a bare repository under root with `commits` commits on branch and returns its path.
+    files maps paths to contents for the first commit; later commits append to history.txt.
+    """
+    work = os.path.join(root, "work")
+    bare = os.path.join(root, "origin.git")
+    run_git("init", "-q", "-b", branch, work)
+    for path, content in (files or {"README.md": "# Test\n"}).items():
+        full_path = os.path.join(work, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "wb") as f:
+            f.write(content if isinstance(content, bytes) else content.encode())
+    run_git("add", "-A", cwd=work)
+    run_git("commit", "-q", "-m", "Initial commit", cwd=work)
+    for i in range(1, commits):
+        with open(os.path.join(work, "history.txt"), "a") as f:
+            f.write(f"change {i}\n")
+        run_git("add", "-A", cwd=work)
+        run_git("commit", "-q", "-m", f"Change {i}", cwd=work)
+    run_git("clone", "-q", "--bare", work, bare)
+    return bare
+
+
+def commit_locally(local_path, name, content=None):
+    """Writes name (with content, or its own name) in the clone at local_path and commits it."""
+    with open(os.path.join(local_path, name), "w") as f:
+        f.write(name if content is None else content)
+    run_git("add", "-A", cwd=local_path)
+    run_git("commit", "-q", "-m", name, cwd=local_path)
@@ -0,0 +1,73 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    key TEXT PRIMARY KEY,
+    info TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class TokenCache:
+    """
+    Persistent SQLite cache of token validations (see github_ops.validate_token), so a token
+    checked by one process or before a restart is not checked again until ttl seconds have passed.
+    Entries are keyed by the token digest from cache._token_key; raw tokens are never stored.
+    Has the get/set interface of cache.TTLCache, so either can be passed as token_cache.
+    Parameters: path (database file, created if missing), ttl (seconds).
+    """
+
+    def __init__(self, path: str, ttl: float = 300.0, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self._clock = clock
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+
+    def get(self, key: str, default=None):
+        """
+        Returns the validation stored for key, or default if it is missing or expired.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT info, expires_at FROM tokens WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= self._clock():
+            return default
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict, ttl: float | None = None):
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO tokens (key, info, expires_at) VALUES (?, ?, ?)",
+                                     (key, json.dumps(value), expires_at))
+
+    def pop(self, key: str, default=None):
+        value = self.get(key, default)
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM tokens WHERE key = ?", (key,))
+        return value
+
+    def purge_expired(self) -> int:
+        """
+        Deletes expired entries and returns how many were removed.
+        """
+        with self._lock, self._connection:
+            return self._connection.execute("DELETE FROM tokens WHERE expires_at <= ?", (self._clock(),)).rowcount
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,210 @@
+import io
+import base64
+import hashlib
+import logging
+import posixpath
+import stat
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from github_operations.github_ops import GitHubClient, _api_error_message, _branch_tip, _commit_tree, _git_data
+
+# Multiple of 3 so every chunk but the last encodes to base64 without padding
+CHUNK_SIZE = 3 * 256 * 1024
+
+
+def _entry_blob_sha(archive: zipfile.ZipFile, info: zipfile.ZipInfo, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Returns the git blob SHA of a ZIP entry, decompressing it chunk by chunk.
+    """
+    digest = hashlib.sha1(b"blob %d\0" % info.file_size)
+    with archive.open(info) as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entry_mode(info: zipfile.ZipInfo) -> str:
+    """
+    Returns the git file mode for a ZIP entry, keeping symlinks (whose content is the link
+    target) and the executable bit of Unix archives.
+    """
+    unix_mode = info.external_attr >> 16
+    if stat.S_ISLNK(unix_mode):
+        return "120000"
+    return "100755" if unix_mode & 0o111 else "100644"
+
+
+class _Base64BlobBody:
+    """
+    File-like request body for the create-blob endpoint that base64-encodes a ZIP entry while
+    it is being sent, so at most one chunk of the entry is held in memory.
+    Its length is known up front, so requests sends it with a Content-Length instead of chunked.
+    """
+
+    _PREFIX = b'{"encoding": "base64", "content": "'
+    _SUFFIX = b'"}'
+
+    def __init__(self, archive: zipfile.ZipFile, info: zipfile.ZipInfo, chunk_size: int = CHUNK_SIZE):
+        self._archive = archive
+        self._info = info
+        self._chunk_size = chunk_size - chunk_size % 3 or 3
+        self._length = len(self._PREFIX) + 4 * ((info.file_size + 2) // 3) + len(self._SUFFIX)
+        self._source = None
+        self._buffer = b""
+        self._done = False
+
+    def __len__(self):
+        return self._length
+
+    def _next_piece(self) -> bytes:
+        if self._source is None:
+            self._source = self._archive.open(self._info)
+            return self._PREFIX
+        chunk = self._source.read(self._chunk_size)
+        if chunk:
+            return base64.b64encode(chunk)
+        self._source.close()
+        self._done = True
+        return self._SUFFIX
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._done and (size < 0 or len(self._buffer) < size):
+            self._buffer += self._next_piece()
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def seek(self, offset: int, whence: int = 0):
+        """
+        Rewinds the body so a rejected request can be sent again; only seek(0) is supported.
+        There is deliberately no tell(), which would make requests probe the length by seeking.
+        """
+        if (offset, whence) != (0, 0):
+            raise io.UnsupportedOperation("Blob bodies can only be rewound to the start.")
+        self.close()
+        self._source = None
+        self._buffer = b""
+        self._done = False
+
+    def close(self):
+        if self._source is not None:
+            self._source.close()
+
+
+def _remote_blobs(owner: str, repo_name: str, tree_sha: str, github_token: str, client: GitHubClient) -> dict[str, str]:
+    """
+    Returns a mapping of path to blob SHA for every file in tree_sha.
+    A truncated listing (very large trees) is used as far as it goes; missing entries are uploaded.
+    """
+    listing = _git_data("get", owner, repo_name, f"trees/{tree_sha}", github_token, client, params={"recursive": "1"})
+    if listing.get("truncated"):
+        logging.warning(f"Tree listing of '{owner}/{repo_name}' was truncated; some unchanged files will be uploaded again.")
+    return {entry["path"]: entry["sha"] for entry in listing.get("tree", []) if entry.get("type") == "blob"}
+
+
+def ingest_zip(archive_file, owner: str, repo_name: str, branch: str, message: str, github_token: str, prefix: str = "", max_workers: int = 4, max_pending: int | None = None, chunk_size: int = CHUNK_SIZE, client: GitHubClient | None = None, blob_index=None) -> tuple[dict | None, str | None]:
+    """
+    Commits the files of a ZIP archive to branch of owner/repo_name as a single commit,
+    streaming each entry instead of loading the archive into memory.
+    Parameters: archive_file (path or binary file object), prefix (directory the entries are
+    placed under), max_workers (concurrent blob uploads), max_pending (entries hashed ahead of
+    the uploads, 2 * max_workers by default), chunk_size (bytes read from an entry at a time).
+    Entries are hashed chunk-wise to their git blob SHA first; those already at that path on the
+    branch are skipped and blobs the repository already has elsewhere are referenced without
+    uploading. The rest are uploaded as streamed base64 bodies, and hashing pauses while
+    max_pending uploads are outstanding, so memory stays bounded regardless of archive size.
+    With a BlobIndex as blob_index, the branch contents come from the index (listing the tree
+    only when the branch moved since it was recorded) and the index is updated after the commit.
+    Returns a dict with the commit JSON (None when nothing changed) and counts of files,
+    uploaded, reused and unchanged entries and bytes_uploaded if successful, None otherwise,
+    along with an error message.
+    """
+    if not github_token:
+        logging.error("GitHub token is required for ingesting an archive.")
+        return None, "GitHub token is required."
+    max_pending = max_pending or 2 * max_workers
+    owns_client = client is None
+    if owns_client:
+        client = GitHubClient(github_token, pool_maxsize=max_workers)
+
+    def upload(archive, info):
+        body = _Base64BlobBody(archive, info, chunk_size)
+        try:
+            return _git_data("post", owner, repo_name, "blobs", github_token, client, data=body,
+                             headers={"Content-Type": "application/json"})["sha"]
+        finally:
+            body.close()
+
+    try:
+        with zipfile.ZipFile(archive_file) as archive:
+            parent, base_tree = _branch_tip(owner, repo_name, branch, github_token, client)
+            indexed = blob_index is not None and blob_index.sync_remote(owner, repo_name, branch, parent, base_tree, github_token, client)
+            if indexed:
+                remote = blob_index.blobs(f"{owner}/{repo_name}", branch)
+            else:
+                remote = _remote_blobs(owner, repo_name, base_tree, github_token, client)
+            known_blobs = set(remote.values())
+            logging.info(f"Ingesting archive into '{owner}/{repo_name}' branch '{branch}' ({len(remote)} files on the branch)...")
+
+            tree = []
+            counts = {"files": 0, "uploaded": 0, "reused": 0, "unchanged": 0, "bytes_uploaded": 0}
+            slots = threading.BoundedSemaphore(max_pending)
+            pending = {} # blob sha -> future, so duplicate entries upload once
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                try:
+                    for info in archive.infolist():
+                        if info.is_dir():
+                            continue
+                        path = posixpath.normpath(posixpath.join(prefix, info.filename)).lstrip("/")
+                        if path.startswith("../") or path == "..":
+                            raise ValueError(f"Archive entry '{info.filename}' points outside the repository.")
+                        counts["files"] += 1
+                        sha = _entry_blob_sha(archive, info, chunk_size)
+                        if remote.get(path) == sha:
+                            counts["unchanged"] += 1
+                            continue
+                        tree.append({"path": path, "mode": _entry_mode(info), "type": "blob", "sha": sha})
+                        if sha in known_blobs or sha in pending:
+                            counts["reused"] += 1
+                            continue
+                        slots.acquire() # Backpressure: wait for an upload slot before hashing further
+                        future = executor.submit(upload, archive, info)
+                        future.add_done_callback(lambda _: slots.release())
+                        pending[sha] = future
+                        counts["uploaded"] += 1
+                        counts["bytes_uploaded"] += info.file_size
+                    for sha, future in pending.items():
+                        if future.result() != sha:
+                            raise ValueError(f"GitHub stored blob {future.result()} for content hashed as {sha}.")
+                except BaseException:
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    raise
+
+            if not tree:
+                logging.info(f"'{owner}/{repo_name}' branch '{branch}' already matches the archive; nothing to commit.")
+                return {"commit": None, **counts}, None
+            commit = _commit_tree(owner, repo_name, branch, parent, base_tree, tree, message, github_token, client)
+            if indexed:
+                blob_index.apply(f"{owner}/{repo_name}", branch, commit["sha"], {entry["path"]: entry["sha"] for entry in tree})
+            logging.info(f"Ingested {counts['files']} files into '{owner}/{repo_name}' as {commit['sha'][:12]} "
+                         f"({counts['uploaded']} uploaded, {counts['reused']} reused, {counts['unchanged']} unchanged).")
+            return {"commit": commit, **counts}, None
+    except requests.exceptions.HTTPError as e:
+        return None, _api_error_message(e.response)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Request failed: {e}")
+        return None, str(e)
+    except zipfile.BadZipFile as e:
+        logging.error(f"Invalid archive: {e}")
+        return None, f"Invalid archive: {e}"
+    except Exception as e:
+        logging.error(f"An unexpected error occurred while ingesting the archive: {e}")
+        return None, str(e)
+    finally:
+        if owns_client:
+            client.close()
@@ -0,0 +1,84 @@
+import pytest
+
+from github_operations import github_ops
+from github_operations.ratelimit import RateLimiter
+from github_operations.testing import StubGitData, StubGitHubServer, make_bare_repo
+
+MOCK_TOKEN = "test_token_123"
+
+
+class FakeClock:
+    """Stand-in for a clock= callable that only moves when a test sets or advances now."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_clients():
+    """
+    Drops the GitHubClients, RateLimiters and CircuitBreakers that calls without a client= share,
+    so budgets and open circuits do not carry over from one test to the next.
+    """
+    from github_operations import circuit_breaker, ratelimit
+    yield
+    with github_ops._clients_lock:
+        for client in github_ops._clients.values():
+            client.close()
+        github_ops._clients.clear()
+    with ratelimit._limiters_lock:
+        ratelimit._limiters.clear()
+    with circuit_breaker._breakers_lock:
+        circuit_breaker._breakers.clear()
+
+
+@pytest.fixture
+def stub_github():
+    """Runs a StubGitHubServer for the duration of a test."""
+    server = StubGitHubServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fake_clock():
+    """A FakeClock starting at 0."""
+    return FakeClock()
+
+
+@pytest.fixture
+def github_client(stub_github):
+    """
+    Factory for GitHubClients talking to stub_github, each with a RateLimiter of its own unless
+    one is given. Keyword arguments are passed to GitHubClient; clients are closed after the test.
+    """
+    clients = []
+
+    def make(github_token=MOCK_TOKEN, **kwargs):
+        kwargs.setdefault("rate_limiter", RateLimiter())
+        client = github_ops.GitHubClient(github_token, base_url=stub_github.url, **kwargs)
+        clients.append(client)
+        return client
+    yield make
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def git_data_api(stub_github):
+    """
+    Factory for a StubGitData on stub_github: git_data_api(files, repo="user/repo", branch="main"),
+    with files as the content of the branch (see StubGitData).
+    """
+    def make(files, **kwargs):
+        return StubGitData(stub_github, files, **kwargs)
+    return make
+
+
+@pytest.fixture
+def bare_repo(tmp_path):
+    """A local bare repository with one commit on main, addressed by file:// URL."""
+    return make_bare_repo(str(tmp_path / "remote"))
@@ -0,0 +1,168 @@
+import os
+import sys
+import time
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+pytest.importorskip("aiohttp") # Optional dependency of github_operations.aio
+
+from github_operations import aio
+from github_operations.circuit_breaker import CLOSED, CircuitBreaker
+from github_operations.ratelimit import RateLimiter
+from github_operations.testing import run_git
+
+MOCK_TOKEN = "test_token_123"
+
+
+# --- Tests for the async API functions ---
+
+def test_async_api_calls_share_one_connection(stub_github):
+    """Test create/update/delete run through one pooled session and keep the sync return contracts."""
+    stub_github.route("POST", "/user/repos", (201, {"name": "new-repo"}))
+    stub_github.route("PATCH", "/repos/user/new-repo", (200, {"name": "new-repo", "private": True}))
+    stub_github.route("DELETE", "/repos/user/new-repo", (204, b""))
+
+    async def run():
+        async with aio.AsyncGitHubClient(MOCK_TOKEN, base_url=stub_github.url) as client:
+            return (
+                await aio.create_github_repository("new-repo", "Desc", False, MOCK_TOKEN, client=client),
+                await aio.update_github_repository("user", "new-repo", MOCK_TOKEN, private=True, client=client),
+                await aio.delete_github_repository("user", "new-repo", MOCK_TOKEN, client=client),
+            )
+
+    created, updated, deleted = asyncio.run(run())
+
+    assert created == ({"name": "new-repo"}, None)
+    assert updated == ({"name": "new-repo", "private": True}, None)
+    assert deleted == (True, None)
+    assert stub_github.connections == 1
+
+def test_async_create_concurrent_with_api_errors(stub_github):
+    """Test many concurrent creations report GitHub's errors like the sync function."""
+    stub_github.route("POST", "/user/repos", (422, {"message": "Repository creation failed", "errors": [{"message": "name already exists"}]}))
+
+    async def run():
+        async with aio.AsyncGitHubClient(MOCK_TOKEN, base_url=stub_github.url) as client:
+            return await asyncio.gather(*(aio.create_github_repository(f"repo-{i}", "", False, MOCK_TOKEN, client=client) for i in range(20)))
+
+    results = asyncio.run(run())
+
+    assert results == [(None, "API request failed: name already exists")] * 20
+
+def test_async_delete_not_found(stub_github):
+    """Test a 404 on delete is reported with GitHub's message."""
+    async def run():
+        async with aio.AsyncGitHubClient(MOCK_TOKEN, base_url=stub_github.url) as client:
+            return await aio.delete_github_repository("user", "missing", MOCK_TOKEN, client=client)
+
+    assert asyncio.run(run()) == (False, "API request failed: Not Found")
+
+def test_async_rate_limited_call_is_retried(stub_github):
+    """Test a 429 puts the token's limiter on hold and the call is retried after Retry-After."""
+    responses = [(429, {"message": "secondary rate limit"}, {"Retry-After": "0.2"}), (204, b"")]
+    stub_github.route("DELETE", "/repos/user/repo", lambda request: responses.pop(0))
+    limiter = RateLimiter()
+
+    async def run():
+        async with aio.AsyncGitHubClient(MOCK_TOKEN, base_url=stub_github.url, rate_limiter=limiter) as client:
+            return await aio.delete_github_repository("user", "repo", MOCK_TOKEN, client=client)
+
+    assert asyncio.run(run()) == (True, None)
+    assert len(stub_github.requests) == 2
+    assert limiter.retries == 1 and limiter.total_wait >= 0.15
+
+def test_async_open_circuit_fails_fast(stub_github):
+    """Test async calls stop reaching the server once the host's circuit is open."""
+    stub_github.route("DELETE", "/repos/user/repo", (500, {"message": "Server Error"}))
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    async def run():
+        async with aio.AsyncGitHubClient(MOCK_TOKEN, base_url=stub_github.url, circuit_breaker=breaker) as client:
+            return [await aio.delete_github_repository("user", "repo", MOCK_TOKEN, client=client) for _ in range(3)]
+
+    results = asyncio.run(run())
+
+    assert [success for success, _ in results] == [False] * 3
+    assert "Circuit" in results[2][1]
+    assert len(stub_github.requests) == 2 and breaker.rejected == 1
+
+def test_cancelled_trial_releases_the_circuit(stub_github, fake_clock):
+    """Test a half-open trial cancelled by a timeout lets the next request through as the trial."""
+    def handler(request):
+        if len(stub_github.requests) == 1:
+            time.sleep(0.5)
+        return 204, b""
+    stub_github.route("DELETE", "/repos/user/repo", handler)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60, clock=fake_clock)
+    breaker.record_failure()
+    fake_clock.now = 60
+
+    async def run():
+        async with aio.AsyncGitHubClient(MOCK_TOKEN, base_url=stub_github.url, circuit_breaker=breaker) as client:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.request("delete", "/repos/user/repo"), 0.1)
+            return await aio.delete_github_repository("user", "repo", MOCK_TOKEN, client=client)
+
+    assert asyncio.run(run()) == (True, None)
+    assert breaker.state == CLOSED and breaker.rejected == 0
+
+def test_async_api_fail_no_token():
+    assert asyncio.run(aio.create_github_repository("repo", "", False, "")) == (None, "GitHub token is required.")
+    assert asyncio.run(aio.delete_github_repository("user", "repo", "")) == (False, "GitHub token is required.")
+
+
+# --- Tests for the async git functions ---
+
+def test_async_clone_and_push(bare_repo, tmp_path):
+    """Test cloning and pushing against a local bare repository without blocking the loop."""
+    local_path = str(tmp_path / "clone")
+
+    success, message = asyncio.run(aio.clone_repository(f"file://{bare_repo}", local_path, MOCK_TOKEN))
+    assert (success, message) == (True, None)
+    assert os.path.exists(os.path.join(local_path, "README.md"))
+
+    with open(os.path.join(local_path, "new.txt"), "w") as f:
+        f.write("new\n")
+    run_git("add", "new.txt", cwd=local_path)
+    run_git("commit", "-q", "-m", "Add new.txt", cwd=local_path)
+
+    success, message = asyncio.run(aio.push_repository(local_path, github_token=MOCK_TOKEN))
+    assert (success, message) == (True, None)
+    assert run_git("rev-parse", "main", cwd=bare_repo) == run_git("rev-parse", "HEAD", cwd=local_path)
+
+    success, message = asyncio.run(aio.push_repository(local_path, github_token=MOCK_TOKEN))
+    assert success is True
+    assert "already up to date" in message
+
+def test_async_clone_fail_path_not_empty(bare_repo, tmp_path):
+    (tmp_path / "clone").mkdir()
+    (tmp_path / "clone" / "file.txt").write_text("x")
+    success, message = asyncio.run(aio.clone_repository(f"file://{bare_repo}", str(tmp_path / "clone"), MOCK_TOKEN))
+    assert success is False
+    assert "already exists and is not empty" in message
+
+def test_async_push_rejected(bare_repo, tmp_path):
+    """Test a non-fast-forward push is reported as rejected."""
+    first, second = str(tmp_path / "first"), str(tmp_path / "second")
+    asyncio.run(aio.clone_repository(f"file://{bare_repo}", first, MOCK_TOKEN))
+    asyncio.run(aio.clone_repository(f"file://{bare_repo}", second, MOCK_TOKEN))
+    for path in (first, second):
+        with open(os.path.join(path, "conflict.txt"), "w") as f:
+            f.write(path)
+        run_git("add", "conflict.txt", cwd=path)
+        run_git("commit", "-q", "-m", "Conflict", cwd=path)
+
+    assert asyncio.run(aio.push_repository(first, github_token=MOCK_TOKEN)) == (True, None)
+    success, message = asyncio.run(aio.push_repository(second, github_token=MOCK_TOKEN))
+
+    assert success is False
+    assert message.startswith("Push rejected")
+
+def test_async_push_fail_remote_not_found(bare_repo, tmp_path):
+    local_path = str(tmp_path / "clone")
+    asyncio.run(aio.clone_repository(f"file://{bare_repo}", local_path, MOCK_TOKEN))
+    success, message = asyncio.run(aio.push_repository(local_path, remote_name="upstream", github_token=MOCK_TOKEN))
+    assert (success, message) == (False, "Remote 'upstream' does not exist.")
@@ -0,0 +1,103 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from github_operations import github_ops
+from github_operations.blob_index import BlobIndex
+from github_operations.testing import commit_locally, run_git
+
+MOCK_TOKEN = "test_token_123"
+
+
+def sha_of(text):
+    return github_ops.git_blob_sha(text.encode())
+
+
+@pytest.fixture
+def index(tmp_path):
+    blob_index = BlobIndex(str(tmp_path / "index" / "blobs.sqlite"))
+    yield blob_index
+    blob_index.close()
+
+
+def test_replace_apply_and_lookup(index, tmp_path):
+    """Test a recorded tree can be updated in place and survives reopening the database."""
+    index.replace("user/repo", "main", "c1", {"a.txt": sha_of("a"), "b.txt": sha_of("b")})
+    index.apply("user/repo", "main", "c2", {"b.txt": sha_of("b2"), "c.txt": sha_of("c"), "a.txt": None})
+
+    assert index.commit_sha("user/repo", "main") == "c2"
+    assert index.blobs("user/repo", "main") == {"b.txt": sha_of("b2"), "c.txt": sha_of("c")}
+    assert index.commit_sha("user/repo", "dev") is None
+    index.close()
+
+    reopened = BlobIndex(index.path)
+    assert reopened.lookup("user/repo", "main", ["c.txt", "missing.txt"]) == {"c.txt": sha_of("c")}
+    reopened.forget("user/repo", "main")
+    assert reopened.blobs("user/repo", "main") == {}
+    reopened.close()
+
+def test_changed_on_large_tree(index):
+    """Test only new or modified paths are reported out of a 100k-file tree."""
+    entries = {f"src/module_{i}/file_{i}.py": github_ops.git_blob_sha(str(i).encode()) for i in range(100_000)}
+    index.replace("user/big", "main", "c1", entries)
+
+    candidates = {path: entries[path] for path in list(entries)[:4000]}
+    candidates["src/module_1/file_1.py"] = sha_of("edited")
+    candidates["src/module_2/file_2.py"] = sha_of("edited too")
+    candidates["new.txt"] = sha_of("new")
+
+    assert set(index.changed("user/big", "main", candidates)) == {"src/module_1/file_1.py", "src/module_2/file_2.py", "new.txt"}
+
+def test_repo_full_name():
+    """Test remote URLs map to the owner/repo key the API functions use."""
+    assert github_ops.repo_full_name("https://token@github.com/Octo/App.git") == "Octo/App"
+    assert github_ops.repo_full_name("file:///srv/git/octo/app.git/") == "octo/app"
+
+
+def test_commit_files_sends_only_changed_files(git_data_api, index, github_client):
+    """Test the index filters unchanged files, is built once, and follows the new commit."""
+    api = git_data_api({"a.txt": "a", "b.txt": "b"})
+    client = github_client()
+    files = {"a.txt": "a", "b.txt": "b-edited", "c.txt": "c", "gone.txt": None}
+
+    commit, error = github_ops.commit_files("user", "repo", "main", files, "Upload", MOCK_TOKEN, client=client, blob_index=index)
+
+    assert error is None
+    assert commit["sha"] == "new-commit-sha"
+    assert len(api.requests("POST", "blobs")) == 2
+    assert {entry["path"] for entry in api.trees[0]["tree"]} == {"b.txt", "c.txt"}
+    assert index.commit_sha("user/repo", "main") == "new-commit-sha"
+    assert index.blobs("user/repo", "main") == {"a.txt": sha_of("a"), "b.txt": sha_of("b-edited"), "c.txt": sha_of("c")}
+
+    commit, error = github_ops.commit_files("user", "repo", "main", files, "Upload again", MOCK_TOKEN, client=client, blob_index=index)
+
+    assert error is None
+    assert commit == {"sha": "new-commit-sha", "tree": {"sha": "new-tree-sha"}}
+    assert len(api.requests("GET", "trees/")) == 2 # Indexing, then the modes of b.txt and c.txt
+    assert len(api.requests("POST", "blobs")) == 2
+    assert len(api.trees) == 1
+
+
+def test_push_records_branch_tree(bare_repo, tmp_path, index):
+    """Test successful pushes record the pushed trees and deleted branches are forgotten."""
+    local_path = str(tmp_path / "clone")
+    github_ops.clone_repository(f"file://{bare_repo}", local_path, MOCK_TOKEN)
+    commit_locally(local_path, "new.txt", "new")
+    full_name = github_ops.repo_full_name(f"file://{bare_repo}")
+
+    assert github_ops.push_repository(local_path, github_token=MOCK_TOKEN, blob_index=index) == (True, None)
+    assert index.commit_sha(full_name, "main") == run_git("rev-parse", "main", cwd=bare_repo)
+    assert index.blobs(full_name, "main") == {"README.md": sha_of("# Test\n"), "new.txt": sha_of("new")}
+
+    run_git("checkout", "-q", "-b", "feature", cwd=local_path)
+    commit_locally(local_path, "feature.txt", "feature")
+    results, error = github_ops.push_refs(local_path, ["feature:refs/heads/topic"], github_token=MOCK_TOKEN, blob_index=index)
+    assert error is None
+    assert "feature.txt" in index.blobs(full_name, "topic")
+
+    results, error = github_ops.push_refs(local_path, [":topic"], github_token=MOCK_TOKEN, blob_index=index)
+    assert results[":topic"][0] is True
+    assert index.commit_sha(full_name, "topic") is None
@@ -0,0 +1,187 @@
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from github_operations import github_ops
+from github_operations.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, get_circuit_breaker
+
+MOCK_TOKEN = "test_token_123"
+
+
+class Faults:
+    """
+    Fault-injecting handler for a StubGitHubServer route: the first entries of plan are applied
+    to successive requests ("slow" sleeps past the client timeout, an int is returned as the
+    status), and every later request gets response.
+    """
+
+    def __init__(self, plan, response, slow_seconds=1.0):
+        self.plan = list(plan)
+        self.response = response
+        self.slow_seconds = slow_seconds
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        with self._lock:
+            self.calls += 1
+            fault = self.plan.pop(0) if self.plan else None
+        if fault == "slow":
+            time.sleep(self.slow_seconds)
+            return self.response
+        if isinstance(fault, int):
+            return fault, {"message": "injected failure"}
+        return self.response
+
+
+@pytest.fixture
+def make_client(github_client):
+    """github_client with a short read timeout and no retry backoff, so injected faults resolve quickly."""
+    def make(**kwargs):
+        return github_client(**{"timeout": (1, 0.2), "backoff_factor": 0, **kwargs})
+    return make
+
+
+def test_breaker_opens_and_recovers_through_a_trial(fake_clock):
+    """Test the circuit opens after consecutive failures and lets one trial through after the reset timeout."""
+    clock = fake_clock
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, name="api.example.com", clock=clock)
+    breaker.record_failure()
+    breaker.record(200) # A success resets the count
+    for _ in range(3):
+        breaker.before_request()
+        breaker.record(503)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError, match="api.example.com"):
+        breaker.before_request()
+
+    clock.now = 10
+    assert breaker.state == HALF_OPEN
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request() # Only one trial at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now = 20
+    breaker.before_request()
+    breaker.record(201)
+    assert breaker.state == CLOSED
+    breaker.before_request()
+    assert breaker.rejected == 2
+
+def test_stuck_trial_expires_after_reset_timeout(fake_clock):
+    """Test a trial that never reports an outcome blocks other requests for at most reset_timeout."""
+    clock = fake_clock
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    clock.now = 20
+    breaker.before_request() # The abandoned trial has expired
+    breaker.release_trial()
+    breaker.before_request() # A released slot is given out at once
+    breaker.record(200)
+    assert breaker.state == CLOSED and breaker.rejected == 1
+
+def test_read_timeouts_retry_idempotent_methods_only(stub_github, make_client):
+    """Test a hung PATCH is retried after the read timeout while a hung POST create is not resent."""
+    update = Faults(["slow", "slow"], (200, {"name": "repo", "description": "new"}))
+    create = Faults(["slow"], (201, {"name": "new-repo"}))
+    stub_github.route("PATCH", "/repos/user/repo", update)
+    stub_github.route("POST", "/user/repos", create)
+    client = make_client()
+
+    started = time.monotonic()
+    repo, error = github_ops.update_github_repository("user", "repo", MOCK_TOKEN, description="new", client=client)
+    assert error is None and repo["description"] == "new"
+    assert update.calls == 3
+
+    repo, error = github_ops.create_github_repository("new-repo", "", False, MOCK_TOKEN, client=client)
+    assert repo is None and "timed out" in error.lower()
+    assert create.calls == 1
+    assert time.monotonic() - started < 2
+
+def test_server_errors_retry_delete_but_not_post(stub_github, make_client):
+    """Test 503 responses are retried for DELETE and returned for POST."""
+    delete = Faults([503, 503], (204, b""))
+    create = Faults([503], (201, {"name": "new-repo"}))
+    stub_github.route("DELETE", "/repos/user/repo", delete)
+    stub_github.route("POST", "/user/repos", create)
+    client = make_client()
+
+    assert github_ops.delete_github_repository("user", "repo", MOCK_TOKEN, client=client) == (True, None)
+    assert delete.calls == 3
+    repo, error = github_ops.create_github_repository("new-repo", "", False, MOCK_TOKEN, client=client)
+    assert repo is None and "injected failure" in error
+    assert create.calls == 1
+
+def test_open_circuit_fails_fast(stub_github, make_client):
+    """Test calls fail without reaching the server once the upstream keeps failing."""
+    stub_github.route("DELETE", "/repos/user/repo", (500, {"message": "Server Error"}))
+    client = make_client(circuit_breaker=CircuitBreaker(failure_threshold=3, reset_timeout=60))
+
+    for _ in range(3):
+        assert github_ops.delete_github_repository("user", "repo", MOCK_TOKEN, client=client)[0] is False
+    success, error = github_ops.delete_github_repository("user", "repo", MOCK_TOKEN, client=client)
+
+    assert success is False and "Circuit" in error
+    assert len(stub_github.requests) == 3
+    assert client.circuit_breaker.rejected == 1
+
+def test_hedged_get_returns_first_response(stub_github, make_client):
+    """Test a slow GET is hedged with a second request whose response is used."""
+    repository = Faults(["slow"], (200, {"full_name": "user/repo"}), slow_seconds=0.5)
+    stub_github.route("GET", "/repos/user/repo", repository)
+    client = make_client(timeout=(1, 2), hedge_after=0.05)
+
+    started = time.monotonic()
+    repo, error = github_ops.get_github_repository("user", "repo", MOCK_TOKEN, client=client)
+
+    assert error is None and repo["full_name"] == "user/repo"
+    assert time.monotonic() - started < 0.4
+    assert client.hedged == 1 and repository.calls == 2
+    client.close()
+
+def test_p95_hedging_waits_for_latency_samples(stub_github, make_client):
+    """Test p95 hedging only starts once enough GET latencies have been observed."""
+    stub_github.route("GET", "/rate_limit", (200, {}))
+    client = make_client(hedge_after="p95")
+    assert client._hedge_delay() is None
+    for _ in range(20):
+        client.request("get", "/rate_limit")
+    assert 0 < client._hedge_delay() < 0.2
+    assert client.hedged == 0
+    client.close()
+
+def test_legacy_requests_have_a_timeout(mocker):
+    """Test calls made without a client no longer wait forever."""
+    mock_request = mocker.patch("requests.Session.request")
+    mock_request.return_value.status_code = 204
+    mock_request.return_value.headers = {}
+    assert github_ops.delete_github_repository("user", "repo", MOCK_TOKEN) == (True, None)
+    assert mock_request.call_args.kwargs["timeout"] == github_ops.DEFAULT_TIMEOUT
+
+def test_calls_without_client_share_the_host_circuit(mocker):
+    """Test the default path goes through the api.github.com breaker and fails fast once it is open."""
+    mock_request = mocker.patch("requests.Session.request")
+    mock_request.return_value.status_code = 502
+    mock_request.return_value.headers = {}
+    breaker = get_circuit_breaker("api.github.com", failure_threshold=2, reset_timeout=60)
+
+    for _ in range(2):
+        assert github_ops.delete_github_repository("user", "repo", MOCK_TOKEN)[0] is False
+    success, error = github_ops.delete_github_repository("user", "repo", MOCK_TOKEN)
+
+    assert success is False and "Circuit" in error
+    assert mock_request.call_count == 2
+    assert github_ops.get_github_client(MOCK_TOKEN).circuit_breaker is breaker
+    assert breaker.rejected == 1
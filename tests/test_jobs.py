@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from github_operations import jobs
+from github_operations.jobs import JobQueue, JobRunner
+from github_operations.testing import run_git
+
+MOCK_TOKEN = "test_token_123"
+
+
+def fixed_token(job):
+    return MOCK_TOKEN
+
+
+def sleeping_job(job, github_token):
+    with open(job["params"]["marker"], "w") as f:
+        f.write(str(os.getpid()))
+    time.sleep(30)
+    return True, None
+
+
+def wait_for(queue, job_id, statuses=("succeeded", "failed", "cancelled"), timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.status(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} is still {queue.status(job_id)['status']}")
+
+
+@pytest.fixture
+def queue(tmp_path):
+    job_queue = JobQueue(str(tmp_path / "jobs" / "queue.sqlite"))
+    yield job_queue
+    job_queue.close()
+
+
+def test_submit_deduplicates_in_flight_jobs(queue, tmp_path):
+    """Test an identical job is not queued twice while in flight, and can be queued again once finished."""
+    first = queue.submit("clone", "https://github.com/user/repo.git", str(tmp_path / "repo"), depth=1, branch="main")
+    assert queue.submit("clone", "https://github.com/user/repo.git", str(tmp_path / "repo"), branch="main", depth=1) == first
+    other = queue.submit("clone", "https://github.com/user/repo.git", str(tmp_path / "elsewhere"), depth=1, branch="main")
+    assert other != first
+    assert queue.status(first)["params"] == {"depth": 1, "branch": "main"}
+    assert queue.status(first)["status"] == "queued"
+
+    assert queue.cancel(first) is True
+    assert queue.status(first)["status"] == "cancelled"
+    assert queue.cancel(first) is False
+    assert queue.submit("clone", "https://github.com/user/repo.git", str(tmp_path / "repo"), depth=1, branch="main") not in (first, other)
+    assert [job["id"] for job in queue.jobs(status="cancelled")] == [first]
+    with pytest.raises(ValueError):
+        queue.submit("format-disk")
+
+def test_submit_keeps_jobs_with_different_params(queue, tmp_path):
+    """Test jobs on the same clone that differ only in params are all queued."""
+    local_path = str(tmp_path / "repo")
+    main = queue.submit("push", local_path=local_path, branch_name="main")
+    dev = queue.submit("push", local_path=local_path, branch_name="dev")
+    shallow = queue.submit("clone", "https://github.com/user/repo.git", str(tmp_path / "clone"), depth=1)
+    full = queue.submit("clone", "https://github.com/user/repo.git", str(tmp_path / "clone"))
+    assert len({main, dev, shallow, full}) == 4
+    assert queue.submit("push", local_path=local_path, branch_name="dev") == dev
+
+def test_runner_executes_jobs_in_worker_processes(queue, bare_repo, tmp_path):
+    """Test queued clones run in workers with the provided token, which is never written to the queue."""
+    clone_ok = queue.submit("clone", f"file://{bare_repo}", str(tmp_path / "a"))
+    clone_bad = queue.submit("clone", f"file://{tmp_path}/missing.git", str(tmp_path / "b"))
+    runner = JobRunner(queue, concurrency=2, token_provider=fixed_token, poll_interval=0.05).start()
+    try:
+        job = wait_for(queue, clone_ok)
+        failed = wait_for(queue, clone_bad)
+    finally:
+        runner.stop(timeout=20)
+
+    assert job["status"] == "succeeded" and job["error"] is None
+    assert job["started_at"] <= job["finished_at"]
+    assert run_git("log", "--format=%s", cwd=str(tmp_path / "a")) == "Initial commit"
+    assert failed["status"] == "failed" and failed["error"]
+    with open(queue.path, "rb") as f:
+        assert MOCK_TOKEN.encode() not in f.read()
+
+def test_cancel_running_job_kills_worker(queue, tmp_path, monkeypatch):
+    """Test cancelling a running job stops its worker process."""
+    monkeypatch.setitem(jobs.JOB_KINDS, "sleep", sleeping_job)
+    marker = str(tmp_path / "started")
+    job_id = queue.submit("sleep", local_path=str(tmp_path), marker=marker)
+    runner = JobRunner(queue, concurrency=1, token_provider=fixed_token, poll_interval=0.05).start()
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(marker) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert queue.status(job_id)["status"] == "running"
+        assert queue.cancel(job_id) is True
+        job = wait_for(queue, job_id)
+    finally:
+        runner.stop(timeout=10)
+
+    assert job["status"] == "cancelled"
+    with open(marker) as f:
+        worker_pid = int(f.read())
+    with pytest.raises(ProcessLookupError):
+        os.kill(worker_pid, 0)
+
+def test_interrupted_jobs_are_requeued(queue, tmp_path):
+    """Test jobs left running by a stopped runner are queued again by the next one."""
+    job_id = queue.submit("clone", "https://github.com/user/repo.git", str(tmp_path / "repo"))
+    assert queue.claim()["id"] == job_id
+    assert queue.claim() is None
+
+    JobRunner(queue, token_provider=fixed_token)
+
+    assert queue.status(job_id)["status"] == "queued"
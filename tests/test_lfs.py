@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import hashlib
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from github_operations import github_ops
+from github_operations.lfs import (LFSCheckpoint, lfs_endpoint, lfs_pointer, parse_lfs_pointer,
+                                   stage_large_files, upload_lfs_objects)
+from github_operations.testing import run_git
+
+MOCK_TOKEN = "test_token_123"
+
+
+class StubLFSServer:
+    """
+    Git LFS batch API on top of a StubGitHubServer, serving under /lfs.
+    Objects in `stored` are reported as present; `fail_puts` maps an oid to the number of
+    uploads of it that should fail with a 500 before one succeeds, and `omit` maps an oid to
+    the number of batch responses that should leave it out.
+    """
+
+    def __init__(self, stub):
+        self.stub = stub
+        self.endpoint = f"{stub.url}/lfs"
+        self.stored = {}
+        self.fail_puts = {}
+        self.omit = {}
+        self.batches = []
+        stub.route("POST", "/lfs/objects/batch", self._batch)
+        stub.route("POST", "/lfs/verify", self._verify)
+
+    def _batch(self, request):
+        payload = json.loads(request["body"])
+        self.batches.append(request)
+        objects = []
+        for obj in payload["objects"]:
+            if self.omit.get(obj["oid"], 0) > 0:
+                self.omit[obj["oid"]] -= 1
+                continue
+            answer = {"oid": obj["oid"], "size": obj["size"]}
+            if obj["oid"] not in self.stored:
+                href = f"{self.stub.url}/storage/{obj['oid']}"
+                self.stub.route("PUT", f"/storage/{obj['oid']}", self._put)
+                answer["actions"] = {
+                    "upload": {"href": href, "header": {"X-Upload-Token": "signed"}},
+                    "verify": {"href": f"{self.endpoint}/verify"},
+                }
+            objects.append(answer)
+        return 200, {"transfer": "basic", "objects": objects}
+
+    def _put(self, request):
+        oid = request["path"].rsplit("/", 1)[1]
+        if self.fail_puts.get(oid, 0) > 0:
+            self.fail_puts[oid] -= 1
+            return 500, {"message": "storage unavailable"}
+        assert hashlib.sha256(request["body"]).hexdigest() == oid
+        self.stored[oid] = request["body"]
+        return 200, b""
+
+    def _verify(self, request):
+        obj = json.loads(request["body"])
+        return (200, {}) if obj["oid"] in self.stored else (404, {"message": "missing"})
+
+    def puts(self):
+        return [r for r in self.stub.requests if r["method"] == "PUT"]
+
+
+@pytest.fixture
+def lfs_server(stub_github):
+    return StubLFSServer(stub_github)
+
+
+def make_objects(tmp_path, contents):
+    objects = []
+    for i, content in enumerate(contents):
+        path = tmp_path / f"object-{i}.bin"
+        path.write_bytes(content)
+        objects.append((hashlib.sha256(content).hexdigest(), len(content), str(path)))
+    return objects
+
+
+def test_pointer_round_trip_and_endpoint():
+    """Test pointer files parse back and the LFS endpoint is derived like git-lfs does."""
+    pointer = lfs_pointer("ab" * 32, 1234)
+    assert parse_lfs_pointer(pointer) == ("ab" * 32, 1234)
+    assert parse_lfs_pointer(b"plain content") is None
+    assert lfs_endpoint("https://user:pw@github.com/octo/app") == "https://github.com/octo/app.git/info/lfs"
+    assert lfs_endpoint("https://github.com/octo/app.git/") == "https://github.com/octo/app.git/info/lfs"
+
+def test_upload_skips_objects_the_server_has(lfs_server, tmp_path):
+    """Test only missing objects are transferred, with action headers and no token on storage requests."""
+    objects = make_objects(tmp_path, [b"a" * 5000, b"b" * 7000, b"c" * 100])
+    lfs_server.stored[objects[2][0]] = b"c" * 100
+
+    results, error = upload_lfs_objects(lfs_server.endpoint, objects, MOCK_TOKEN, max_workers=2)
+
+    assert error is None
+    assert all(success for success, _ in results.values())
+    assert set(lfs_server.stored) == {oid for oid, _, _ in objects}
+    puts = lfs_server.puts()
+    assert len(puts) == 2
+    assert all(put["headers"]["X-Upload-Token"] == "signed" and "Authorization" not in put["headers"] for put in puts)
+    assert lfs_server.batches[0]["headers"]["Authorization"].startswith("Basic ")
+    assert lfs_server.batches[0]["headers"]["Accept"] == "application/vnd.git-lfs+json"
+
+def test_upload_retries_with_fresh_action(lfs_server, tmp_path):
+    """Test a failed transfer asks the batch API again before retrying."""
+    objects = make_objects(tmp_path, [b"x" * 3000])
+    lfs_server.fail_puts[objects[0][0]] = 1
+
+    results, error = upload_lfs_objects(lfs_server.endpoint, objects, MOCK_TOKEN, backoff=0)
+
+    assert error is None
+    assert results[objects[0][0]] == (True, None)
+    assert len(lfs_server.batches) == 2
+    assert len(lfs_server.puts()) == 2
+
+def test_object_missing_from_batch_response_is_not_marked_done(lfs_server, tmp_path):
+    """Test an object the batch response leaves out is asked for again, and fails without a checkpoint entry if it never appears."""
+    objects = make_objects(tmp_path, [b"m" * 1000, b"n" * 2000])
+    lfs_server.omit[objects[0][0]] = 1
+    lfs_server.omit[objects[1][0]] = 10
+    checkpoint = LFSCheckpoint(str(tmp_path / "upload.checkpoint"))
+
+    results, error = upload_lfs_objects(lfs_server.endpoint, objects, MOCK_TOKEN, checkpoint=checkpoint, max_retries=2, backoff=0)
+
+    assert error is None
+    assert results[objects[0][0]] == (True, None)
+    assert results[objects[1][0]][0] is False and "did not include" in results[objects[1][0]][1]
+    assert set(lfs_server.stored) == {objects[0][0]}
+    assert objects[0][0] in checkpoint and objects[1][0] not in checkpoint
+
+def test_interrupted_upload_resumes_from_checkpoint(lfs_server, tmp_path):
+    """Test objects recorded in the checkpoint are not requested again after a failed run."""
+    objects = make_objects(tmp_path, [b"1" * 1000, b"2" * 2000, b"3" * 3000])
+    checkpoint_path = str(tmp_path / "upload.checkpoint")
+    lfs_server.fail_puts[objects[1][0]] = 10
+
+    results, error = upload_lfs_objects(lfs_server.endpoint, objects, MOCK_TOKEN,
+                                        checkpoint=LFSCheckpoint(checkpoint_path), max_retries=1, backoff=0)
+    assert error is None
+    assert results[objects[1][0]][0] is False
+    assert "500" in results[objects[1][0]][1]
+    assert len(LFSCheckpoint(checkpoint_path)) == 2
+
+    lfs_server.fail_puts.clear()
+    lfs_server.batches.clear()
+    puts_before = len(lfs_server.puts())
+    results, error = upload_lfs_objects(lfs_server.endpoint, objects, MOCK_TOKEN, checkpoint=LFSCheckpoint(checkpoint_path))
+
+    assert error is None
+    assert all(success for success, _ in results.values())
+    assert [obj["oid"] for obj in json.loads(lfs_server.batches[0]["body"])["objects"]] == [objects[1][0]]
+    assert len(lfs_server.puts()) == puts_before + 1
+
+def test_upload_batch_failure(stub_github, tmp_path):
+    """Test a rejected batch request is reported as an error."""
+    stub_github.route("POST", "/lfs/objects/batch", (403, {"message": "no write access"}))
+    results, error = upload_lfs_objects(f"{stub_github.url}/lfs", make_objects(tmp_path, [b"x"]), MOCK_TOKEN)
+    assert results is None
+    assert "403" in error and "no write access" in error
+
+def test_stage_and_push_large_files(lfs_server, bare_repo, tmp_path):
+    """Test large files are committed as pointers and their content uploaded before the push."""
+    local_path = str(tmp_path / "clone")
+    github_ops.clone_repository(f"file://{bare_repo}", local_path, MOCK_TOKEN)
+    big = os.urandom(20_000)
+    with open(os.path.join(local_path, "big asset.bin"), "wb") as f:
+        f.write(big)
+    with open(os.path.join(local_path, "small.txt"), "w") as f:
+        f.write("small")
+
+    staged = stage_large_files(local_path, threshold=10_000)
+    oid = hashlib.sha256(big).hexdigest()
+    assert staged == [("big asset.bin", oid, len(big))]
+    run_git("add", "small.txt", cwd=local_path)
+    run_git("commit", "-q", "-m", "Add assets", cwd=local_path)
+    run_git("config", "lfs.url", lfs_server.endpoint, cwd=local_path)
+
+    assert github_ops.push_repository(local_path, github_token=MOCK_TOKEN, lfs=True) == (True, None)
+
+    assert lfs_server.stored[oid] == big
+    committed = run_git("show", "main:big asset.bin", cwd=bare_repo)
+    assert parse_lfs_pointer((committed + "\n").encode()) == (oid, len(big))
+    assert "/big[[:space:]]asset.bin filter=lfs" in run_git("show", "main:.gitattributes", cwd=bare_repo)
+    assert run_git("show", "main:small.txt", cwd=bare_repo) == "small"
+    with open(os.path.join(local_path, "big asset.bin"), "rb") as f:
+        assert f.read() == big
+
+def test_push_stops_when_lfs_upload_fails(lfs_server, bare_repo, tmp_path, monkeypatch):
+    """Test refs are not pushed when an LFS object could not be uploaded."""
+    monkeypatch.setattr("github_operations.lfs.time.sleep", lambda seconds: None)
+    local_path = str(tmp_path / "clone")
+    github_ops.clone_repository(f"file://{bare_repo}", local_path, MOCK_TOKEN)
+    with open(os.path.join(local_path, "big.bin"), "wb") as f:
+        f.write(b"z" * 20_000)
+    (_, oid, _), = stage_large_files(local_path, threshold=10_000)
+    run_git("commit", "-q", "-m", "Add big file", cwd=local_path)
+    run_git("config", "lfs.url", lfs_server.endpoint, cwd=local_path)
+    lfs_server.fail_puts[oid] = 100
+    head_before = run_git("rev-parse", "main", cwd=bare_repo)
+
+    success, error = github_ops.push_repository(local_path, github_token=MOCK_TOKEN, lfs=True)
+
+    assert success is False
+    assert error.startswith("LFS upload failed for 1 of 1 objects")
+    assert run_git("rev-parse", "main", cwd=bare_repo) == head_before
@@ -0,0 +1,165 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from github_operations import github_ops, metrics
+from github_operations.metrics import MetricsRecorder, OpenTelemetryHook, current_span, set_metrics_hook, span
+from github_operations.ratelimit import RateLimiter
+from github_operations.testing import run_git
+
+MOCK_TOKEN = "test_token_123"
+
+
+@pytest.fixture
+def recorded():
+    """Collects every finished span while the test runs, and a MetricsRecorder fed the same spans."""
+    spans = []
+    recorder = MetricsRecorder()
+    def hook(finished):
+        spans.append(finished)
+        recorder(finished)
+    previous = set_metrics_hook(hook)
+    yield spans, recorder
+    set_metrics_hook(previous)
+
+
+def test_disabled_metrics_are_no_ops():
+    """Test nothing is recorded and the shared no-op span is handed out while no hook is installed."""
+    assert not metrics.metrics_enabled()
+    with span("clone") as active:
+        assert not active
+        active.add("bytes", 10)
+        with active.phase("transfer"):
+            pass
+        assert current_span() is active
+    assert active.counters == {}
+
+def test_spans_nest_and_report_failures(recorded):
+    """Test nested spans link to their parent and exceptions and (None, error) results mark failures."""
+    spans, recorder = recorded
+    failing = metrics.instrumented("update")(lambda: (None, "Not Found"))
+    with span("outer", repo="user/repo") as outer:
+        assert failing() == (None, "Not Found")
+    with pytest.raises(ValueError):
+        with span("broken"):
+            raise ValueError("boom")
+
+    update, outer_span, broken = spans
+    assert update.parent is outer and (update.status, update.error) == ("error", "Not Found")
+    assert outer_span.status == "ok" and outer_span.attributes == {"repo": "user/repo"}
+    assert (broken.status, broken.error) == ("error", "boom")
+    assert recorder.summary()["update"]["errors"] == 1
+    assert current_span() is metrics._NOOP_SPAN
+
+def test_recorder_percentiles():
+    """Test percentiles use the nearest rank over the recorded latencies."""
+    recorder = MetricsRecorder()
+    for duration in range(1, 101):
+        finished = metrics.Span("push")
+        finished.duration = duration / 100
+        finished.status = "ok"
+        recorder(finished)
+    summary = recorder.summary()["push"]
+    assert (summary["count"], summary["p50"], summary["p90"], summary["p99"]) == (100, 0.5, 0.9, 0.99)
+    assert recorder.percentile("clone", 99) is None
+
+def test_recorder_keeps_the_latest_samples():
+    """Test only the last max_samples latencies are kept while counts cover every span."""
+    recorder = MetricsRecorder(max_samples=10)
+    for duration in range(1, 101):
+        finished = metrics.Span("push")
+        finished.duration = duration / 100
+        finished.status = "ok"
+        recorder(finished)
+    summary = recorder.summary()["push"]
+    assert (summary["count"], summary["p50"]) == (100, 0.95)
+    assert recorder.percentile("push", 0) == 0.91
+
+def test_clone_and_push_report_phases_and_bytes(recorded, bare_repo, tmp_path):
+    """Test git operations report transfer phases, objects and bytes."""
+    spans, recorder = recorded
+    local_path = str(tmp_path / "clone")
+    assert github_ops.clone_repository(f"file://{bare_repo}", local_path, MOCK_TOKEN) == (True, None)
+    with open(os.path.join(local_path, "new.txt"), "w") as f:
+        f.write("new\n" * 1000)
+    run_git("add", "new.txt", cwd=local_path)
+    run_git("commit", "-q", "-m", "Add new.txt", cwd=local_path)
+    assert github_ops.push_repository(local_path, github_token=MOCK_TOKEN) == (True, None)
+
+    clone, push = spans
+    assert clone.name == "clone" and clone.status == "ok"
+    assert {"connect", "transfer"} <= set(clone.phases)
+    assert clone.counters["bytes"] > 0 and clone.counters["objects"] > 0
+    assert push.name == "push" and push.status == "ok"
+    assert "transfer" in push.phases and push.counters["bytes"] > 0
+    assert sum(push.phases.values()) <= push.duration
+    assert set(recorder.summary()) == {"clone", "push"}
+
+def test_api_calls_report_retries_and_rate_limit_waits(recorded, stub_github):
+    """Test API spans count requests, retries, bytes and the time spent backing off."""
+    spans, recorder = recorded
+    attempts = []
+    def throttled(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            return 429, {"message": "rate limited"}, {"Retry-After": "0.05"}
+        return 200, {"full_name": "user/repo", "description": "new"}
+    stub_github.route("PATCH", "/repos/user/repo", throttled)
+    stub_github.route("DELETE", "/repos/user/gone", (404, {"message": "Not Found"}))
+    client = github_ops.GitHubClient(MOCK_TOKEN, base_url=stub_github.url, rate_limiter=RateLimiter())
+
+    repo, error = github_ops.update_github_repository("user", "repo", MOCK_TOKEN, description="new", client=client)
+    assert error is None
+    github_ops.delete_github_repository("user", "gone", MOCK_TOKEN, client=client)
+
+    update, delete = spans
+    assert update.name == "update" and update.status == "ok"
+    assert update.counters["requests"] == 2 and update.counters["retries"] == 1
+    assert update.counters["rate_limit_wait"] >= 0.04
+    assert update.counters["bytes_sent"] > 0 and update.counters["bytes_received"] > 0
+    assert update.phases["api_response"] > 0
+    assert delete.name == "delete" and delete.status == "error"
+
+
+class FakeTracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, start_time=None, attributes=None):
+        otel_span = FakeOtelSpan(name, start_time, attributes)
+        self.spans.append(otel_span)
+        return otel_span
+
+
+class FakeOtelSpan:
+    def __init__(self, name, start_time, attributes):
+        self.name, self.start_time, self.attributes = name, start_time, attributes
+        self.status = self.end_time = None
+
+    def set_status(self, status):
+        self.status = status
+
+    def end(self, end_time=None):
+        self.end_time = end_time
+
+
+def test_opentelemetry_hook_exports_spans():
+    """Test finished spans are exported with their timestamps, counters and phases."""
+    pytest.importorskip("opentelemetry.trace")
+    tracer = FakeTracer()
+    finished = metrics.Span("push", {"remote": "origin"})
+    finished.add("bytes", 2048)
+    finished.add_phase("transfer", 0.25)
+    finished.fail("rejected")
+    finished.end()
+
+    OpenTelemetryHook(tracer)(finished)
+
+    exported, = tracer.spans
+    assert exported.name == "github_ops.push"
+    assert exported.attributes == {"github_ops.remote": "origin", "github_ops.bytes": 2048, "github_ops.phase.transfer": 0.25}
+    assert exported.end_time >= exported.start_time
+    assert exported.status.status_code.name == "ERROR"
@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from github_operations import github_ops, ratelimit
+from github_operations.ratelimit import RateLimiter
+
+MOCK_TOKEN = "test_token_123"
+
+
+def test_retry_after_is_honored(stub_github, github_client):
+    """Test a 429 with Retry-After is retried once the server-specified delay has passed."""
+    responses = iter([(429, {"message": "slow down"}, {"Retry-After": "0.2"}), (201, {"name": "repo"})])
+    stub_github.route("POST", "/user/repos", lambda request: next(responses))
+    limiter = RateLimiter()
+    client = github_client(rate_limiter=limiter)
+
+    started = time.monotonic()
+    repo_data, error_msg = github_ops.create_github_repository("repo", "", False, MOCK_TOKEN, client=client)
+
+    assert (repo_data, error_msg) == ({"name": "repo"}, None)
+    assert time.monotonic() - started >= 0.2
+    assert len(stub_github.requests) == 2
+    assert limiter.budget()["retries"] == 1
+
+def test_secondary_rate_limit_backoff_gives_up(stub_github, github_client):
+    """Test abuse responses are retried with jittered backoff up to max_retries, then reported."""
+    stub_github.route("DELETE", "/repos/user/repo", (403, {"message": "You have exceeded a secondary rate limit."}))
+    limiter = RateLimiter(max_retries=2, backoff_base=0.01)
+    client = github_client(rate_limiter=limiter)
+
+    success, error_msg = github_ops.delete_github_repository("user", "repo", MOCK_TOKEN, client=client)
+
+    assert success is False
+    assert "secondary rate limit" in error_msg
+    assert len(stub_github.requests) == 3
+
+def test_permission_403_not_retried(stub_github, github_client):
+    """Test a plain 403 (no rate-limit signal) fails immediately."""
+    stub_github.route("DELETE", "/repos/user/repo", (403, {"message": "Must have admin rights to Repository."}))
+    client = github_client()
+
+    success, error_msg = github_ops.delete_github_repository("user", "repo", MOCK_TOKEN, client=client)
+
+    assert (success, error_msg) == (False, "API request failed: Must have admin rights to Repository.")
+    assert len(stub_github.requests) == 1
+
+def test_exhausted_budget_waits_for_reset(stub_github, github_client):
+    """Test requests wait for X-RateLimit-Reset once the remaining budget reaches zero."""
+    reset_at = time.time() + 0.3
+    stub_github.route("PATCH", "/repos/user/repo", (200, {"name": "repo"}, {
+        "X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset_at)}))
+    limiter = RateLimiter()
+    client = github_client(rate_limiter=limiter)
+
+    github_ops.update_github_repository("user", "repo", MOCK_TOKEN, description="d", client=client)
+    assert limiter.budget()["remaining"] == 0
+    github_ops.update_github_repository("user", "repo", MOCK_TOKEN, description="d", client=client)
+
+    assert time.time() >= reset_at
+    assert limiter.budget()["total_wait"] > 0
+
+def test_token_bucket_paces_and_reports_queue_depth(stub_github, github_client):
+    """Test a static rate paces concurrent callers and exposes how many are queued."""
+    stub_github.route("DELETE", "/repos/user/repo", (204, b""))
+    limiter = RateLimiter(rate=20, burst=1)
+    client = github_client(rate_limiter=limiter)
+    depths = []
+
+    def worker():
+        github_ops.delete_github_repository("user", "repo", MOCK_TOKEN, client=client)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    depths.append(limiter.budget()["queue_depth"])
+    for thread in threads:
+        thread.join()
+
+    assert time.monotonic() - started >= 0.2 # 5 requests beyond the burst at 20/s
+    assert max(depths) >= 1
+    assert limiter.queue_depth == 0
+
+def test_low_budget_spreads_requests_until_reset():
+    """Test the pacing rate drops to the remaining budget over the reset window."""
+    limiter = RateLimiter()
+    limiter.observe(200, {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": str(time.time() + 100)})
+    assert limiter.budget()["rate"] is None
+    limiter.observe(200, {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "100", "X-RateLimit-Reset": str(time.time() + 100)})
+    assert 0.9 < limiter.budget()["rate"] < 1.1
+
+def test_shared_limiters_are_bounded_and_keyed_by_digest(mocker):
+    """Test the least recently used shared limiter is dropped and raw tokens are not kept as keys."""
+    mocker.patch.object(ratelimit, "MAX_SHARED_LIMITERS", 2)
+    first = ratelimit.get_rate_limiter("token_a")
+    dropped = ratelimit.get_rate_limiter("token_b")
+    assert ratelimit.get_rate_limiter("token_a") is first
+    ratelimit.get_rate_limiter("token_c")
+
+    assert len(ratelimit._limiters) == 2
+    assert "token_a" not in ratelimit._limiters
+    assert ratelimit.get_rate_limiter("token_a") is first
+    assert ratelimit.get_rate_limiter("token_b") is not dropped
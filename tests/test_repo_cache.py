@@ -0,0 +1,116 @@
+import os
+import sys
+import shutil
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from github_operations import github_ops
+from github_operations.repo_cache import RepoCache
+from github_operations.testing import commit_locally, run_git
+
+MOCK_TOKEN = "test_token_123"
+
+
+@pytest.fixture
+def clone(bare_repo, tmp_path):
+    local_path = str(tmp_path / "clone")
+    run_git("clone", "-q", f"file://{bare_repo}", local_path)
+    return local_path
+
+
+def test_lease_reuses_handle_and_helpers(clone):
+    """Test a released handle is lent again with its cat-file helper still running."""
+    cache = RepoCache()
+    with cache.lease(clone) as repo:
+        repo.head.commit.tree.blobs[0].data_stream.read()
+        helper = repo.git.cat_file_all
+    with cache.lease(clone) as again:
+        assert again is repo
+        assert again.git.cat_file_all is helper
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+    assert len(cache) == 0
+
+def test_concurrent_leases_get_separate_handles(clone):
+    """Test a handle is never lent to two callers at once."""
+    cache = RepoCache()
+    first = cache.acquire(clone)
+    second = cache.acquire(clone)
+    assert first is not second
+    cache.release(first)
+    cache.release(second)
+    assert len(cache) == 2
+
+    seen = []
+    def worker():
+        with cache.lease(clone) as repo:
+            seen.append(repo.head.commit.hexsha)
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(seen)) == 1
+    cache.close()
+
+def test_idle_eviction_and_bound(bare_repo, tmp_path, fake_clock):
+    """Test idle handles are closed after idle_timeout and beyond maxsize."""
+    clock = fake_clock
+    cache = RepoCache(maxsize=2, idle_timeout=10, clock=clock)
+    paths = []
+    for name in ("a", "b", "c"):
+        path = str(tmp_path / name)
+        run_git("clone", "-q", f"file://{bare_repo}", path)
+        paths.append(path)
+        with cache.lease(path):
+            pass
+    assert len(cache) == 2
+    with cache.lease(paths[0]):
+        pass
+    assert cache.hits == 0 # The oldest handle was evicted
+
+    clock.now = 11
+    assert cache.evict_idle() == 2
+    assert len(cache) == 0
+
+def test_failed_block_discards_handle(clone):
+    """Test a handle that was in use when an error was raised is not reused."""
+    cache = RepoCache()
+    with pytest.raises(RuntimeError):
+        with cache.lease(clone):
+            raise RuntimeError("boom")
+    assert len(cache) == 0
+
+def test_deleted_clone_is_not_reused(clone):
+    """Test a cached handle whose clone was deleted is closed instead of lent out."""
+    cache = RepoCache()
+    with cache.lease(clone):
+        pass
+    shutil.rmtree(clone)
+    with pytest.raises(github_ops.git.NoSuchPathError):
+        cache.acquire(clone)
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert len(cache) == 0
+
+def test_push_and_sync_with_repo_cache(bare_repo, clone, tmp_path):
+    """Test push_repository and sync_repository reuse one handle per clone."""
+    cache = RepoCache()
+    for i in range(3):
+        commit_locally(clone, f"file-{i}.txt")
+        assert github_ops.push_repository(clone, github_token=MOCK_TOKEN, repo_cache=cache) == (True, None)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    other = str(tmp_path / "other")
+    run_git("clone", "-q", f"file://{bare_repo}", other)
+    commit_locally(other, "from-other.txt")
+    run_git("push", "-q", "origin", "main", cwd=other)
+
+    result, error = github_ops.sync_repository(f"file://{bare_repo}", clone, MOCK_TOKEN, repo_cache=cache)
+    assert error is None
+    assert result["action"] == "updated"
+    assert cache.hits == 3
+    assert run_git("rev-parse", "HEAD", cwd=clone) == run_git("rev-parse", "main", cwd=bare_repo)
+    cache.close()
@@ -0,0 +1,164 @@
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from github_operations.scheduler import BATCH, INTERACTIVE, FairScheduler, host_of
+
+
+def hold_slot(scheduler, release, **slot_options):
+    """Starts a thread occupying a slot of scheduler until release is set, and waits until it runs."""
+    admitted = threading.Event()
+    def hold():
+        with scheduler.slot(slot_options.pop("github_token", "blocker-token"), **slot_options):
+            admitted.set()
+            release.wait(10)
+    thread = threading.Thread(target=hold)
+    thread.start()
+    assert admitted.wait(5)
+    return thread
+
+
+def queue_calls(scheduler, calls, order):
+    """Queues one thread per (label, slot options) in calls, in order, each appending its label to order once admitted."""
+    threads = []
+    for label, options in calls:
+        queued = scheduler.stats()["queued"]
+        def run(label=label, options=dict(options)):
+            with scheduler.slot(options.pop("github_token"), **options):
+                order.append(label)
+        thread = threading.Thread(target=run)
+        thread.start()
+        threads.append(thread)
+        while scheduler.stats()["queued"] == queued: # Keep the queueing order deterministic
+            time.sleep(0.001)
+    return threads
+
+
+def test_global_per_token_and_per_host_caps():
+    """Test no more calls run at once than the global, per-token and per-host caps allow."""
+    scheduler = FairScheduler(max_concurrent=5, per_token=2, per_host={"slow.example.com": 1})
+    lock = threading.Lock()
+    running, peaks = {}, {}
+    def work(key, github_token):
+        with lock:
+            running[key] = running.get(key, 0) + 1
+            running["all"] = running.get("all", 0) + 1
+            peaks[key] = max(peaks.get(key, 0), running[key])
+            peaks["all"] = max(peaks.get("all", 0), running["all"])
+        time.sleep(0.01)
+        with lock:
+            running[key] -= 1
+            running["all"] -= 1
+        return key
+
+    threads = []
+    for i in range(40):
+        token = f"token-{i % 4}"
+        host = "slow.example.com" if i % 5 == 0 else "api.github.com"
+        key = "slow" if host == "slow.example.com" else token
+        threads.append(threading.Thread(target=scheduler.call, args=(work, key), kwargs={"github_token": token, "host": host}))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peaks["all"] <= 5
+    assert all(peaks[f"token-{i}"] <= 2 for i in range(4))
+    assert peaks["slow"] == 1
+    assert scheduler.stats()["running"] == 0
+
+def test_interactive_calls_go_first():
+    """Test a queued interactive call is admitted before batch calls queued earlier."""
+    scheduler = FairScheduler(max_concurrent=1, per_token=None)
+    release, order = threading.Event(), []
+    blocker = hold_slot(scheduler, release)
+    threads = queue_calls(scheduler, [
+        ("batch-1", {"github_token": "a", "priority": BATCH}),
+        ("batch-2", {"github_token": "a", "priority": BATCH}),
+        ("ui", {"github_token": "b", "priority": INTERACTIVE}),
+    ], order)
+    release.set()
+    for thread in [blocker, *threads]:
+        thread.join()
+    assert order == ["ui", "batch-1", "batch-2"]
+
+def test_tenants_share_slots_by_weight():
+    """Test a tenant with a burst queued does not starve one arriving later, and weights skew the share."""
+    scheduler = FairScheduler(max_concurrent=1, per_token=None, weights={"heavy": 2})
+    release, order = threading.Event(), []
+    blocker = hold_slot(scheduler, release, tenant="burst")
+    calls = [(f"burst-{i}", {"github_token": "t1", "tenant": "burst"}) for i in range(6)]
+    calls += [(f"heavy-{i}", {"github_token": "t2", "tenant": "heavy"}) for i in range(4)]
+    threads = queue_calls(scheduler, calls, order)
+    release.set()
+    for thread in [blocker, *threads]:
+        thread.join()
+
+    first_six = [label.split("-")[0] for label in order[:6]]
+    assert first_six.count("heavy") == 4
+    assert order.index("heavy-3") < order.index("burst-4")
+    assert [label for label in order if label.startswith("burst")] == [f"burst-{i}" for i in range(6)]
+
+def test_stats_report_queue_waits():
+    """Test queue waits are recorded per tenant and per priority."""
+    scheduler = FairScheduler(max_concurrent=1)
+    release, order = threading.Event(), []
+    blocker = hold_slot(scheduler, release, tenant="ui-user", priority=INTERACTIVE)
+    threads = queue_calls(scheduler, [("job", {"github_token": "t", "tenant": "batch-user"})], order)
+    stats = scheduler.stats()
+    assert (stats["running"], stats["queued"]) == (1, 1)
+    assert stats["tenants"]["batch-user"]["queued"] == 1
+    time.sleep(0.05)
+    release.set()
+    for thread in [blocker, *threads]:
+        thread.join()
+
+    stats = scheduler.stats()
+    assert stats["tenants"]["batch-user"]["wait"]["count"] == 1
+    assert stats["tenants"]["batch-user"]["wait"]["max"] >= 0.05
+    assert stats["priorities"]["batch"]["p99"] >= 0.05
+    assert stats["priorities"]["interactive"]["count"] == 1
+    assert host_of("https://github.com/user/repo.git") == "github.com"
+    assert host_of("/srv/git/repo.git") == "local"
+
+def test_failed_call_releases_its_slot():
+    """Test an exception in a scheduled call frees the slot."""
+    scheduler = FairScheduler(max_concurrent=1)
+    def fail(github_token):
+        raise RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        scheduler.call(fail, github_token="t")
+    assert scheduler.call(lambda github_token: "ok", github_token="t") == "ok"
+
+def test_call_binds_positional_token_and_repo_host(mocker):
+    """Test a token passed positionally selects its own bucket and the host follows repo_url."""
+    scheduler = FairScheduler(max_concurrent=4, per_token=1)
+    slot = mocker.spy(scheduler, "slot")
+    def clone(repo_url, local_path, github_token, depth=None):
+        return github_token
+    def push(local_path, remote_name="origin", branch_name="main", github_token=None):
+        return github_token
+
+    assert scheduler.call(clone, "https://github.example.com/user/repo.git", "repo", "tenant-a-token") == "tenant-a-token"
+    assert scheduler.call(push, "repo", "origin", "main", "tenant-b-token") == "tenant-b-token"
+    assert scheduler.call(clone, "https://github.com/user/repo.git", "repo", github_token="t", host="mirror.local") == "t"
+
+    assert [(call.args[0], call.kwargs["host"]) for call in slot.call_args_list] == [
+        ("tenant-a-token", "github.example.com"), ("tenant-b-token", "github.com"), ("t", "mirror.local")]
+    with pytest.raises(ValueError, match="no github_token"):
+        scheduler.call(clone, "https://github.com/user/repo.git", "repo", None)
+
+def test_idle_tenant_state_is_bounded():
+    """Test finish tags and wait statistics of many one-off tenants do not accumulate."""
+    scheduler = FairScheduler(max_concurrent=1, max_tracked=50)
+    for i in range(1000):
+        with scheduler.slot("token", tenant=f"tenant-{i}"):
+            pass
+    assert len(scheduler._finish_tags) <= 128
+    assert len(scheduler.stats()["tenants"]) == 50
+    assert "tenant-999" in scheduler.stats()["tenants"]
@@ -0,0 +1,89 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from github_operations import github_ops
+from github_operations.cache import TTLCache
+from github_operations.token_cache import TokenCache
+
+MOCK_TOKEN = "test_token_123"
+
+USER_HEADERS = {
+    "X-OAuth-Scopes": "repo, read:org",
+    "X-RateLimit-Limit": "5000",
+    "X-RateLimit-Remaining": "4990",
+    "X-RateLimit-Reset": "1700000000",
+}
+
+
+def test_validate_token_records_login_scopes_and_budget(stub_github, github_client):
+    """Test a valid token is described by its login, scopes and rate budget, and revalidated from the cache."""
+    stub_github.route("GET", "/user", (200, {"login": "octocat"}, USER_HEADERS))
+    client, cache = github_client(), TTLCache()
+
+    info, error = github_ops.validate_token(MOCK_TOKEN, ["public_repo", "read:org"], client=client, token_cache=cache)
+    assert error is None
+    assert info["login"] == "octocat"
+    assert info["scopes"] == ["repo", "read:org"]
+    assert (info["rate_limit"], info["rate_remaining"], info["rate_reset"]) == (5000, 4990, 1700000000)
+
+    assert github_ops.validate_token(MOCK_TOKEN, client=client, token_cache=cache) == (info, None)
+    assert len(stub_github.requests) == 1
+    assert github_ops.validate_token(MOCK_TOKEN, client=client, token_cache=cache, refresh=True)[0]["login"] == "octocat"
+    assert len(stub_github.requests) == 2
+
+def test_validate_token_rejects_bad_and_under_scoped_tokens(stub_github, github_client):
+    """Test a rejected token is not cached and a missing scope is reported."""
+    stub_github.route("GET", "/user", (401, {"message": "Bad credentials"}))
+    client, cache = github_client(), TTLCache()
+    info, error = github_ops.validate_token(MOCK_TOKEN, client=client, token_cache=cache)
+    assert info is None and "Bad credentials" in error
+    assert len(cache) == 0
+
+    stub_github.route("GET", "/user", (200, {"login": "octocat"}, {"X-OAuth-Scopes": "public_repo"}))
+    info, error = github_ops.validate_token(MOCK_TOKEN, ["repo", "delete_repo"], client=client, token_cache=cache)
+    assert info is None and error == "GitHub token is missing required scopes: repo, delete_repo."
+    assert github_ops.validate_token(MOCK_TOKEN, ["public_repo"], client=client, token_cache=cache)[1] is None
+    assert github_ops.validate_token("", token_cache=cache) == (None, "GitHub token is required.")
+
+def test_fine_grained_tokens_skip_scope_checks(stub_github, github_client):
+    """Test a token without an X-OAuth-Scopes header is not rejected for scopes it cannot report."""
+    stub_github.route("GET", "/user", (200, {"login": "octocat"}))
+    info, error = github_ops.validate_token(MOCK_TOKEN, ["repo"], client=github_client(), token_cache=TTLCache())
+    assert error is None and info["scopes"] is None
+
+def test_token_cache_persists_without_raw_tokens(stub_github, tmp_path, github_client, fake_clock):
+    """Test validations survive reopening the cache file, expire after the ttl and never store the token."""
+    stub_github.route("GET", "/user", (200, {"login": "octocat"}, USER_HEADERS))
+    client, clock = github_client(), fake_clock
+    path = str(tmp_path / "cache" / "tokens.sqlite")
+    with TokenCache(path, ttl=60, clock=clock) as cache:
+        info, _ = github_ops.validate_token(MOCK_TOKEN, client=client, token_cache=cache)
+
+    with TokenCache(path, ttl=60, clock=clock) as cache:
+        assert github_ops.validate_token(MOCK_TOKEN, client=client, token_cache=cache) == (info, None)
+        assert len(stub_github.requests) == 1
+        clock.now += 60
+        assert cache.purge_expired() == 1
+        github_ops.validate_token(MOCK_TOKEN, client=client, token_cache=cache)
+        assert len(stub_github.requests) == 2
+    with open(path, "rb") as f:
+        assert MOCK_TOKEN.encode() not in f.read()
+
+def test_clone_rejects_under_scoped_token_before_downloading(bare_repo, tmp_path, mocker):
+    """Test clone_repository fails on a missing scope without creating the clone or running git."""
+    mock_get = mocker.patch("requests.Session.request")
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.headers = {"X-OAuth-Scopes": "public_repo"}
+    mock_get.return_value.json.return_value = {"login": "octocat"}
+    mock_clone = mocker.patch("git.Repo.clone_from")
+    local_path = str(tmp_path / "clone")
+
+    success, error = github_ops.clone_repository(f"file://{bare_repo}", local_path, MOCK_TOKEN,
+                                                 required_scopes=["repo"], token_cache=TTLCache())
+
+    assert success is False and "repo" in error
+    assert not os.path.exists(local_path)
+    mock_clone.assert_not_called()
+    assert mock_get.call_args.args == ("GET", "https://api.github.com/user")
@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import base64
+import zipfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from github_operations import github_ops
+from github_operations.blob_index import BlobIndex
+from github_operations.zip_ingest import _Base64BlobBody, _entry_blob_sha, ingest_zip
+
+MOCK_TOKEN = "test_token_123"
+# Content of main in the git_data_api repository
+EXISTING = {"README.md": b"# Readme\n", "shared.txt": b"shared\n"}
+
+
+def write_zip(path, entries):
+    """Writes a ZIP archive of entries, a dict of name to bytes (or (bytes, unix mode))."""
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in entries.items():
+            mode = None
+            if isinstance(content, tuple):
+                content, mode = content
+            info = zipfile.ZipInfo(name)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            if mode is not None:
+                info.external_attr = mode << 16
+            archive.writestr(info, content)
+    return path
+
+
+def test_entry_blob_sha_is_computed_in_chunks(tmp_path):
+    """Test the streamed blob SHA matches hashing the whole content."""
+    content = os.urandom(100_000)
+    archive_path = write_zip(str(tmp_path / "a.zip"), {"big.bin": content})
+    with zipfile.ZipFile(archive_path) as archive:
+        assert _entry_blob_sha(archive, archive.getinfo("big.bin"), chunk_size=999) == github_ops.git_blob_sha(content)
+
+def test_base64_body_streams_valid_json(tmp_path):
+    """Test the streamed body has the advertised length and decodes to the entry content."""
+    for size in (0, 1, 2, 3, 4, 10_000):
+        content = os.urandom(size)
+        archive_path = write_zip(str(tmp_path / f"{size}.zip"), {"f": content})
+        with zipfile.ZipFile(archive_path) as archive:
+            body = _Base64BlobBody(archive, archive.getinfo("f"), chunk_size=300)
+            data = b"".join(iter(lambda: body.read(77), b""))
+            assert len(data) == len(body)
+            assert base64.b64decode(json.loads(data)["content"]) == content
+            body.seek(0)
+            assert body.read() == data
+
+def test_ingest_zip_skips_unchanged_and_reuses_blobs(git_data_api, tmp_path, github_client):
+    """Test unchanged paths are skipped, known and duplicate blobs are not re-uploaded, and one commit is made."""
+    api = git_data_api(EXISTING)
+    archive_path = write_zip(str(tmp_path / "upload.zip"), {
+        "README.md": b"# Readme\n",             # Unchanged
+        "copy-of-shared.txt": b"shared\n",      # Blob already in the repository
+        "src/app.py": b"print('hi')\n",
+        "src/app_copy.py": b"print('hi')\n",    # Duplicate within the archive
+        "bin/run.sh": (b"#!/bin/sh\n", 0o100755),
+        "bin/latest": (b"run.sh", 0o120777),
+        "src/": b"",
+    })
+
+    result, error = ingest_zip(archive_path, "user", "repo", "main", "Upload", MOCK_TOKEN, prefix="site", client=github_client())
+
+    assert error is None
+    assert result["commit"]["sha"] == "new-commit-sha"
+    assert (result["files"], result["uploaded"], result["reused"], result["unchanged"]) == (6, 3, 3, 0)
+    assert sorted(api.blobs.values()) == [b"#!/bin/sh\n", b"print('hi')\n", b"run.sh"]
+    entries = {entry["path"]: entry for entry in api.trees[0]["tree"]}
+    assert set(entries) == {"site/README.md", "site/copy-of-shared.txt", "site/src/app.py", "site/src/app_copy.py", "site/bin/run.sh", "site/bin/latest"}
+    assert entries["site/bin/run.sh"]["mode"] == "100755"
+    assert entries["site/bin/latest"]["mode"] == "120000"
+    assert entries["site/src/app.py"]["mode"] == "100644"
+    assert api.ref == "new-commit-sha"
+
+def test_ingest_zip_without_changes_does_not_commit(git_data_api, tmp_path, github_client):
+    """Test an archive matching the branch produces no commit."""
+    api = git_data_api(EXISTING)
+    archive_path = write_zip(str(tmp_path / "same.zip"), {"README.md": b"# Readme\n", "shared.txt": b"shared\n"})
+
+    result, error = ingest_zip(archive_path, "user", "repo", "main", "Upload", MOCK_TOKEN, client=github_client())
+
+    assert error is None
+    assert result["commit"] is None
+    assert result["unchanged"] == 2
+    assert not api.trees
+    assert api.ref == "parent-sha"
+
+def test_ingest_zip_bounds_pending_uploads(git_data_api, tmp_path, github_client):
+    """Test no more than max_pending uploads are in flight at once."""
+    api = git_data_api(EXISTING)
+    api.blob_delay = 0.02
+    archive_path = write_zip(str(tmp_path / "many.zip"), {f"f{i}.txt": f"file {i}\n".encode() for i in range(12)})
+
+    result, error = ingest_zip(archive_path, "user", "repo", "main", "Upload", MOCK_TOKEN,
+                               max_workers=8, max_pending=2, client=github_client())
+
+    assert error is None
+    assert result["uploaded"] == 12
+    assert api.peak_uploads <= 2
+
+def test_ingest_zip_resends_body_after_rate_limit(git_data_api, tmp_path, github_client):
+    """Test a rate-limited blob upload is retried with the full body."""
+    api = git_data_api(EXISTING)
+    attempts = []
+    def throttled(request):
+        attempts.append(request["body"])
+        if len(attempts) == 1:
+            return 429, {"message": "rate limited"}, {"Retry-After": "0"}
+        return 201, {"sha": github_ops.git_blob_sha(base64.b64decode(json.loads(request["body"])["content"]))}
+    api.stub.route("POST", f"{api.base}/blobs", throttled)
+    archive_path = write_zip(str(tmp_path / "one.zip"), {"new.txt": b"new\n"})
+
+    result, error = ingest_zip(archive_path, "user", "repo", "main", "Upload", MOCK_TOKEN, client=github_client())
+
+    assert error is None
+    assert len(attempts) == 2 and attempts[0] == attempts[1]
+
+def test_ingest_zip_rejects_paths_outside_repository(git_data_api, tmp_path, github_client):
+    """Test entries escaping the repository abort the ingest before anything is committed."""
+    api = git_data_api(EXISTING)
+    archive_path = write_zip(str(tmp_path / "evil.zip"), {"../etc/passwd": b"x"})
+
+    result, error = ingest_zip(archive_path, "user", "repo", "main", "Upload", MOCK_TOKEN, client=github_client())
+
+    assert result is None
+    assert "outside the repository" in error
+    assert api.ref == "parent-sha"
+
+def test_ingest_zip_invalid_archive(tmp_path):
+    """Test a file that is not a ZIP archive is reported."""
+    path = tmp_path / "not.zip"
+    path.write_bytes(b"not a zip")
+    result, error = ingest_zip(str(path), "user", "repo", "main", "Upload", MOCK_TOKEN)
+    assert result is None
+    assert error.startswith("Invalid archive")
+
+def test_ingest_zip_updates_blob_index(git_data_api, tmp_path, github_client):
+    """Test the branch is read through the blob index, which follows the new commit."""
+    git_data_api(EXISTING)
+    archive_path = write_zip(str(tmp_path / "upload.zip"), {"README.md": b"# Readme\n", "new.txt": b"new\n"})
+    index = BlobIndex(str(tmp_path / "index.sqlite"))
+
+    result, error = ingest_zip(archive_path, "user", "repo", "main", "Upload", MOCK_TOKEN, client=github_client(), blob_index=index)
+
+    assert error is None
+    assert (result["uploaded"], result["unchanged"]) == (1, 1)
+    assert index.commit_sha("user/repo", "main") == "new-commit-sha"
+    assert index.blobs("user/repo", "main")["new.txt"] == github_ops.git_blob_sha(b"new\n")
+    index.close()